@@ -0,0 +1,27 @@
+"""Komponen sistem rekomendasi anime berbasis konten.
+
+Notebook ``sistem_rekomendasi_anime_fixed_v3`` memakai modul-modul di paket
+ini untuk bagian pipeline yang harus tetap ringan saat katalog membesar.
+"""
+
+from .catalog import CatalogStore
+from .neighbors import NeighborIndex, build_neighbor_index
+from .recommend import (
+    BatchRecommendations,
+    get_recommendations,
+    get_recommendations_batch,
+    recommend_title,
+)
+from .titles import TitleIndex, normalize_title
+
+__all__ = [
+    'BatchRecommendations',
+    'CatalogStore',
+    'NeighborIndex',
+    'TitleIndex',
+    'build_neighbor_index',
+    'get_recommendations',
+    'get_recommendations_batch',
+    'normalize_title',
+    'recommend_title',
+]
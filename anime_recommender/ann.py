@@ -0,0 +1,355 @@
+"""Approximate nearest neighbor (ANN) di atas vektor TF-IDF, murni NumPy.
+
+Untuk katalog jutaan anime, cosine similarity eksak ke seluruh katalog tidak
+lagi praktis meskipun dihitung per chunk. Kedua indeks di modul ini hanya
+memilih kandidat, lalu kandidat diurutkan ulang dengan cosine similarity
+eksak:
+
+* :class:`IVFIndex` (disarankan) -- *inverted file*: katalog dibagi menjadi
+  ``n_lists`` cluster dengan spherical k-means, dan query hanya memindai
+  anime di ``n_probes`` cluster yang centroid-nya paling mirip. Dengan
+  ``n_lists`` sekitar ``4 * sqrt(N)`` dan ``n_probes`` tetap, proporsi
+  katalog yang dipindai turun sebanding ``1 / sqrt(N)``. Pada katalog 1000
+  anime, default ``n_probes=32`` mencapai recall@10 sekitar 0.95 dengan
+  memindai sekitar 33% katalog (16 probe: 0.87 dengan 17%).
+* :class:`LSHIndex` -- random-hyperplane LSH (SimHash) dengan ``n_tables``
+  tabel berisi kode ``n_bits`` bit dan multi-probe. Tetangga TF-IDF di
+  katalog ini umumnya hanya memiliki cosine 0.1--0.3, sehingga peluang
+  tabrakan per bit nyaris 0.5 dan recall-nya hampir sama dengan proporsi
+  katalog yang dipindai (misalnya 32x6 bit dengan 2 probe: recall 0.92
+  tetapi memindai 81% katalog). Dipertahankan untuk data dengan tetangga
+  yang jauh lebih mirip.
+
+:func:`benchmark_ann` membandingkan hasilnya dengan top-K eksak dari
+:func:`~anime_recommender.neighbors.similarity_top_k` dan melaporkan recall
+bersama proporsi kandidat yang dipindai.
+"""
+
+import time
+
+import numpy as np
+
+from .neighbors import NeighborIndex, similarity_top_k
+
+
+def _expand_ranges(starts, lengths):
+    """Gabungan ``range(s, s + l)`` untuk setiap pasangan, tanpa loop Python."""
+    total = int(lengths.sum())
+    offsets = np.repeat(np.cumsum(lengths) - lengths, lengths)
+    return np.repeat(starts, lengths) + (np.arange(total) - offsets)
+
+
+def _rerank(Q, X, qids, rows, m, top_n, exclude=None):
+    """Top-N per query dari pasangan kandidat ``(qids, rows)`` dengan skor eksak."""
+    if exclude is not None:
+        keep = rows != np.asarray(exclude)[qids]
+        qids, rows = qids[keep], rows[keep]
+    # Re-ranking eksak: dot product setiap pasangan (query, kandidat)
+    scores = np.asarray(Q[qids].multiply(X[rows]).sum(axis=1)).ravel()
+    order = np.lexsort((rows, -scores, qids))
+    qids, rows, scores = qids[order], rows[order], scores[order]
+    group_start = np.searchsorted(qids, np.arange(m), side='left')
+    rank = np.arange(len(qids)) - group_start[qids]
+    keep = rank < top_n
+
+    indices = np.full((m, top_n), -1, dtype=np.int32)
+    values = np.full((m, top_n), -np.inf, dtype=np.float32)
+    indices[qids[keep], rank[keep]] = rows[keep]
+    values[qids[keep], rank[keep]] = scores[keep]
+    return indices, values
+
+
+def _normalize(matrix):
+    from scipy import sparse
+    from sklearn.preprocessing import normalize
+
+    return normalize(sparse.csr_matrix(matrix, dtype=np.float32), norm='l2')
+
+
+class _CandidateIndex:
+    """Query dan build :class:`NeighborIndex` yang sama untuk semua backend ANN."""
+
+    default_probes = 2
+
+    def __len__(self):
+        return self._X.shape[0]
+
+    def query_vectors(self, Q, top_n=10, n_probes=None, exclude=None):
+        """Top-N untuk vektor query ``Q`` (sparse, sudah ter-transform TF-IDF).
+
+        ``exclude`` (opsional) berisi satu posisi baris per query yang tidak
+        boleh ikut dikembalikan. Hasil ``(indices, scores)`` berukuran
+        ``len(Q) x top_n``; slot yang tidak terisi bernilai ``-1``/``-inf``.
+        """
+        Q = _normalize(Q)
+        qids, rows = self._candidates(Q, self._probes(n_probes))
+        return _rerank(Q, self._X, qids, rows, Q.shape[0], top_n, exclude)
+
+    def query_rows(self, rows, top_n=10, n_probes=None):
+        """Top-N tetangga untuk anime di posisi ``rows`` (tanpa dirinya sendiri)."""
+        rows = np.asarray(rows, dtype=np.int64)
+        return self.query_vectors(self._X[rows], top_n=top_n, n_probes=n_probes, exclude=rows)
+
+    def candidate_fraction(self, rows, n_probes=None):
+        """Rata-rata proporsi katalog yang dipindai per query untuk ``rows``."""
+        rows = np.asarray(rows, dtype=np.int64)
+        qids, _ = self._candidates(self._X[rows], self._probes(n_probes))
+        return len(qids) / (len(rows) * len(self))
+
+    def build_neighbor_index(self, k=50, n_probes=None, chunk_size=1024):
+        """:class:`NeighborIndex` perkiraan untuk seluruh katalog.
+
+        Hasilnya dapat dipakai langsung oleh jalur rekomendasi yang sudah ada
+        sebagai pengganti :func:`~anime_recommender.neighbors.build_neighbor_index`.
+        """
+        n = len(self)
+        indices = np.empty((n, k), dtype=np.int32)
+        scores = np.empty((n, k), dtype=np.float32)
+        for start in range(0, n, chunk_size):
+            rows = np.arange(start, min(start + chunk_size, n))
+            indices[rows], scores[rows] = self.query_rows(rows, top_n=k, n_probes=n_probes)
+        return NeighborIndex(indices, scores)
+
+    def _probes(self, n_probes):
+        return self.default_probes if n_probes is None else n_probes
+
+
+class IVFIndex(_CandidateIndex):
+    """Indeks *inverted file* dari spherical k-means dengan re-ranking cosine eksak.
+
+    ``n_lists`` default ``4 * sqrt(N)``. Centroid disimpan sebagai matriks
+    sparse sehingga featurizer hashing dengan jutaan kolom tetap muat.
+    """
+
+    default_probes = 32
+
+    def __init__(self, n_lists=None, n_iter=10, seed=0, chunk_size=4096):
+        self.n_lists = n_lists
+        self.n_iter = n_iter
+        self.seed = seed
+        self.chunk_size = chunk_size
+
+    def _assign(self, X, centroids):
+        from scipy import sparse
+
+        labels = np.empty(X.shape[0], dtype=np.int64)
+        centroids_T = sparse.csc_matrix(centroids.T)
+        for start in range(0, X.shape[0], self.chunk_size):
+            block = (X[start:start + self.chunk_size] @ centroids_T).toarray()
+            labels[start:start + len(block)] = block.argmax(axis=1)
+        return labels
+
+    def fit(self, tfidf_matrix):
+        from scipy import sparse
+
+        self._X = X = _normalize(tfidf_matrix)
+        n = X.shape[0]
+        n_lists = self.n_lists or int(round(4 * np.sqrt(n)))
+        n_lists = max(1, min(n_lists, n))
+        rng = np.random.default_rng(self.seed)
+        centroids = X[rng.choice(n, n_lists, replace=False)]
+        for _ in range(self.n_iter):
+            labels = self._assign(X, centroids)
+            members = sparse.csr_matrix((np.ones(n, dtype=np.float32), (labels, np.arange(n))),
+                                        shape=(n_lists, n))
+            sums = members @ X
+            # Cluster kosong diisi ulang dengan anime acak
+            empty = np.flatnonzero(np.diff(sums.indptr) == 0)
+            if len(empty):
+                sums = sparse.vstack([sums, X[rng.choice(n, len(empty), replace=False)]]).tocsr()
+                keep = np.setdiff1d(np.arange(n_lists), empty)
+                sums = sums[np.concatenate([keep, np.arange(n_lists, n_lists + len(empty))])]
+            centroids = _normalize(sums)
+        labels = self._assign(X, centroids)
+        self._centroids_T = sparse.csc_matrix(centroids.T)
+        self._order = np.argsort(labels, kind='stable')
+        self._offsets = np.searchsorted(labels[self._order], np.arange(n_lists + 1))
+        self.n_lists_ = n_lists
+        return self
+
+    def _probe_lists(self, Q, n_probes):
+        """``(query_id, list)`` untuk ``n_probes`` cluster terdekat setiap query."""
+        n_probes = max(1, min(n_probes, self.n_lists_))
+        qids, lists = [], []
+        for start in range(0, Q.shape[0], self.chunk_size):
+            sims = (Q[start:start + self.chunk_size] @ self._centroids_T).toarray()
+            top = np.argpartition(-sims, n_probes - 1, axis=1)[:, :n_probes]
+            qids.append(np.repeat(np.arange(start, start + len(sims)), n_probes))
+            lists.append(top.ravel())
+        return np.concatenate(qids), np.concatenate(lists)
+
+    def _candidates(self, Q, n_probes):
+        """Pasangan ``(query_id, row)`` dari ``n_probes`` cluster terdekat setiap query."""
+        qids, lists = self._probe_lists(Q, n_probes)
+        lengths = self._offsets[lists + 1] - self._offsets[lists]
+        rows = self._order[_expand_ranges(self._offsets[lists], lengths)]
+        return np.repeat(qids, lengths), rows
+
+    def build_neighbor_index(self, k=50, n_probes=None, chunk_size=1024):
+        """:class:`NeighborIndex` perkiraan untuk seluruh katalog.
+
+        Hasilnya sama dengan :meth:`query_rows` untuk setiap anime, tetapi
+        dihitung per cluster: anime yang mem-probe cluster yang sama diberi
+        skor dengan perkalian sparse per ``chunk_size`` query (blok padat
+        ``chunk_size x ukuran cluster``), lalu digabung ke top-K berjalan,
+        sehingga tidak ada pasangan kandidat yang dikumpulkan satu per satu.
+        """
+        X = self._X
+        n = len(self)
+        qids, lists = self._probe_lists(X, self._probes(n_probes))
+        order = np.argsort(lists, kind='stable')
+        qids = qids[order]
+        bounds = np.searchsorted(lists[order], np.arange(self.n_lists_ + 1))
+        indices = np.full((n, k), -1, dtype=np.int64)
+        scores = np.full((n, k), -np.inf, dtype=np.float32)
+        for cluster in range(self.n_lists_):
+            members = self._order[self._offsets[cluster]:self._offsets[cluster + 1]]
+            if not len(members):
+                continue
+            members_T = X[members].T.tocsr()
+            width = min(k, len(members))
+            for start in range(bounds[cluster], bounds[cluster + 1], chunk_size):
+                queries = qids[start:min(start + chunk_size, bounds[cluster + 1])]
+                block = (X[queries] @ members_T).toarray()
+                block[queries[:, None] == members[None, :]] = -np.inf
+                part = np.argpartition(-block, width - 1, axis=1)[:, :width]
+                merged_scores = np.hstack([scores[queries],
+                                           np.take_along_axis(block, part, axis=1)])
+                merged_indices = np.hstack([indices[queries], members[part]])
+                keep = np.argpartition(-merged_scores, k - 1, axis=1)[:, :k]
+                scores[queries] = np.take_along_axis(merged_scores, keep, axis=1)
+                indices[queries] = np.take_along_axis(merged_indices, keep, axis=1)
+        order = np.lexsort((indices, -scores), axis=-1)
+        indices = np.take_along_axis(indices, order, axis=1)
+        scores = np.take_along_axis(scores, order, axis=1)
+        indices[~np.isfinite(scores)] = -1
+        return NeighborIndex(indices.astype(np.int32), scores)
+
+
+class LSHIndex(_CandidateIndex):
+    """Indeks random-hyperplane LSH dengan re-ranking cosine eksak."""
+
+    def __init__(self, n_tables=8, n_bits=12, seed=0):
+        if not 1 <= n_bits <= 62:
+            raise ValueError('n_bits harus di antara 1 dan 62')
+        self.n_tables = n_tables
+        self.n_bits = n_bits
+        self.seed = seed
+
+    def fit(self, tfidf_matrix):
+        self._X = _normalize(tfidf_matrix)
+        rng = np.random.default_rng(self.seed)
+        self._planes = rng.standard_normal(
+            (self._X.shape[1], self.n_tables * self.n_bits), dtype=np.float32
+        )
+        codes = self._codes(self._project(self._X))
+        self._order = np.argsort(codes, axis=0, kind='stable').T.copy()
+        self._sorted_codes = np.take_along_axis(codes, self._order.T, axis=0).T.copy()
+        return self
+
+    def _project(self, Q):
+        proj = np.asarray(Q @ self._planes)
+        return proj.reshape(Q.shape[0], self.n_tables, self.n_bits)
+
+    def _codes(self, proj):
+        weights = np.left_shift(np.int64(1), np.arange(self.n_bits, dtype=np.int64))
+        return ((proj > 0).astype(np.int64) * weights).sum(axis=2)
+
+    def _probe_codes(self, proj, n_probes):
+        # Kode dasar ditambah kode dengan satu bit dibalik, dimulai dari bit
+        # yang proyeksinya paling dekat ke hyperplane (paling mungkin salah)
+        codes = self._codes(proj)
+        if n_probes <= 0:
+            return codes[:, :, None]
+        n_probes = min(n_probes, self.n_bits)
+        uncertain = np.argsort(np.abs(proj), axis=2)[:, :, :n_probes]
+        flipped = codes[:, :, None] ^ np.left_shift(np.int64(1), uncertain.astype(np.int64))
+        return np.concatenate([codes[:, :, None], flipped], axis=2)
+
+    def _candidates(self, Q, n_probes):
+        """Pasangan ``(query_id, row)`` unik dari semua bucket yang di-probe."""
+        probe_codes = self._probe_codes(self._project(Q), n_probes)
+        m = Q.shape[0]
+        pairs = []
+        for t in range(self.n_tables):
+            table_codes = self._sorted_codes[t]
+            codes = probe_codes[:, t, :].ravel()
+            lo = np.searchsorted(table_codes, codes, side='left')
+            hi = np.searchsorted(table_codes, codes, side='right')
+            lengths = hi - lo
+            qids = np.repeat(np.repeat(np.arange(m), probe_codes.shape[2]), lengths)
+            rows = self._order[t][_expand_ranges(lo, lengths)]
+            pairs.append(qids.astype(np.int64) * len(self) + rows)
+        keys = np.unique(np.concatenate(pairs))
+        return keys // len(self), keys % len(self)
+
+
+def recall_at_k(approx_indices, exact_indices):
+    """Rata-rata proporsi top-K eksak yang ikut ditemukan oleh ANN."""
+    k = exact_indices.shape[1]
+    hits = [
+        len(np.intersect1d(a[a >= 0], e, assume_unique=True))
+        for a, e in zip(approx_indices[:, :k], exact_indices)
+    ]
+    return float(np.mean(hits) / k)
+
+
+def _build(config, seed):
+    backend = config.get('backend', 'ivf')
+    if backend == 'ivf':
+        key = ('ivf', config.get('n_lists'))
+        return key, lambda: IVFIndex(n_lists=key[1], seed=seed)
+    if backend == 'lsh':
+        key = ('lsh', config.get('n_tables', 8), config.get('n_bits', 12))
+        return key, lambda: LSHIndex(key[1], key[2], seed=seed)
+    raise ValueError(f'backend ANN tidak dikenal: {backend}')
+
+
+def benchmark_ann(tfidf_matrix, configs, k=10, n_queries=500, seed=0):
+    """Ukur build time, latensi query, recall@K dan proporsi kandidat per konfigurasi.
+
+    ``configs`` berupa list dict ``{'backend': 'ivf', 'n_lists', 'n_probes'}``
+    atau ``{'backend': 'lsh', 'n_tables', 'n_bits', 'n_probes'}``. Baris
+    pertama hasil adalah baseline eksak (``backend='exact'``). Latensi
+    dilaporkan dalam milidetik per query untuk batch ``n_queries`` anime acak,
+    dan ``candidate_fraction`` adalah proporsi katalog yang di-rerank per
+    query; recall hanya berarti jika proporsi ini jauh di bawah 1.
+    """
+    n = tfidf_matrix.shape[0]
+    rng = np.random.default_rng(seed)
+    queries = rng.choice(n, size=min(n_queries, n), replace=False)
+
+    start = time.perf_counter()
+    exact_indices, _ = similarity_top_k(tfidf_matrix, queries, k)
+    exact_seconds = time.perf_counter() - start
+    results = [{
+        'backend': 'exact', 'build_seconds': 0.0,
+        'query_ms': exact_seconds * 1000 / len(queries), 'recall': 1.0,
+        'candidate_fraction': 1.0,
+    }]
+
+    built = {}
+    for config in configs:
+        key, make = _build(config, seed)
+        if key not in built:
+            start = time.perf_counter()
+            built[key] = (make().fit(tfidf_matrix), time.perf_counter() - start)
+        index, build_seconds = built[key]
+        n_probes = config.get('n_probes', index.default_probes)
+        start = time.perf_counter()
+        approx_indices, _ = index.query_rows(queries, top_n=k, n_probes=n_probes)
+        query_seconds = time.perf_counter() - start
+        result = {'backend': key[0]}
+        if key[0] == 'ivf':
+            result['n_lists'] = index.n_lists_
+        else:
+            result.update(n_tables=key[1], n_bits=key[2])
+        result.update({
+            'n_probes': n_probes,
+            'build_seconds': build_seconds,
+            'query_ms': query_seconds * 1000 / len(queries),
+            'recall': recall_at_k(approx_indices, exact_indices),
+            'candidate_fraction': index.candidate_fraction(queries, n_probes),
+        })
+        results.append(result)
+    return results
@@ -0,0 +1,399 @@
+"""Artefak model yang disimpan ke disk dan dimuat ulang dengan memory-map.
+
+Build offline menulis semua hasil yang mahal dihitung ke satu direktori
+versi ``<artifact_dir>/<model_version>-<waktu>/``:
+
+* ``vectorizer.joblib``     -- ``TfidfVectorizer`` (atau ``HashingTfidf``) yang sudah di-fit
+* ``tfidf_matrix.npz``      -- matriks TF-IDF (sparse)
+* ``neighbor_indices.npy``  -- posisi K tetangga terdekat per anime
+* ``neighbor_scores.npy``   -- skor similarity tetangga (float32, float16 atau int8)
+* ``neighbor_scales.npy``   -- skala per baris, hanya untuk skor int8
+* ``catalog.pkl``           -- tabel judul ringkas untuk menampilkan hasil
+* ``content.pkl``           -- teks ``content_features`` untuk refit TF-IDF
+* ``catalog_store.pkl``     -- :class:`~anime_recommender.catalog.CatalogStore` kolom hasil
+* ``title_index.pkl``       -- :class:`~anime_recommender.titles.TitleIndex`
+* ``franchise_labels.npy``  -- label franchise per anime, hanya jika ``franchise_threshold`` diisi
+* ``unigrams.npy``          -- sidik jari unigram korpus fit (acuan vocabulary drift)
+
+``<artifact_dir>/manifest.json`` (versi format, hash CSV, parameter TF-IDF dan
+K) menunjuk ke direktori versi aktif lewat ``version_dir`` dan diganti secara
+atomik setelah direktori versi baru selesai ditulis. Model yang sudah dimuat
+tetap membaca file dari direktori versinya sendiri, sehingga pembaruan
+artefak tidak pernah mencampur dua versi. Direktori versi sebelumnya
+disimpan (:data:`KEEP_VERSIONS`) untuk proses yang belum memuat ulang; versi
+yang lebih lama dihapus.
+
+Proses query cukup memanggil :func:`load_or_build`. Array tetangga dibuka
+dengan ``mmap_mode='r'`` sehingga startup tidak bergantung pada ukuran
+katalog, sedangkan vectorizer dan matriks TF-IDF baru dimuat saat dipakai.
+``catalog_store.pkl`` dan ``title_index.pkl`` adalah pickle biasa agar
+worker yang hanya melayani query dapat memakai
+:func:`~anime_recommender.online.load_query_model` tanpa pandas dan joblib.
+"""
+
+import hashlib
+import json
+import os
+import pickle
+import shutil
+import time
+from functools import cached_property
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from .features import TFIDF_PARAMS, fit_tfidf, prepare_chunks, unigram_fingerprint
+from .ingest import concat_chunks, iter_catalog
+from .catalog import CatalogStore
+from .instrument import stage, timed, timed_iter
+from .neighbors import CosineScorer, QuantizedScores, build_neighbor_index
+from .online import (MANIFEST_FILE, load_franchise_labels, load_neighbor_index, load_pickle,
+                     read_manifest, version_path)
+from .titles import TitleIndex
+
+FORMAT_VERSION = 4
+
+# Jumlah direktori versi yang disimpan: versi aktif dan versi sebelumnya
+KEEP_VERSIONS = 2
+
+# Kolom yang disimpan di catalog.pkl (ditampilkan pada hasil rekomendasi)
+CATALOG_COLUMNS = [
+    'English', 'Synonyms', 'Japanese', 'Genres', 'Score', 'Type',
+    'Popularity', 'Rank', 'Members', 'Demographic', 'Source', 'Rating', 'Status',
+]
+
+
+def file_sha256(path, block_size=1 << 20):
+    """Hash SHA-256 isi file, dibaca per blok."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _canonical_params(params):
+    # Tuple (mis. ngram_range) menjadi list agar sama dengan isi manifest.json
+    return json.loads(json.dumps(params, sort_keys=True))
+
+
+def _canonical_preprocess(preprocess):
+    if preprocess is None:
+        return None
+    from .preprocess import PREPROCESS_PARAMS
+
+    return _canonical_params({**PREPROCESS_PARAMS, **preprocess})
+
+
+def model_version(csv_sha256, tfidf_params, k, tfidf_dtype='float64', score_dtype='float32',
+                  preprocess=None, franchise_threshold=None):
+    """ID versi model: berubah jika data, parameter TF-IDF/normalisasi, K, presisi atau
+    threshold franchise berubah."""
+    payload = json.dumps(
+        [FORMAT_VERSION, csv_sha256, _canonical_params(tfidf_params), k, tfidf_dtype, score_dtype,
+         _canonical_preprocess(preprocess), franchise_threshold],
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+
+
+class ModelArtifact:
+    """Model yang sudah dimuat dari direktori artefak.
+
+    ``neighbor_index``, ``catalog`` dan ``title_index`` dimuat langsung.
+    ``vectorizer`` dan ``tfidf_matrix`` baru dibaca dari disk saat pertama
+    kali diakses karena hanya dibutuhkan oleh sebagian kecil query; begitu
+    juga ``inverted_index`` untuk pencarian teks bebas, yang dibentuk dari
+    ``tfidf_matrix``, dan ``scorer``
+    (:class:`~anime_recommender.neighbors.CosineScorer`) untuk jalur cadangan
+    yang menghitung similarity langsung. ``franchise_labels`` bernilai ``None`` jika artefak
+    dibangun tanpa ``franchise_threshold``. Semua file dibaca dari
+    ``data_path``, direktori versi yang dicatat ``manifest`` saat dimuat.
+    """
+
+    def __init__(self, path, manifest, catalog, title_index, neighbor_index):
+        self.path = path
+        self.manifest = manifest
+        self.data_path = version_path(path, manifest)
+        self.catalog = catalog
+        self.title_index = title_index
+        self.neighbor_index = neighbor_index
+
+    @property
+    def version(self):
+        return self.manifest['model_version']
+
+    @cached_property
+    def vectorizer(self):
+        return joblib.load(os.path.join(self.data_path, 'vectorizer.joblib'))
+
+    @cached_property
+    def tfidf_matrix(self):
+        from scipy.sparse import load_npz
+
+        return load_npz(os.path.join(self.data_path, 'tfidf_matrix.npz')).tocsr()
+
+    @cached_property
+    def catalog_store(self):
+        return load_pickle(os.path.join(self.data_path, 'catalog_store.pkl'))
+
+    @cached_property
+    def scorer(self):
+        # Baris TF-IDF artefak sudah ternormalisasi L2 oleh vectorizer
+        return CosineScorer(self.tfidf_matrix, normalized=True)
+
+    @cached_property
+    def inverted_index(self):
+        from .search import InvertedIndex
+
+        return InvertedIndex.from_matrix(self.tfidf_matrix)
+
+    @cached_property
+    def franchise_labels(self):
+        return load_franchise_labels(self.data_path)
+
+    @cached_property
+    def content_features(self):
+        return pd.read_pickle(os.path.join(self.data_path, 'content.pkl'))
+
+    @cached_property
+    def unigram_fingerprint(self):
+        return np.load(os.path.join(self.data_path, 'unigrams.npy'))
+
+
+def _prune_versions(artifact_dir, keep=KEEP_VERSIONS):
+    """Hapus direktori versi selain ``keep`` versi terbaru (dan sisa layout lama)."""
+    versions = []
+    for name in os.listdir(artifact_dir):
+        if name == MANIFEST_FILE or name.startswith('.'):
+            continue
+        path = os.path.join(artifact_dir, name)
+        if os.path.isdir(path) and '-' in name:
+            versions.append((name.rsplit('-', 1)[1], path))
+        elif os.path.isdir(path):
+            shutil.rmtree(path, ignore_errors=True)
+        else:
+            os.remove(path)
+    versions.sort(reverse=True)
+    for _, path in versions[keep:]:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+def write_artifact(artifact_dir, manifest, vectorizer, tfidf_matrix, neighbor_index,
+                   catalog, content_features, title_index=None, franchise_labels=None,
+                   unigrams=None):
+    """Tulis versi artefak baru ke ``artifact_dir`` lalu aktifkan secara atomik.
+
+    File ditulis ke direktori versi baru (lewat direktori sementara), baru
+    kemudian ``manifest.json`` diganti dengan ``os.replace``. Pembaca selalu
+    melihat versi lama atau versi baru secara utuh, dan model yang sudah
+    dimuat tetap membaca direktori versinya sendiri.
+    """
+    from scipy.sparse import save_npz
+
+    title_table = catalog[[c for c in CATALOG_COLUMNS if c in catalog.columns]]
+    if title_index is None:
+        title_index = TitleIndex.from_dataframe(title_table)
+
+    version_dir = f"{manifest['model_version']}-{time.time_ns():016x}"
+    manifest = {**manifest, 'version_dir': version_dir}
+    os.makedirs(artifact_dir, exist_ok=True)
+    tmp_dir = os.path.join(artifact_dir, f'.tmp-{version_dir}')
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+    joblib.dump(vectorizer, os.path.join(tmp_dir, 'vectorizer.joblib'))
+    save_npz(os.path.join(tmp_dir, 'tfidf_matrix.npz'), tfidf_matrix, compressed=False)
+    np.save(os.path.join(tmp_dir, 'neighbor_indices.npy'), neighbor_index.indices)
+    if isinstance(neighbor_index.scores, QuantizedScores):
+        np.save(os.path.join(tmp_dir, 'neighbor_scores.npy'), neighbor_index.scores.codes)
+        np.save(os.path.join(tmp_dir, 'neighbor_scales.npy'), neighbor_index.scores.scales)
+    else:
+        np.save(os.path.join(tmp_dir, 'neighbor_scores.npy'), neighbor_index.scores)
+    if franchise_labels is not None:
+        np.save(os.path.join(tmp_dir, 'franchise_labels.npy'), franchise_labels.astype(np.int32))
+    if unigrams is not None:
+        np.save(os.path.join(tmp_dir, 'unigrams.npy'), unigrams)
+    title_table.to_pickle(os.path.join(tmp_dir, 'catalog.pkl'))
+    pd.Series(content_features).reset_index(drop=True).to_pickle(os.path.join(tmp_dir, 'content.pkl'))
+    for name, value in (('title_index.pkl', title_index),
+                        ('catalog_store.pkl', CatalogStore.from_dataframe(title_table))):
+        with open(os.path.join(tmp_dir, name), 'wb') as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.rename(tmp_dir, os.path.join(artifact_dir, version_dir))
+
+    tmp_manifest = os.path.join(artifact_dir, f'.{MANIFEST_FILE}.tmp-{os.getpid()}')
+    with open(tmp_manifest, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_manifest, os.path.join(artifact_dir, MANIFEST_FILE))
+    _prune_versions(artifact_dir)
+    return load_artifact(artifact_dir)
+
+
+def _default_params(featurizer, tfidf_params):
+    if tfidf_params is not None:
+        return tfidf_params
+    if featurizer == 'hashing':
+        from .hashing import HASHING_PARAMS
+
+        return HASHING_PARAMS
+    return TFIDF_PARAMS
+
+
+def _split_chunks(prepared, catalog_chunks, text_chunks):
+    """Simpan kolom ``CATALOG_COLUMNS`` dan ``content_features`` setiap chunk, lalu alirkan teksnya."""
+    for chunk in prepared:
+        catalog_chunks.append(chunk[[c for c in CATALOG_COLUMNS if c in chunk.columns]])
+        text_chunks.append(chunk['content_features'])
+        yield chunk['content_features']
+
+
+@timed('build_artifact')
+def build_artifact(csv_path, artifact_dir, tfidf_params=None, k=50, chunk_size=256,
+                   read_chunksize=100_000, featurizer='tfidf', n_jobs=1, tfidf_dtype='float64',
+                   score_dtype='float32', preprocess=None, token_cache=None,
+                   franchise_threshold=None):
+    """Jalankan seluruh pipeline build dan tulis hasilnya ke ``artifact_dir``.
+
+    CSV dibaca per ``read_chunksize`` baris dan setiap chunk langsung
+    diringkas menjadi kolom ``CATALOG_COLUMNS`` dan ``content_features``,
+    sehingga kolom lain tidak pernah dimuat untuk seluruh katalog sekaligus.
+    ``featurizer='hashing'`` memakai :mod:`~anime_recommender.hashing` yang
+    men-tokenize ``content_features`` per batch di ``n_jobs`` proses worker;
+    chunk dialirkan ke worker begitu selesai disiapkan, tanpa menunggu
+    seluruh CSV dibaca.
+    ``tfidf_dtype='float32'`` dan ``score_dtype`` (``float16``/``int8``)
+    mengurangi memori matriks TF-IDF dan skor tetangga; lihat
+    :func:`~anime_recommender.evaluation.precision_report` untuk dampaknya.
+
+    ``preprocess`` (dict, lihat
+    :data:`~anime_recommender.preprocess.PREPROCESS_PARAMS`) mengaktifkan
+    normalisasi teks ``content_features`` di ``n_jobs`` proses worker. Hasilnya
+    disimpan di cache token ``token_cache`` (default
+    ``<artifact_dir>.tokens.joblib``, di luar direktori artefak) dan dipakai
+    ulang pada build berikutnya; entri anime yang sudah tidak ada di CSV
+    dibuang.
+
+    ``franchise_threshold`` (misalnya
+    :data:`~anime_recommender.franchise.FRANCHISE_THRESHOLD`) menambahkan
+    label franchise dari :func:`~anime_recommender.franchise.franchise_clusters`
+    untuk opsi ``collapse_franchises`` saat query.
+    """
+    if featurizer not in ('tfidf', 'hashing'):
+        raise ValueError(f'featurizer tidak dikenal: {featurizer}')
+    tfidf_params = _default_params(featurizer, tfidf_params)
+    csv_stat = os.stat(csv_path)
+    csv_hash = file_sha256(csv_path)
+
+    chunks = timed_iter('read_csv', iter_catalog(csv_path, chunksize=read_chunksize))
+    prepared = timed_iter('content_features', prepare_chunks(chunks))
+    cache = None
+    if preprocess is not None:
+        from .preprocess import TokenCache, normalize_chunks
+
+        cache = TokenCache(token_cache or f'{artifact_dir}.tokens.joblib')
+        prepared = normalize_chunks(prepared, preprocess, n_jobs=n_jobs, cache=cache)
+    catalog_chunks, text_chunks = [], []
+    texts = _split_chunks(prepared, catalog_chunks, text_chunks)
+    if featurizer == 'hashing':
+        from .hashing import fit_hashing_tfidf
+
+        # Chunk dialirkan langsung ke worker hashing sambil CSV masih dibaca
+        vectorizer, tfidf_matrix = fit_hashing_tfidf(texts, tfidf_params, n_jobs=n_jobs,
+                                                     dtype=tfidf_dtype)
+        content_features = pd.concat(text_chunks, ignore_index=True)
+    else:
+        content_features = pd.concat(list(texts), ignore_index=True)
+        vectorizer, tfidf_matrix = fit_tfidf(content_features, tfidf_params, dtype=tfidf_dtype)
+    if cache is not None:
+        cache.save(prune=True)
+    catalog = concat_chunks(catalog_chunks)
+    neighbor_index = build_neighbor_index(tfidf_matrix, k=k, chunk_size=chunk_size)
+    neighbor_index = neighbor_index.with_score_dtype(score_dtype)
+    unigrams = unigram_fingerprint(content_features, tfidf_params)
+    franchise_labels = None
+    if franchise_threshold is not None:
+        from .franchise import franchise_clusters
+
+        franchise_labels = franchise_clusters(tfidf_matrix, catalog, franchise_threshold,
+                                              n_jobs=n_jobs)
+
+    manifest = {
+        'format_version': FORMAT_VERSION,
+        'model_version': model_version(csv_hash, tfidf_params, k, tfidf_dtype, score_dtype,
+                                       preprocess, franchise_threshold),
+        'csv_sha256': csv_hash,
+        'csv_size': csv_stat.st_size,
+        'csv_mtime_ns': csv_stat.st_mtime_ns,
+        'featurizer': featurizer,
+        'tfidf_params': _canonical_params(tfidf_params),
+        'neighbor_k': k,
+        'tfidf_dtype': tfidf_dtype,
+        'score_dtype': score_dtype,
+        'preprocess': _canonical_preprocess(preprocess),
+        'franchise_threshold': franchise_threshold,
+        'n_items': int(tfidf_matrix.shape[0]),
+        'n_features': int(tfidf_matrix.shape[1]),
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+    }
+    with stage('write_artifact'):
+        return write_artifact(artifact_dir, manifest, vectorizer, tfidf_matrix, neighbor_index,
+                              catalog, content_features, franchise_labels=franchise_labels,
+                              unigrams=unigrams)
+
+
+@timed('load_artifact')
+def load_artifact(artifact_dir, mmap=True):
+    """Muat artefak; array tetangga di-memory-map jika ``mmap=True``."""
+    manifest = read_manifest(artifact_dir)
+    if manifest is None:
+        raise FileNotFoundError(f'Artefak model tidak ditemukan di {artifact_dir}')
+    data_dir = version_path(artifact_dir, manifest)
+    neighbor_index = load_neighbor_index(data_dir, mmap=mmap)
+    catalog = pd.read_pickle(os.path.join(data_dir, 'catalog.pkl'))
+    title_index = load_pickle(os.path.join(data_dir, 'title_index.pkl'))
+    return ModelArtifact(artifact_dir, manifest, catalog, title_index, neighbor_index)
+
+
+def is_stale(artifact_dir, csv_path, tfidf_params=None, k=50, featurizer='tfidf',
+             tfidf_dtype='float64', score_dtype='float32', preprocess=None,
+             franchise_threshold=None):
+    """``True`` jika artefak belum ada atau tidak sesuai dengan CSV/parameter.
+
+    Hash CSV hanya dihitung ulang jika ukuran atau mtime file berubah.
+    """
+    manifest = read_manifest(artifact_dir)
+    if manifest is None or manifest.get('format_version') != FORMAT_VERSION:
+        return True
+    tfidf_params = _default_params(featurizer, tfidf_params)
+    if manifest.get('featurizer', 'tfidf') != featurizer:
+        return True
+    if manifest.get('tfidf_dtype', 'float64') != tfidf_dtype:
+        return True
+    if manifest.get('score_dtype', 'float32') != score_dtype:
+        return True
+    if manifest.get('preprocess') != _canonical_preprocess(preprocess):
+        return True
+    if manifest.get('franchise_threshold') != franchise_threshold:
+        return True
+    if manifest['tfidf_params'] != _canonical_params(tfidf_params) or manifest['neighbor_k'] != k:
+        return True
+    csv_stat = os.stat(csv_path)
+    if (csv_stat.st_size, csv_stat.st_mtime_ns) == (manifest['csv_size'], manifest['csv_mtime_ns']):
+        return False
+    return file_sha256(csv_path) != manifest['csv_sha256']
+
+
+def load_or_build(csv_path, artifact_dir, tfidf_params=None, k=50, chunk_size=256,
+                  featurizer='tfidf', n_jobs=1, tfidf_dtype='float64', score_dtype='float32',
+                  preprocess=None, token_cache=None, franchise_threshold=None):
+    """Muat artefak, atau build ulang otomatis jika belum ada atau basi."""
+    if is_stale(artifact_dir, csv_path, tfidf_params=tfidf_params, k=k, featurizer=featurizer,
+                tfidf_dtype=tfidf_dtype, score_dtype=score_dtype, preprocess=preprocess,
+                franchise_threshold=franchise_threshold):
+        return build_artifact(csv_path, artifact_dir, tfidf_params=tfidf_params, k=k,
+                              chunk_size=chunk_size, featurizer=featurizer, n_jobs=n_jobs,
+                              tfidf_dtype=tfidf_dtype, score_dtype=score_dtype,
+                              preprocess=preprocess, token_cache=token_cache,
+                              franchise_threshold=franchise_threshold)
+    return load_artifact(artifact_dir)
@@ -0,0 +1,367 @@
+"""Benchmark pipeline build dan query pada katalog sintetis.
+
+Katalog sintetis dibentuk dari distribusi ``Top_Anime_data.csv``: jumlah
+genre per anime dan frekuensi setiap genre, panjang dan kosakata deskripsi,
+serta proporsi nilai kosong setiap kolom. Untuk setiap ukuran katalog,
+tahap-tahap berikut diukur waktunya dan peak RSS-nya:
+
+* ``ingestion``         -- :func:`~anime_recommender.ingest.read_catalog`
+* ``content_features``  -- :func:`~anime_recommender.features.prepare_catalog`
+* ``fit_transform``     -- ``TfidfVectorizer.fit_transform``
+* ``index_build``       -- indeks tetangga eksak, atau
+  :class:`~anime_recommender.ann.IVFIndex` di atas ``exact_limit`` (dengan
+  recall@10 dan proporsi kandidat dari sampel query)
+* ``franchise_join``    -- :func:`~anime_recommender.franchise.similarity_join` pada
+  ``FRANCHISE_THRESHOLD``, hanya sampai ``join_limit`` baris karena jumlah
+  kandidatnya tumbuh kira-kira kuadratik
+* ``title_index``       -- :class:`~anime_recommender.titles.TitleIndex`
+* ``single_query``      -- latensi p50/p99 satu panggilan ``get_recommendations``
+* ``batch_query``       -- throughput rekomendasi batch (query per detik)
+
+Hasil ditulis ke file JSON setelah setiap ukuran selesai, sehingga hasil dua
+run dapat dibandingkan untuk mendeteksi regresi::
+
+    python -m anime_recommender.bench --sizes 1000 10000 --output bench.json
+
+:func:`measure_cold_start` mengukur jalur query online di proses Python baru:
+waktu dari import paket hingga rekomendasi pertama, serta modul berat yang
+ikut terimpor (lihat ``python -m anime_recommender bench``).
+"""
+
+import argparse
+import json
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+from .features import fit_tfidf, prepare_catalog
+from .franchise import FRANCHISE_THRESHOLD, similarity_join
+from .ingest import read_catalog
+from .neighbors import build_neighbor_index
+from .catalog import CatalogStore
+from .recommend import get_recommendations, get_recommendations_batch
+from .titles import TitleIndex
+
+DEFAULT_SIZES = (1_000, 10_000, 100_000, 1_000_000)
+
+# Modul yang tidak boleh terimpor oleh jalur query online
+HEAVY_MODULES = ('pandas', 'sklearn', 'scipy', 'joblib', 'matplotlib', 'seaborn')
+
+_COLD_START_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+from anime_recommender.online import load_query_model
+model = load_query_model({artifact_dir!r})
+result = model.recommend_records({title!r}, top_n={top_n})
+elapsed = time.perf_counter() - start
+print(json.dumps({{'ms': elapsed * 1000, 'found': result is not None,
+                  'heavy_modules': [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+class SyntheticCatalog:
+    """Generator katalog sintetis dengan bentuk yang sama seperti ``template``."""
+
+    def __init__(self, template, max_vocabulary=20_000):
+        self.columns = list(template.columns)
+        self.template = template
+
+        genre_lists = [g.split(', ') if isinstance(g, str) else []
+                       for g in template['Genres'].tolist()]
+        self.genre_counts = np.array([len(g) for g in genre_lists])
+        genres = pd.Series([g for gs in genre_lists for g in gs]).value_counts()
+        self.genres = genres.index.to_numpy()
+        self.genre_p = (genres / genres.sum()).to_numpy()
+
+        descriptions = template['Description'].dropna().astype(str).str.split()
+        self.description_lengths = descriptions.str.len().to_numpy()
+        words = pd.Series([w for ws in descriptions for w in ws]).value_counts()[:max_vocabulary]
+        self.words = words.index.to_numpy()
+        self.word_p = (words / words.sum()).to_numpy()
+
+    def _genres(self, n, rng):
+        counts = rng.choice(self.genre_counts, size=n)
+        # Sampling berbobot tanpa pengembalian untuk semua baris sekaligus:
+        # genre dengan kunci Exp(1) / p terkecil yang terpilih
+        order = np.argsort(rng.exponential(size=(n, len(self.genres))) / self.genre_p, axis=1)
+        return [', '.join(self.genres[picked[:count]]) if count else None
+                for picked, count in zip(order, counts)]
+
+    def _texts(self, lengths, rng):
+        words = self.words[rng.choice(len(self.words), size=int(lengths.sum()), p=self.word_p)]
+        bounds = np.cumsum(lengths)[:-1]
+        return [' '.join(ws) for ws in np.split(words, bounds)]
+
+    def _titles(self, column, start, n, rng):
+        missing = rng.random(n) < self.template[column].isna().mean()
+        titles = self._texts(np.full(n, 2), rng)
+        return [None if skip else f'{title} {start + i}'
+                for i, (title, skip) in enumerate(zip(titles, missing))]
+
+    def generate(self, n_rows, start=0, rng=None):
+        """DataFrame berisi ``n_rows`` anime; ``start`` membuat judul unik antar chunk."""
+        rng = np.random.default_rng(rng)
+        data = {}
+        for column in self.columns:
+            if column == 'Genres':
+                data[column] = self._genres(n_rows, rng)
+            elif column == 'Description':
+                data[column] = self._texts(rng.choice(self.description_lengths, size=n_rows), rng)
+            elif column in ('English', 'Synonyms', 'Japanese'):
+                data[column] = self._titles(column, start, n_rows, rng)
+            elif column in ('Popularity', 'Rank'):
+                data[column] = start + rng.permutation(n_rows) + 1
+            else:
+                # Kolom lain diambil acak dari nilai template (termasuk NaN)
+                data[column] = self.template[column].to_numpy()[
+                    rng.integers(len(self.template), size=n_rows)
+                ]
+        return pd.DataFrame(data, columns=self.columns)
+
+    def write_csv(self, path, n_rows, seed=0, chunksize=50_000):
+        """Tulis katalog sintetis ke ``path`` per chunk agar memori tetap kecil."""
+        rng = np.random.default_rng(seed)
+        for start in range(0, n_rows, chunksize):
+            chunk = self.generate(min(chunksize, n_rows - start), start=start, rng=rng)
+            chunk.to_csv(path, mode='w' if start == 0 else 'a', header=start == 0, index=False)
+        return path
+
+
+def _reset_peak_rss():
+    # Linux: menulis "5" ke clear_refs mereset VmHWM (peak RSS) proses
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+
+def _peak_rss_mb():
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss dalam KB di Linux, dalam byte di macOS
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+@contextmanager
+def measure(stages, name):
+    """Catat ``seconds`` dan ``peak_rss_mb`` blok ``with`` ke ``stages[name]``.
+
+    Jika peak RSS tidak dapat direset (selain Linux), nilai yang dicatat adalah
+    peak sejak proses dimulai dan ``peak_rss_reset`` bernilai ``False``.
+    """
+    reset = _reset_peak_rss()
+    start = time.perf_counter()
+    result = {}
+    stages[name] = result
+    yield result
+    result['seconds'] = time.perf_counter() - start
+    result['peak_rss_mb'] = _peak_rss_mb()
+    result['peak_rss_reset'] = reset
+
+
+def run_benchmark(csv_path, k=50, n_queries=1_000, batch_size=1_000, batch_repeats=5,
+                  exact_limit=100_000, recall_queries=200, join_limit=50_000, seed=0):
+    """Jalankan semua tahap pada satu file katalog dan kembalikan dict hasil.
+
+    Di atas ``exact_limit`` baris, indeks tetangga dibangun dengan
+    :class:`~anime_recommender.ann.IVFIndex`; recall@10-nya terhadap top-10
+    eksak untuk ``recall_queries`` anime acak dicatat di tahap
+    ``index_build`` (di luar waktu build). Tahap ``franchise_join``
+    dilewati di atas ``join_limit`` baris.
+    """
+    stages = {}
+    with measure(stages, 'ingestion'):
+        df = read_catalog(csv_path)
+    with measure(stages, 'content_features'):
+        catalog = prepare_catalog(df)
+    del df
+    with measure(stages, 'fit_transform'):
+        _, tfidf_matrix = fit_tfidf(catalog['content_features'])
+    with measure(stages, 'index_build') as stage:
+        if len(catalog) <= exact_limit:
+            stage['backend'] = 'exact'
+            neighbor_index = build_neighbor_index(tfidf_matrix, k=k)
+        else:
+            from .ann import IVFIndex
+
+            ann_index = IVFIndex(seed=seed).fit(tfidf_matrix)
+            stage['backend'] = 'ivf'
+            stage['n_lists'] = ann_index.n_lists_
+            stage['n_probes'] = ann_index.default_probes
+            neighbor_index = ann_index.build_neighbor_index(k=k)
+    if stage['backend'] != 'exact':
+        from .ann import recall_at_k
+        from .neighbors import similarity_top_k
+
+        rng = np.random.default_rng(seed)
+        sample = rng.choice(len(catalog), size=min(recall_queries, len(catalog)), replace=False)
+        exact_indices, _ = similarity_top_k(tfidf_matrix, sample, 10)
+        stage['recall@10'] = recall_at_k(np.asarray(neighbor_index.indices[sample, :10]),
+                                         exact_indices)
+        stage['candidate_fraction'] = ann_index.candidate_fraction(sample)
+    if len(catalog) <= join_limit:
+        with measure(stages, 'franchise_join') as stage:
+            rows, _, _ = similarity_join(tfidf_matrix, FRANCHISE_THRESHOLD)
+            stage['pairs'] = int(len(rows))
+    with measure(stages, 'title_index'):
+        title_index = TitleIndex.from_dataframe(catalog)
+    catalog_store = CatalogStore.from_dataframe(catalog)
+
+    rng = np.random.default_rng(seed)
+    titles = catalog['English'].dropna().to_numpy()
+    with measure(stages, 'single_query') as stage:
+        latencies = []
+        for title in rng.choice(titles, size=n_queries):
+            start = time.perf_counter()
+            get_recommendations(title, title_index, catalog_store, neighbor_index=neighbor_index,
+                                top_n=10)
+            latencies.append(time.perf_counter() - start)
+        stage['n_queries'] = n_queries
+        stage['p50_ms'] = float(np.percentile(latencies, 50) * 1000)
+        stage['p99_ms'] = float(np.percentile(latencies, 99) * 1000)
+    with measure(stages, 'batch_query') as stage:
+        durations = []
+        for _ in range(batch_repeats):
+            batch = rng.choice(titles, size=batch_size).tolist()
+            start = time.perf_counter()
+            get_recommendations_batch(batch, title_index, top_n=10, neighbor_index=neighbor_index)
+            durations.append(time.perf_counter() - start)
+        stage['batch_size'] = batch_size
+        stage['queries_per_second'] = float(batch_size / np.median(durations))
+
+    return {
+        'n_rows': int(len(catalog)),
+        'n_features': int(tfidf_matrix.shape[1]),
+        'csv_bytes': os.path.getsize(csv_path),
+        'stages': stages,
+    }
+
+
+def measure_cold_start(artifact_dir, title, runs=5, top_n=10):
+    """Waktu import hingga rekomendasi pertama di ``runs`` proses Python baru.
+
+    Kembalikan dict berisi median dan maksimum waktu (milidetik), waktu
+    total proses termasuk startup interpreter, serta modul
+    :data:`HEAVY_MODULES` yang terimpor.
+    """
+    package_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [package_root, env.get('PYTHONPATH')]))
+    script = _COLD_START_SCRIPT.format(artifact_dir=os.path.abspath(artifact_dir), title=title,
+                                       top_n=top_n, heavy=HEAVY_MODULES)
+    samples, process_ms = [], []
+    for _ in range(runs):
+        start = time.perf_counter()
+        output = subprocess.run([sys.executable, '-c', script], env=env, check=True,
+                                capture_output=True, text=True).stdout
+        process_ms.append((time.perf_counter() - start) * 1000)
+        samples.append(json.loads(output.strip().splitlines()[-1]))
+    if not samples[0]['found']:
+        raise ValueError(f"Anime '{title}' tidak ditemukan di artefak")
+    times = [sample['ms'] for sample in samples]
+    return {
+        'runs': runs,
+        'median_ms': float(np.median(times)),
+        'max_ms': float(np.max(times)),
+        'process_median_ms': float(np.median(process_ms)),
+        'heavy_modules': samples[0]['heavy_modules'],
+    }
+
+
+def _environment():
+    import scipy
+    import sklearn
+
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'scipy': scipy.__version__,
+        'scikit-learn': sklearn.__version__,
+    }
+
+
+def run_suite(sizes=DEFAULT_SIZES, template_path='Top_Anime_data.csv',
+              output='bench_results.json', workdir=None, seed=0, **kwargs):
+    """Benchmark setiap ukuran di ``sizes`` dan tulis hasilnya ke ``output``.
+
+    Katalog sintetis ditulis ke ``workdir`` (direktori sementara jika
+    ``None``, dihapus setelah selesai). Argumen lain diteruskan ke
+    :func:`run_benchmark`.
+    """
+    generator = SyntheticCatalog(read_catalog(template_path, usecols=None))
+    keep_workdir = workdir is not None
+    workdir = workdir or tempfile.mkdtemp(prefix='anime-bench-')
+    os.makedirs(workdir, exist_ok=True)
+    report = {
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'seed': seed,
+        'environment': _environment(),
+        'results': [],
+    }
+    try:
+        for n_rows in sizes:
+            csv_path = os.path.join(workdir, f'synthetic_{n_rows}.csv')
+            if not os.path.exists(csv_path):
+                generator.write_csv(csv_path, n_rows, seed=seed)
+            report['results'].append(run_benchmark(csv_path, seed=seed, **kwargs))
+            with open(output, 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2)
+    finally:
+        if not keep_workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+    return report
+
+
+def summarize(result):
+    """Satu baris ringkasan hasil :func:`run_benchmark`."""
+    stages = result['stages']
+    summary = ', '.join(f"{name}={stage['seconds']:.2f}s" for name, stage in stages.items())
+    index_build = stages.get('index_build', {})
+    if 'recall@10' in index_build:
+        summary += (f" ({index_build['backend']} recall@10={index_build['recall@10']:.3f}, "
+                    f"kandidat {index_build['candidate_fraction']:.1%})")
+    return f"{result['n_rows']:>9} baris: {summary}"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark sistem rekomendasi anime.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(DEFAULT_SIZES))
+    parser.add_argument('--template', default='Top_Anime_data.csv')
+    parser.add_argument('--output', default='bench_results.json')
+    parser.add_argument('--workdir', default=None,
+                        help='simpan katalog sintetis di sini agar dapat dipakai ulang')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--exact-limit', type=int, default=100_000,
+                        help='di atas jumlah baris ini indeks dibangun dengan IVF (recall dilaporkan)')
+    parser.add_argument('--join-limit', type=int, default=50_000,
+                        help='di atas jumlah baris ini tahap franchise_join dilewati')
+    args = parser.parse_args(argv)
+    report = run_suite(args.sizes, template_path=args.template, output=args.output,
+                       workdir=args.workdir, seed=args.seed, exact_limit=args.exact_limit,
+                       join_limit=args.join_limit)
+    for result in report['results']:
+        print(summarize(result))
+
+
+if __name__ == '__main__':
+    main()
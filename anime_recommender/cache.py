@@ -0,0 +1,212 @@
+"""Cache hasil rekomendasi di depan artefak model.
+
+Trafik widget rekomendasi terkonsentrasi pada beberapa ratus judul populer,
+sehingga DataFrame hasil rekomendasi yang sama dibentuk berulang kali.
+:class:`RecommendationCache` menyimpan hasil tersebut di cache LRU berukuran
+terbatas dengan TTL opsional. Kunci cache adalah
+``(posisi baris, top_n, filter, collapse_franchises, versi model)``, dan seluruh isi cache
+dibuang otomatis ketika artefak model di disk berganti versi.
+"""
+
+import os
+import time
+from collections import OrderedDict, namedtuple
+
+import numpy as np
+
+from .artifact import MANIFEST_FILE, load_artifact, read_manifest
+from .filters import AttributeIndex, canonical_filters
+from .recommend import recommend_rows
+
+CacheInfo = namedtuple(
+    'CacheInfo', ['hits', 'misses', 'evictions', 'expirations', 'invalidations', 'size', 'maxsize']
+)
+
+
+class LRUCache:
+    """Cache LRU dengan batas ``maxsize`` entri dan TTL opsional (detik).
+
+    Tidak thread-safe; gunakan dari satu thread (misalnya event loop asyncio).
+    """
+
+    def __init__(self, maxsize=1024, ttl=None, timer=time.monotonic):
+        if maxsize <= 0:
+            raise ValueError('maxsize harus lebih besar dari 0')
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.timer = timer
+        self._data = OrderedDict()  # key -> (waktu kedaluwarsa, nilai)
+        self.hits = self.misses = self.evictions = self.expirations = self.invalidations = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key, default=None):
+        entry = self._data.get(key)
+        if entry is not None:
+            expires_at, value = entry
+            if expires_at is None or self.timer() < expires_at:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return value
+            del self._data[key]
+            self.expirations += 1
+        self.misses += 1
+        return default
+
+    def put(self, key, value):
+        expires_at = None if self.ttl is None else self.timer() + self.ttl
+        self._data[key] = (expires_at, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        self._data.clear()
+        self.invalidations += 1
+
+    def info(self):
+        return CacheInfo(self.hits, self.misses, self.evictions, self.expirations,
+                         self.invalidations, len(self._data), self.maxsize)
+
+
+class RecommendationCache:
+    """``get_recommendations`` untuk :class:`~anime_recommender.artifact.ModelArtifact` dengan cache.
+
+    Setiap ``check_interval`` detik (``None`` untuk mematikan), mtime
+    ``manifest.json`` diperiksa; jika artefak di disk sudah berganti versi,
+    artefak dimuat ulang dan cache dikosongkan. DataFrame yang dikembalikan
+    dipakai bersama oleh semua pemanggil dan tidak boleh diubah.
+    """
+
+    def __init__(self, artifact, maxsize=1024, ttl=None, check_interval=1.0,
+                 timer=time.monotonic):
+        self.artifact = artifact
+        self.cache = LRUCache(maxsize=maxsize, ttl=ttl, timer=timer)
+        self.check_interval = check_interval
+        self.timer = timer
+        self._next_check = timer() + (check_interval or 0)
+        self._manifest_mtime = self._stat_manifest()
+        self._attributes = None
+        self._masks = LRUCache(maxsize=128)  # filter kanonik -> mask boolean
+
+    @property
+    def version(self):
+        return self.artifact.version
+
+    def _stat_manifest(self):
+        try:
+            return os.stat(os.path.join(self.artifact.path, MANIFEST_FILE)).st_mtime_ns
+        except OSError:
+            return None
+
+    @property
+    def attributes(self):
+        """:class:`~anime_recommender.filters.AttributeIndex` katalog, dibangun saat pertama dipakai."""
+        if self._attributes is None:
+            self._attributes = AttributeIndex.from_catalog(self.artifact.catalog)
+        return self._attributes
+
+    def set_artifact(self, artifact):
+        """Ganti artefak yang dipakai; cache dikosongkan jika versinya berbeda."""
+        if artifact.version != self.artifact.version:
+            self.cache.clear()
+        self.artifact = artifact
+        self._attributes = None
+        self._masks.clear()
+        self._manifest_mtime = self._stat_manifest()
+
+    def refresh(self):
+        """Muat ulang artefak jika versi di disk berubah. ``True`` jika berganti."""
+        mtime = self._stat_manifest()
+        if mtime == self._manifest_mtime:
+            return False
+        self._manifest_mtime = mtime
+        manifest = read_manifest(self.artifact.path)
+        if manifest is None or manifest['model_version'] == self.version:
+            return False
+        self.set_artifact(load_artifact(self.artifact.path))
+        return True
+
+    def _maybe_refresh(self):
+        if self.check_interval is None:
+            return
+        now = self.timer()
+        if now >= self._next_check:
+            self._next_check = now + self.check_interval
+            self.refresh()
+
+    def _mask(self, filters):
+        key = canonical_filters(filters)
+        mask = self._masks.get(key)
+        if mask is None:
+            mask = self.attributes.mask(filters)
+            self._masks.put(key, mask)
+        return mask
+
+    def _key(self, row, top_n, filters, collapse_franchises=False):
+        return (int(row), top_n, canonical_filters(filters),
+                bool(collapse_franchises), self.version)
+
+    def _compute(self, row, top_n, filters, collapse_franchises=False):
+        neighbor_index = self.artifact.neighbor_index
+        mask = self._mask(filters) if filters else None
+        franchise_labels = None
+        if collapse_franchises:
+            franchise_labels = self.artifact.franchise_labels
+            if franchise_labels is None:
+                raise ValueError('artefak dibangun tanpa franchise_threshold')
+        # Dengan filter atau franchise digabung, tetangga tersimpan bisa kurang
+        # dari top_n sehingga tfidf_matrix selalu disertakan sebagai cadangan
+        needs_matrix = (mask is not None or franchise_labels is not None
+                        or top_n > neighbor_index.k)
+        tfidf_matrix = self.artifact.scorer if needs_matrix else None
+        indices, scores = recommend_rows([row], top_n, neighbor_index=neighbor_index,
+                                         tfidf_matrix=tfidf_matrix, mask=mask,
+                                         franchise_labels=franchise_labels)
+        found = indices[0] >= 0
+        return self.artifact.catalog_store.frame(indices[0][found], scores[0][found])
+
+    def recommend_row(self, row, top_n=10, filters=None, collapse_franchises=False):
+        """Rekomendasi untuk anime di posisi ``row``, dari cache jika ada."""
+        key = self._key(row, top_n, filters, collapse_franchises)
+        recommendations = self.cache.get(key)
+        if recommendations is None:
+            recommendations = self._compute(row, top_n, filters, collapse_franchises)
+            self.cache.put(key, recommendations)
+        return recommendations
+
+    def recommend(self, title, top_n=10, filters=None, collapse_franchises=False):
+        """Rekomendasi untuk ``title``; ``None`` jika judul tidak ditemukan.
+
+        ``filters`` berupa dict dengan format :mod:`anime_recommender.filters`,
+        misalnya ``{'Type': 'TV', 'Score': (8.0, None)}``. Filter diterapkan
+        sebelum seleksi top-K, sehingga hasil hanya kurang dari ``top_n`` jika
+        memang tidak ada cukup anime yang lolos filter. ``collapse_franchises``
+        menampilkan paling banyak satu anime per franchise, tanpa franchise
+        ``title`` sendiri (artefak harus dibangun dengan ``franchise_threshold``).
+        """
+        self._maybe_refresh()
+        row = self.artifact.title_index.resolve(title)
+        if row is None:
+            return None
+        return self.recommend_row(row, top_n, filters, collapse_franchises)
+
+    def warm_up(self, n_titles=200, by='Members', top_n=10):
+        """Isi cache untuk ``n_titles`` anime terpopuler menurut kolom ``by``.
+
+        ``Members`` diurutkan dari terbesar, ``Popularity`` dari terkecil
+        (peringkat 1 paling populer); nilai kosong diurutkan paling akhir.
+        Warm-up tidak dihitung sebagai miss.
+        """
+        values = self.artifact.catalog[by].to_numpy(dtype=np.float64, na_value=np.nan)
+        order = np.argsort(-values if by == 'Members' else values, kind='stable')
+        rows = order[:min(n_titles, self.cache.maxsize)]
+        for row in rows:
+            self.cache.put(self._key(row, top_n, None), self._compute(row, top_n, None))
+        return len(rows)
+
+    def info(self):
+        """Counter hit/miss/eviction/expiration/invalidation dan ukuran cache."""
+        return self.cache.info()
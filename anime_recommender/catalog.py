@@ -0,0 +1,79 @@
+"""Katalog ringkas berorientasi kolom untuk menggabungkan metadata hasil query.
+
+Query rekomendasi cukup menghasilkan array posisi baris dan skor.
+:class:`CatalogStore` menyimpan kolom-kolom yang ditampilkan (``English``,
+``Genres``, ``Score``, ``Type``) sebagai array NumPy terpisah, sehingga
+metadata hanya diambil untuk baris yang benar-benar diminta: satu fancy
+indexing per kolom untuk DataFrame (:meth:`CatalogStore.frame`), atau
+:class:`CatalogRecord` ber-``__slots__`` yang membaca kolom saat diakses.
+"""
+
+import numpy as np
+
+from .recommend import RESULT_COLUMNS
+
+
+class CatalogRecord:
+    """Tampilan satu baris :class:`CatalogStore`; nilai kolom dibaca saat diakses."""
+
+    __slots__ = ('store', 'row')
+
+    def __init__(self, store, row):
+        self.store = store
+        self.row = row
+
+    def __getitem__(self, column):
+        return self.store.columns[column][self.row]
+
+    def as_dict(self):
+        return {column: values[self.row] for column, values in self.store.columns.items()}
+
+    def __repr__(self):
+        return f'CatalogRecord({self.row}, {self.as_dict()!r})'
+
+
+class CatalogStore:
+    """Kolom katalog sebagai array NumPy, diakses per posisi baris."""
+
+    def __init__(self, index, columns):
+        self.index = np.asarray(index)
+        self.columns = {name: np.asarray(values) for name, values in columns.items()}
+
+    @classmethod
+    def from_dataframe(cls, df, columns=RESULT_COLUMNS):
+        arrays = {}
+        for column in columns:
+            series = df[column]
+            if series.dtype.kind in 'iu' and series.hasnans:
+                # Kolom Int64 (nullable) dengan nilai kosong disimpan sebagai float NaN
+                arrays[column] = series.to_numpy(dtype=np.float64, na_value=np.nan)
+            elif series.dtype.kind in 'biuf':
+                arrays[column] = series.to_numpy(dtype=getattr(series.dtype, 'numpy_dtype',
+                                                               series.dtype))
+            else:
+                # Kolom teks/kategori disimpan sebagai array object (NaN tetap NaN)
+                arrays[column] = series.to_numpy(dtype=object)
+        return cls(df.index.to_numpy(), arrays)
+
+    def __len__(self):
+        return len(self.index)
+
+    def take(self, column, indices):
+        """Nilai ``column`` untuk posisi baris ``indices``."""
+        return self.columns[column][indices]
+
+    def record(self, row):
+        return CatalogRecord(self, int(row))
+
+    def records(self, indices):
+        return [CatalogRecord(self, row) for row in np.asarray(indices).tolist()]
+
+    def frame(self, indices, scores=None, columns=None):
+        """DataFrame ``columns`` (+ ``Similarity`` jika ``scores`` diberikan) untuk ``indices``."""
+        import pandas as pd
+
+        indices = np.asarray(indices)
+        data = {column: self.columns[column][indices] for column in (columns or self.columns)}
+        if scores is not None:
+            data['Similarity'] = np.asarray(scores)
+        return pd.DataFrame(data, index=self.index[indices])
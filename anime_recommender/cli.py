@@ -0,0 +1,199 @@
+"""Command line untuk build offline dan query online tanpa notebook.
+
+::
+
+    python -m anime_recommender build --csv Top_Anime_data.csv --artifact artifacts/anime_model \
+        --franchise-threshold 0.5
+    python -m anime_recommender query "Steins;Gate" --top-n 10
+    python -m anime_recommender query "Fate/Zero" --collapse-franchises
+    python -m anime_recommender query --text "dark fantasy revenge"
+    python -m anime_recommender evaluate --k 10 --plots-dir .
+    python -m anime_recommender bench --runs 5
+
+``build`` dan ``evaluate`` adalah jalur offline (pandas, scikit-learn,
+scipy). ``query`` hanya memakai :mod:`anime_recommender.online`, sehingga
+tidak mengimpor pandas maupun scikit-learn kecuali untuk pencarian teks bebas
+atau ``top_n`` di atas K tetangga. ``bench`` mengukur waktu import hingga
+rekomendasi pertama di proses baru dan gagal (exit code 1) jika melebihi
+anggaran :data:`~anime_recommender.online.COLD_START_BUDGET_MS`. Setiap
+subcommand baru mengimpor modul yang dibutuhkannya saat dijalankan.
+"""
+
+import argparse
+import json
+import sys
+
+DEFAULT_CSV = 'Top_Anime_data.csv'
+DEFAULT_ARTIFACT = 'artifacts/anime_model'
+
+
+def cmd_build(args):
+    import time
+
+    from .artifact import build_artifact, is_stale, load_artifact
+
+    options = dict(tfidf_params=None, k=args.k, featurizer=args.featurizer,
+                   tfidf_dtype=args.tfidf_dtype, score_dtype=args.score_dtype,
+                   preprocess={} if args.normalize else None,
+                   franchise_threshold=args.franchise_threshold)
+    start = time.perf_counter()
+    if args.force or is_stale(args.artifact, args.csv, **options):
+        artifact = build_artifact(args.csv, args.artifact, n_jobs=args.n_jobs, **options)
+        action = 'dibangun'
+    else:
+        artifact = load_artifact(args.artifact)
+        action = 'sudah terbaru'
+    print(f'Artefak {artifact.version} {action} di {args.artifact} '
+          f'({len(artifact.neighbor_index)} anime, {time.perf_counter() - start:.2f} detik)')
+    return 0
+
+
+def _print_results(results, as_json):
+    if as_json:
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+        return
+    for rank, item in enumerate(results, start=1):
+        print(f"{rank:>3}. {item['English']}  [{item['Type']}, Score {item['Score']}]"
+              f"  similarity={item['Similarity']:.4f}")
+
+
+def cmd_query(args):
+    from .online import load_query_model
+
+    model = load_query_model(args.artifact)
+    if args.text is not None:
+        results = model.search_records(args.text, top_n=args.top_n)
+        if results is None:
+            print(f"Tidak ada kata dari '{args.text}' yang dikenal model", file=sys.stderr)
+            return 1
+    else:
+        title = ' '.join(args.title)
+        if not title:
+            print('Judul anime atau --text wajib diisi', file=sys.stderr)
+            return 2
+        try:
+            results = model.recommend_records(title, top_n=args.top_n,
+                                              collapse_franchises=args.collapse_franchises)
+        except ValueError as error:
+            print(error, file=sys.stderr)
+            return 2
+        if results is None:
+            suggestions = [label for _, label, _ in model.title_index.suggest(title)]
+            message = f"Anime '{title}' tidak ditemukan"
+            if suggestions:
+                message += '. Mungkin maksud Anda: ' + '; '.join(suggestions)
+            print(message, file=sys.stderr)
+            return 1
+    _print_results(results, args.json)
+    return 0
+
+
+def cmd_evaluate(args):
+    import os
+
+    from .artifact import load_artifact
+    from .evaluation import evaluate_catalog
+
+    artifact = load_artifact(args.artifact)
+    if args.k > artifact.neighbor_index.k:
+        print(f'--k {args.k} melebihi jumlah tetangga di artefak ({artifact.neighbor_index.k}); '
+              f'bangun ulang dengan build --k {args.k}', file=sys.stderr)
+        return 2
+    # Matriks TF-IDF selalu disertakan agar ILS (keragaman hasil) ikut dihitung
+    _, summary = evaluate_catalog(artifact.neighbor_index, artifact.catalog['Genres'],
+                                  artifact.tfidf_matrix, k=args.k, n_jobs=args.n_jobs)
+    for name, value in summary.items():
+        print(f'{name}: {value:.4f}' if isinstance(value, float) else f'{name}: {value}')
+    if args.plots_dir:
+        from .plots import plot_score_distribution, plot_top_anime
+
+        os.makedirs(args.plots_dir, exist_ok=True)
+        plot_score_distribution(artifact.catalog, os.path.join(args.plots_dir,
+                                                               'distribusi_rating_anime.jpg'),
+                                show=False)
+        plot_top_anime(artifact.catalog, path=os.path.join(args.plots_dir, 'top_10_anime.jpg'),
+                       show=False)
+        print(f'Grafik ditulis ke {args.plots_dir}')
+    return 0
+
+
+def cmd_bench(args):
+    from .bench import measure_cold_start, run_suite, summarize
+
+    result = measure_cold_start(args.artifact, args.title, runs=args.runs)
+    print(f"Cold start import -> rekomendasi pertama: median {result['median_ms']:.1f} ms, "
+          f"maks {result['max_ms']:.1f} ms (proses {result['process_median_ms']:.1f} ms, "
+          f"anggaran {args.budget_ms} ms)")
+    if result['heavy_modules']:
+        print('Modul berat yang ikut terimpor: ' + ', '.join(result['heavy_modules']))
+    if args.sizes:
+        report = run_suite(args.sizes, template_path=args.csv, output=args.output)
+        for item in report['results']:
+            print(summarize(item))
+    if result['median_ms'] > args.budget_ms:
+        print('Cold start melebihi anggaran', file=sys.stderr)
+        return 1
+    return 0
+
+
+def build_parser():
+    from .online import COLD_START_BUDGET_MS
+
+    parser = argparse.ArgumentParser(prog='python -m anime_recommender',
+                                     description='Sistem rekomendasi anime berbasis konten.')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    build = commands.add_parser('build', help='bangun artefak model dari CSV (offline)')
+    build.add_argument('--csv', default=DEFAULT_CSV)
+    build.add_argument('--artifact', default=DEFAULT_ARTIFACT)
+    build.add_argument('--k', type=int, default=50, help='jumlah tetangga yang disimpan')
+    build.add_argument('--featurizer', choices=['tfidf', 'hashing'], default='tfidf')
+    build.add_argument('--tfidf-dtype', choices=['float64', 'float32'], default='float64')
+    build.add_argument('--score-dtype', choices=['float32', 'float16', 'int8'],
+                       default='float32')
+    build.add_argument('--normalize', action='store_true',
+                       help='normalisasi teks content_features sebelum TF-IDF')
+    build.add_argument('--franchise-threshold', type=float,
+                       help='simpan label franchise dari similarity join dan judul (misalnya 0.5)')
+    build.add_argument('--n-jobs', type=int, default=1)
+    build.add_argument('--force', action='store_true', help='build ulang walaupun tidak basi')
+    build.set_defaults(handler=cmd_build)
+
+    query = commands.add_parser('query', help='rekomendasi untuk satu judul (online)')
+    query.add_argument('title', nargs='*', help='judul anime (English, Synonyms atau Japanese)')
+    query.add_argument('--text', help='pencarian teks bebas alih-alih judul')
+    query.add_argument('--artifact', default=DEFAULT_ARTIFACT)
+    query.add_argument('--top-n', type=int, default=10)
+    query.add_argument('--collapse-franchises', action='store_true',
+                       help='paling banyak satu anime per franchise, tanpa franchise judul input '
+                            '(butuh --franchise-threshold)')
+    query.add_argument('--json', action='store_true', help='tulis hasil sebagai JSON')
+    query.set_defaults(handler=cmd_query)
+
+    evaluate = commands.add_parser('evaluate', help='evaluasi Precision@K seluruh katalog')
+    evaluate.add_argument('--artifact', default=DEFAULT_ARTIFACT)
+    evaluate.add_argument('--k', type=int, default=10)
+    evaluate.add_argument('--n-jobs', type=int, default=1)
+    evaluate.add_argument('--plots-dir', help='tulis grafik distribusi rating dan top 10 di sini')
+    evaluate.set_defaults(handler=cmd_evaluate)
+
+    bench = commands.add_parser('bench', help='ukur cold start jalur query (dan benchmark sintetis)')
+    bench.add_argument('--artifact', default=DEFAULT_ARTIFACT)
+    bench.add_argument('--title', default='Steins;Gate')
+    bench.add_argument('--runs', type=int, default=5)
+    bench.add_argument('--budget-ms', type=float, default=COLD_START_BUDGET_MS)
+    bench.add_argument('--sizes', type=int, nargs='*', default=[],
+                       help='ukuran katalog sintetis untuk benchmark build/query')
+    bench.add_argument('--csv', default=DEFAULT_CSV, help='template katalog sintetis')
+    bench.add_argument('--output', default='bench_results.json')
+    bench.set_defaults(handler=cmd_bench)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,138 @@
+"""Data preparation dan ekstraksi fitur TF-IDF, sama seperti di notebook.
+
+Langkah-langkah di sini mengikuti bagian *Data Preparation* dan *TF-IDF
+Vectorization* pada notebook agar build offline menghasilkan model yang sama
+dengan yang dijelaskan di sana.
+"""
+
+import numpy as np
+import pandas as pd
+
+from .instrument import timed
+
+# Nilai pengisi missing values (bagian "Handling Missing Values")
+FILL_VALUES = {
+    'Description': 'No description available',
+    'Genres': 'Unknown',
+    'Type': 'Unknown',
+    'Demographic': 'Unknown',
+    'Source': 'Unknown',
+    'Synonyms': 'No synonyms',
+    'Broadcast': 'Unknown',
+}
+
+TFIDF_PARAMS = {
+    'stop_words': 'english',  # Menghapus kata-kata umum dalam bahasa Inggris
+    'ngram_range': (1, 2),    # Menggunakan unigram dan bigram
+    'max_features': 5000,     # Maksimum 5000 fitur
+}
+
+
+def fill_missing_values(df):
+    """Isi missing values dengan nilai default pada ``FILL_VALUES``."""
+    df = df.copy()
+    for column, value in FILL_VALUES.items():
+        if column in df.columns:
+            series = df[column]
+            # Kolom kategorikal harus punya kategori pengisi sebelum fillna
+            if isinstance(series.dtype, pd.CategoricalDtype) and value not in series.cat.categories:
+                series = series.cat.add_categories([value])
+            df[column] = series.fillna(value)
+    return df
+
+
+def build_content_features(df):
+    """Gabungan ``Genres``, ``Type`` dan ``Description`` dalam huruf kecil."""
+    content = (
+        df['Genres'].astype(str).str.lower() + ' ' +
+        df['Type'].astype(str).str.lower() + ' ' +
+        df['Description'].astype(str).str.lower()
+    )
+    return content.fillna('').astype(str)
+
+
+def prepare_catalog(df):
+    """Hapus duplikat, isi missing values dan tambahkan kolom ``content_features``."""
+    df = fill_missing_values(df.drop_duplicates()).reset_index(drop=True)
+    df['content_features'] = build_content_features(df)
+    return df
+
+
+def prepare_chunks(chunks):
+    """Versi streaming :func:`prepare_catalog` untuk chunk dari ``iter_catalog``.
+
+    Duplikat dibuang juga antar chunk (berdasarkan hash baris) dan index
+    setiap chunk melanjutkan chunk sebelumnya, sehingga hasilnya sama dengan
+    :func:`prepare_catalog` pada seluruh file.
+    """
+    seen = set()
+    offset = 0
+    for chunk in chunks:
+        hashes = pd.util.hash_pandas_object(chunk, index=False).tolist()
+        keep = []
+        for value in hashes:
+            keep.append(value not in seen)
+            seen.add(value)
+        chunk = fill_missing_values(chunk[keep])
+        chunk.index = pd.RangeIndex(offset, offset + len(chunk))
+        offset += len(chunk)
+        chunk['content_features'] = build_content_features(chunk)
+        yield chunk
+
+
+@timed('tfidf_fit')
+def fit_tfidf(texts, params=None, dtype='float64'):
+    """Fit ``TfidfVectorizer`` dan kembalikan ``(vectorizer, tfidf_matrix)``.
+
+    ``dtype='float32'`` menyimpan bobot TF-IDF dengan separuh memori.
+    """
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+    vectorizer = TfidfVectorizer(dtype=np.dtype(dtype).type,
+                                 **(TFIDF_PARAMS if params is None else params))
+    return vectorizer, vectorizer.fit_transform(texts)
+
+
+# Jumlah bit sidik jari unigram korpus fit (acuan vocabulary drift)
+UNIGRAM_BITS = 2 ** 23
+
+# Parameter vectorizer yang menentukan tokenisasi
+_TOKEN_PARAMS = ('lowercase', 'stop_words', 'strip_accents', 'token_pattern')
+
+
+def _unigram_counts(texts, params):
+    from sklearn.feature_extraction.text import HashingVectorizer
+
+    # Tokenisasi sama seperti vectorizer, tetapi hanya unigram dan tanpa pemangkasan
+    vectorizer = HashingVectorizer(
+        n_features=UNIGRAM_BITS, alternate_sign=False, norm=None,
+        **{key: value for key, value in params.items() if key in _TOKEN_PARAMS}
+    )
+    return vectorizer.transform(texts)
+
+
+@timed('unigram_fingerprint')
+def unigram_fingerprint(texts, params=None, batch_size=10_000):
+    """Bitset (``np.packbits``) unigram yang muncul di ``texts``.
+
+    Berbeda dengan vocabulary vectorizer, sidik jari ini tidak terpangkas
+    ``max_features`` dan juga tersedia untuk featurizer hashing.
+    """
+    params = TFIDF_PARAMS if params is None else params
+    texts = list(texts)
+    seen = np.zeros(UNIGRAM_BITS, dtype=bool)
+    for start in range(0, len(texts), batch_size):
+        seen[_unigram_counts(texts[start:start + batch_size], params).indices] = True
+    return np.packbits(seen)
+
+
+@timed('novel_count')
+def count_novel_tokens(fingerprint, texts, params=None):
+    """Hitung ``(jumlah_token, token_baru)`` unigram pada ``texts``.
+
+    Token baru adalah token yang tidak pernah muncul di korpus ``fingerprint``
+    (lihat :func:`unigram_fingerprint`).
+    """
+    counts = _unigram_counts(texts, TFIDF_PARAMS if params is None else params).tocoo()
+    seen = np.unpackbits(fingerprint, count=UNIGRAM_BITS).astype(bool)
+    return int(counts.data.sum()), int(counts.data[~seen[counts.col]].sum())
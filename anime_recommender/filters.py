@@ -0,0 +1,202 @@
+"""Filter atribut untuk rekomendasi, berbasis bitset yang dihitung sekali.
+
+Memfilter DataFrame hasil setelah top-10 sering menyisakan terlalu sedikit
+rekomendasi. :class:`AttributeIndex` menyimpan satu bitset (array ``uint8``
+hasil ``np.packbits``) per nilai atribut ``Type``, ``Genres``,
+``Demographic``, ``Source``, ``Rating`` dan ``Status``, ditambah array
+``Score`` untuk filter rentang. Filter digabung dengan operasi bitwise
+menjadi satu mask boolean yang diterapkan sebelum seleksi top-K oleh
+:func:`filtered_top_k`.
+
+Format filter berupa dict ``{kolom: spesifikasi}``:
+
+* ``{'Type': 'TV'}`` atau ``{'Type': ['TV', 'ONA']}`` -- salah satu nilai
+* ``{'Genres': {'all': ['Action', 'Drama']}}`` -- harus memiliki semua nilai
+* ``{'Rating': {'none': ['R+ - Mild Nudity']}}`` -- tidak boleh memiliki nilai
+* ``{'Score': (8.5, None)}`` -- rentang ``Score`` inklusif, ``None`` = terbuka
+
+Kunci ``any``, ``all`` dan ``none`` dapat digabung dalam satu dict. Nilai
+dicocokkan setelah dinormalisasi dengan :func:`genre_key` di semua kolom
+(``'Shounen'`` cocok dengan ``ShounenShounen`` di CSV), dan nilai yang tidak
+pernah muncul di katalog menghasilkan ``ValueError``.
+"""
+
+import numpy as np
+
+from .neighbors import cosine_scorer, top_k_rows
+
+FILTER_COLUMNS = ('Type', 'Genres', 'Demographic', 'Source', 'Rating', 'Status')
+# Kolom berisi beberapa nilai dipisah koma
+MULTI_VALUE_COLUMNS = ('Genres',)
+SPEC_KEYS = ('any', 'all', 'none')
+
+
+def genre_key(genre):
+    """Kunci nilai atribut: huruf kecil, tanpa spasi tepi dan tanpa duplikasi ``ActionAction``."""
+    key = genre.strip().lower()
+    half = len(key) // 2
+    if len(key) % 2 == 0 and key[:half] == key[half:]:
+        return key[:half]
+    return key
+
+
+def _as_list(value):
+    if value is None:
+        return []
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return list(value)
+    return [value]
+
+
+def _parse_spec(spec):
+    if isinstance(spec, dict):
+        unknown = set(spec) - set(SPEC_KEYS)
+        if unknown:
+            raise ValueError(f'Kunci filter tidak dikenal: {sorted(unknown)}')
+        return tuple(_as_list(spec.get(key)) for key in SPEC_KEYS)
+    return _as_list(spec), [], []
+
+
+def canonical_filters(filters):
+    """Bentuk kanonik ``filters`` yang hashable, untuk kunci cache.
+
+    Spesifikasi diurai seperti di :meth:`AttributeIndex.mask` dan nilainya
+    dinormalisasi dengan :func:`genre_key`, sehingga ``{'Type': 'TV'}``,
+    ``{'Type': ['tv']}`` dan ``{'Type': {'any': ['TV']}}`` menghasilkan kunci
+    yang sama, begitu pula urutan kolom dan nilai yang berbeda. Kembalikan
+    ``None`` jika tidak ada filter yang membatasi.
+    """
+    canonical = []
+    for column, spec in (filters or {}).items():
+        if column == 'Score':
+            low, high = spec
+            canonical.append((column, (None if low is None else float(low),
+                                       None if high is None else float(high))))
+            continue
+        parts = tuple(tuple(sorted({genre_key(value) for value in values}))
+                      for values in _parse_spec(spec))
+        if any(parts):
+            canonical.append((column, parts))
+    return tuple(sorted(canonical)) or None
+
+
+class AttributeIndex:
+    """Bitset per nilai atribut katalog untuk membentuk mask filter."""
+
+    def __init__(self, n_items, bitsets, scores):
+        self.n_items = n_items
+        self.bitsets = bitsets  # {kolom: {nilai: bitset uint8}}
+        self.scores = scores
+
+    @classmethod
+    def from_catalog(cls, catalog, columns=FILTER_COLUMNS):
+        n = len(catalog)
+        bitsets = {}
+        for column in columns:
+            if column not in catalog.columns:
+                continue
+            rows_by_value = {}
+            for row, value in enumerate(catalog[column].tolist()):
+                if not isinstance(value, str):
+                    continue
+                if column in MULTI_VALUE_COLUMNS:
+                    keys = {genre_key(g) for g in value.split(',') if g.strip()}
+                else:
+                    keys = (genre_key(value),)
+                for key in keys:
+                    rows_by_value.setdefault(key, []).append(row)
+            column_bitsets = {}
+            for key, rows in rows_by_value.items():
+                mask = np.zeros(n, dtype=bool)
+                mask[rows] = True
+                column_bitsets[key] = np.packbits(mask, bitorder='little')
+            bitsets[column] = column_bitsets
+        scores = catalog['Score'].to_numpy(dtype=np.float32) if 'Score' in catalog.columns else None
+        return cls(n, bitsets, scores)
+
+    def values(self, column):
+        """Nilai (ternormalisasi) yang dikenal untuk ``column``."""
+        return sorted(self.bitsets[column])
+
+    def _bits(self, column, value):
+        bits = self.bitsets[column].get(genre_key(value))
+        if bits is None:
+            raise ValueError(f'Nilai {value!r} tidak dikenal untuk kolom {column}')
+        return bits
+
+    def mask(self, filters):
+        """Mask boolean ``N`` anime yang lolos semua ``filters`` (``None`` jika kosong)."""
+        if not filters:
+            return None
+        packed = np.full((self.n_items + 7) // 8, 0xFF, dtype=np.uint8)
+        for column, spec in filters.items():
+            if column == 'Score':
+                if self.scores is None:
+                    raise ValueError('Katalog tidak memiliki kolom Score')
+                low, high = spec
+                in_range = np.ones(self.n_items, dtype=bool)
+                if low is not None:
+                    in_range &= self.scores >= low
+                if high is not None:
+                    in_range &= self.scores <= high
+                packed &= np.packbits(in_range, bitorder='little')
+                continue
+            if column not in self.bitsets:
+                raise ValueError(f'Kolom filter tidak didukung: {column}')
+            any_of, all_of, none_of = _parse_spec(spec)
+            if any_of:
+                packed &= np.bitwise_or.reduce([self._bits(column, v) for v in any_of])
+            for value in all_of:
+                packed &= self._bits(column, value)
+            for value in none_of:
+                packed &= ~self._bits(column, value)
+        return np.unpackbits(packed, count=self.n_items, bitorder='little').view(bool)
+
+
+def filtered_top_k(rows, k, mask, neighbor_index=None, tfidf_matrix=None, chunk_size=256):
+    """Top-K tetangga yang lolos ``mask`` untuk ``rows`` (tanpa dirinya sendiri).
+
+    Daftar tetangga di ``neighbor_index`` adalah awalan terurut dari baris
+    similarity penuh, sehingga jika minimal K tetangga tersimpan lolos filter,
+    hasilnya sama persis dengan memfilter baris penuh. Baris lainnya dihitung
+    dari ``tfidf_matrix`` (sebaiknya :class:`~anime_recommender.neighbors.CosineScorer`
+    milik artefak agar transpos katalog tidak dibentuk ulang): anime yang
+    tidak lolos diberi skor ``-inf`` pada baris similarity sebelum top-K
+    dipilih. Tanpa ``tfidf_matrix``, baris
+    tersebut hanya berisi tetangga tersimpan yang lolos. Slot kosong bernilai
+    ``-1``/``-inf``.
+    """
+    rows = np.asarray(rows, dtype=np.int64)
+    mask = np.asarray(mask, dtype=bool)
+    indices = np.full((len(rows), k), -1, dtype=np.int32)
+    scores = np.full((len(rows), k), -np.inf, dtype=np.float32)
+    pending = np.ones(len(rows), dtype=bool)
+
+    if neighbor_index is not None:
+        candidates = np.asarray(neighbor_index.indices[rows])
+        candidate_scores = np.asarray(neighbor_index.scores[rows])
+        keep = (candidates >= 0) & mask[np.maximum(candidates, 0)]
+        # Ambil kandidat yang lolos dengan urutan semula
+        order = np.argsort(~keep, axis=1, kind='stable')[:, :k]
+        width = order.shape[1]
+        valid = np.take_along_axis(keep, order, axis=1)
+        indices[:, :width] = np.where(valid, np.take_along_axis(candidates, order, axis=1), -1)
+        scores[:, :width] = np.where(valid, np.take_along_axis(candidate_scores, order, axis=1),
+                                     -np.inf)
+        complete = neighbor_index.k >= len(mask) - 1
+        pending = ~(complete | (keep.sum(axis=1) >= k))
+
+    todo = rows[pending]
+    if len(todo) and tfidf_matrix is not None:
+        scorer = cosine_scorer(tfidf_matrix)
+        positions = np.flatnonzero(pending)
+        for start in range(0, len(todo), chunk_size):
+            chunk = todo[start:start + chunk_size]
+            block = scorer.block(chunk)
+            block[:, ~mask] = -np.inf
+            idx, vals = top_k_rows(block, k, exclude=chunk)
+            target = positions[start:start + len(chunk)]
+            width = idx.shape[1]
+            indices[target, :width] = np.where(np.isfinite(vals), idx, -1)
+            scores[target, :width] = vals
+    return indices, scores
@@ -0,0 +1,131 @@
+"""Featurisasi TF-IDF out-of-core dengan feature hashing.
+
+``TfidfVectorizer`` harus melihat seluruh korpus di satu proses untuk
+membangun vocabulary-nya. :class:`HashingTfidf` tidak memiliki vocabulary:
+setiap term di-hash ke salah satu dari ``n_features`` kolom, sehingga chunk
+teks dapat di-tokenize dan di-hash secara independen di beberapa proses
+worker. Setiap worker mengembalikan matriks count sparse dan jumlah dokumen
+per kolom (document frequency); keduanya digabung di proses utama, lalu
+diberi bobot IDF dan dinormalisasi L2 dengan rumus yang sama seperti
+``TfidfVectorizer`` (``smooth_idf=True``). Hasilnya dapat langsung dipakai
+oleh :func:`~anime_recommender.neighbors.build_neighbor_index`.
+"""
+
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .instrument import timed
+
+HASHING_PARAMS = {
+    'stop_words': 'english',  # Sama seperti TFIDF_PARAMS
+    'ngram_range': (1, 2),
+    'n_features': 2 ** 18,    # Jumlah kolom hash (pengganti max_features)
+}
+
+
+def _hashing_vectorizer(params):
+    from sklearn.feature_extraction.text import HashingVectorizer
+
+    # Count mentah: tanpa tanda bergantian dan tanpa normalisasi
+    return HashingVectorizer(alternate_sign=False, norm=None, **params)
+
+
+def hash_counts(texts, params):
+    """Matriks count CSR dan document frequency per kolom untuk ``texts``."""
+    counts = _hashing_vectorizer(params).transform(texts)
+    return counts, np.bincount(counts.indices, minlength=counts.shape[1])
+
+
+def _batches(chunks, batch_size):
+    for chunk in chunks:
+        texts = list(chunk)
+        for start in range(0, len(texts), batch_size):
+            yield texts[start:start + batch_size]
+
+
+class HashingTfidf:
+    """Pengganti ``TfidfVectorizer`` berbasis feature hashing.
+
+    Atribut ``idf_`` tersedia setelah :meth:`fit_transform_chunks`. Objek ini
+    dapat disimpan dengan joblib seperti vectorizer biasa.
+    """
+
+    def __init__(self, params=None, dtype='float64'):
+        self.params = dict(HASHING_PARAMS if params is None else params)
+        self.dtype = dtype
+        self.n_docs = 0
+        self.document_frequency = np.zeros(self.params['n_features'], dtype=np.int64)
+        self.idf_ = None
+
+    def build_analyzer(self):
+        return _hashing_vectorizer(self.params).build_analyzer()
+
+    def _map_counts(self, chunks, n_jobs, batch_size):
+        batches = _batches(chunks, batch_size)
+        if n_jobs == 1:
+            for texts in batches:
+                yield hash_counts(texts, self.params)
+            return
+        with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+            # Paling banyak 2 * n_jobs batch diproses bersamaan agar memori tetap
+            # terbatas; hasil diambil sesuai urutan batch
+            pending = deque()
+            for texts in batches:
+                pending.append(pool.submit(hash_counts, texts, self.params))
+                if len(pending) >= 2 * n_jobs:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+
+    def fit_transform_chunks(self, chunks, n_jobs=1, batch_size=10_000):
+        """Fit IDF dan transform sekaligus dari iterable chunk teks.
+
+        ``chunks`` berupa iterable (misalnya generator) berisi kumpulan teks
+        ``content_features``; setiap chunk dipecah lagi menjadi batch
+        ``batch_size`` dokumen yang dikerjakan ``n_jobs`` proses worker
+        (``-1`` untuk semua core).
+        """
+        from scipy import sparse
+
+        if n_jobs == -1:
+            n_jobs = os.cpu_count() or 1
+        self.n_docs = 0
+        self.document_frequency = np.zeros(self.params['n_features'], dtype=np.int64)
+        parts = []
+        for counts, document_frequency in self._map_counts(chunks, n_jobs, batch_size):
+            parts.append(counts)
+            self.document_frequency += document_frequency
+            self.n_docs += counts.shape[0]
+        self.idf_ = np.log((1 + self.n_docs) / (1 + self.document_frequency)) + 1
+        if parts:
+            counts = sparse.vstack(parts, format='csr')
+        else:
+            counts = sparse.csr_matrix((0, self.params['n_features']))
+        return self._weight(counts)
+
+    def _weight(self, counts):
+        from sklearn.preprocessing import normalize
+
+        weighted = counts.tocsr(copy=True).astype(self.dtype)
+        weighted.data *= self.idf_[weighted.indices]
+        return normalize(weighted, norm='l2', copy=False)
+
+    def transform(self, texts):
+        """Vektor TF-IDF ternormalisasi L2 untuk teks baru dengan IDF yang sudah di-fit."""
+        if self.idf_ is None:
+            raise ValueError('HashingTfidf belum di-fit')
+        counts, _ = hash_counts(texts, self.params)
+        return self._weight(counts)
+
+
+@timed('tfidf_fit')
+def fit_hashing_tfidf(chunks, params=None, n_jobs=1, batch_size=10_000, dtype='float64'):
+    """Padanan :func:`~anime_recommender.features.fit_tfidf` untuk mode hashing.
+
+    Kembalikan ``(vectorizer, tfidf_matrix)``.
+    """
+    vectorizer = HashingTfidf(params, dtype=dtype)
+    return vectorizer, vectorizer.fit_transform_chunks(chunks, n_jobs=n_jobs, batch_size=batch_size)
@@ -0,0 +1,121 @@
+"""Pemuatan file katalog ``Top_Anime_data.csv``.
+
+Encoding dideteksi sekali dari sampel byte di awal file, lalu CSV dibaca
+satu kali dengan tipe kolom eksplisit. Untuk dump katalog yang sangat besar,
+:func:`iter_catalog` membaca per chunk sehingga memori yang dipakai dibatasi
+ukuran chunk, bukan ukuran file. Kegagalan baca selalu menghasilkan
+``ValueError`` yang menyebutkan file dan penyebabnya: byte yang tidak sesuai
+encoding, atau nilai yang tidak sesuai tipe kolom.
+"""
+
+import codecs
+
+import pandas as pd
+
+from .instrument import timed
+
+FALLBACK_ENCODING = 'ISO-8859-1'
+
+# Kolom kategorikal dengan sedikit nilai unik
+CATEGORY_COLUMNS = ('Type', 'Demographic', 'Source', 'Rating')
+
+# Kolom integer memakai Int64 (nullable) karena sel kosong valid di dump katalog
+COLUMN_DTYPES = {
+    'Score': 'float64',
+    'Popularity': 'Int64',
+    'Rank': 'Int64',
+    'Members': 'Int64',
+    **{column: 'category' for column in CATEGORY_COLUMNS},
+}
+
+# Kolom yang dibutuhkan untuk membangun model dan menampilkan rekomendasi
+MODEL_COLUMNS = (
+    'Score', 'Popularity', 'Rank', 'Members', 'Description', 'Synonyms', 'Japanese',
+    'English', 'Type', 'Status', 'Source', 'Genres', 'Demographic', 'Rating',
+)
+
+
+def detect_encoding(path, sample_size=1 << 20):
+    """Tebak encoding dari ``sample_size`` byte pertama file.
+
+    ``utf-8`` (atau ``utf-8-sig`` jika ada BOM) dipakai jika sampel valid,
+    selain itu ``ISO-8859-1`` yang dapat membaca byte apa pun.
+    """
+    with open(path, 'rb') as f:
+        sample = f.read(sample_size)
+    if sample.startswith(codecs.BOM_UTF8):
+        return 'utf-8-sig'
+    try:
+        # Sampel bisa terpotong di tengah karakter multi-byte
+        codecs.getincrementaldecoder('utf-8')().decode(sample, final=len(sample) < sample_size)
+    except UnicodeDecodeError:
+        return FALLBACK_ENCODING
+    return 'utf-8'
+
+
+def _decode_error(path, encoding, exc):
+    return ValueError(f'Tidak dapat membaca {path} dengan encoding {encoding}: {exc}')
+
+
+def _dtype_error(path, dtype, exc):
+    return ValueError(f'Nilai di {path} tidak sesuai tipe kolom {dtype}: {exc}')
+
+
+def _read_options(path, usecols, encoding):
+    try:
+        header = pd.read_csv(path, encoding=encoding, nrows=0).columns
+    except UnicodeDecodeError as exc:
+        raise _decode_error(path, encoding, exc) from exc
+    if usecols is not None:
+        missing = [column for column in usecols if column not in header]
+        if missing:
+            raise ValueError(f'Kolom {missing} tidak ditemukan di {path}')
+        header = [column for column in header if column in usecols]
+    dtype = {column: COLUMN_DTYPES[column] for column in header if column in COLUMN_DTYPES}
+    return {'encoding': encoding, 'usecols': usecols, 'dtype': dtype}
+
+
+@timed('read_csv')
+def read_catalog(path, usecols=MODEL_COLUMNS, encoding=None):
+    """Baca CSV katalog sekaligus.
+
+    ``usecols=None`` membaca semua kolom. Jika ``encoding`` tidak diberikan,
+    encoding dideteksi dengan :func:`detect_encoding`.
+    """
+    encoding = encoding or detect_encoding(path)
+    options = _read_options(path, usecols, encoding)
+    try:
+        return pd.read_csv(path, **options)
+    except UnicodeDecodeError as exc:
+        raise _decode_error(path, encoding, exc) from exc
+    except ValueError as exc:
+        raise _dtype_error(path, options['dtype'], exc) from exc
+
+
+def iter_catalog(path, chunksize=100_000, usecols=MODEL_COLUMNS, encoding=None):
+    """Baca CSV katalog per chunk berisi maksimal ``chunksize`` baris.
+
+    Kategori kolom kategorikal dapat berbeda antar chunk; gunakan
+    :func:`concat_chunks` untuk menggabungkannya kembali.
+    """
+    encoding = encoding or detect_encoding(path)
+    options = _read_options(path, usecols, encoding)
+    try:
+        with pd.read_csv(path, chunksize=chunksize, **options) as reader:
+            yield from reader
+    except UnicodeDecodeError as exc:
+        raise _decode_error(path, encoding, exc) from exc
+    except ValueError as exc:
+        raise _dtype_error(path, options['dtype'], exc) from exc
+
+
+def apply_category_dtypes(df):
+    """Ubah kolom ``CATEGORY_COLUMNS`` yang ada di ``df`` menjadi ``category``."""
+    columns = [column for column in CATEGORY_COLUMNS if column in df.columns]
+    return df.astype({column: 'category' for column in columns})
+
+
+def concat_chunks(chunks):
+    """Gabungkan chunk menjadi satu DataFrame dengan index dan kategori baru."""
+    # Chunk dengan kategori berbeda digabung sebagai object, lalu dikembalikan
+    return apply_category_dtypes(pd.concat(chunks, ignore_index=True))
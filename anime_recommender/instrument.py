@@ -0,0 +1,310 @@
+"""Instrumentasi tahap pipeline: timer, counter, memori dan profil opsional.
+
+Tahap-tahap pipeline (membaca CSV, membentuk ``content_features``, fit
+TF-IDF, membangun indeks tetangga, query rekomendasi, evaluasi) dibungkus
+dengan :func:`stage`, :func:`timed` atau :func:`timed_iter`. Selama
+instrumentasi tidak diaktifkan, pembungkus tersebut hanya memeriksa satu flag
+sehingga biayanya dapat diabaikan. Setelah :func:`enable`, setiap tahap
+mencatat jumlah panggilan, waktu total/maksimum, waktu CPU dan *self time*
+(tanpa tahap anak)::
+
+    from anime_recommender import instrument
+
+    instrument.enable(trace_memory=True)
+    artifact = build_artifact('Top_Anime_data.csv', 'artifacts/anime_model')
+    print(instrument.format_report())
+    instrument.write_prometheus('artifacts/metrics.prom')
+
+``trace_memory=True`` memakai ``tracemalloc`` untuk mencatat alokasi bersih
+dan puncak memori per tahap, sedangkan ``profile=True`` menjalankan
+``cProfile`` selama instrumentasi aktif (lihat :func:`profile_report`).
+Keduanya menambah overhead cukup besar dan hanya untuk diagnosis. Hasil dapat
+diekspor sebagai log terstruktur JSON Lines (:func:`write_log`) atau format
+teks Prometheus (:func:`write_prometheus`). Tidak thread-safe: catatan tahap
+diasumsikan berasal dari satu thread.
+"""
+
+import functools
+import io
+import json
+import time
+
+METRIC_PREFIX = 'anime_recommender'
+
+
+class StageStats:
+    """Akumulasi statistik satu tahap."""
+
+    __slots__ = ('count', 'total_seconds', 'self_seconds', 'cpu_seconds', 'max_seconds',
+                 'allocated_bytes', 'peak_bytes')
+
+    def __init__(self):
+        self.count = 0
+        self.total_seconds = 0.0
+        self.self_seconds = 0.0
+        self.cpu_seconds = 0.0
+        self.max_seconds = 0.0
+        self.allocated_bytes = 0
+        self.peak_bytes = 0
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class _NullStage:
+    """Context manager kosong yang dipakai saat instrumentasi tidak aktif."""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+class _Stage:
+    __slots__ = ('owner', 'name', 'start', 'cpu_start', 'child_seconds', 'memory_start',
+                 'memory_peak')
+
+    def __init__(self, owner, name):
+        self.owner = owner
+        self.name = name
+
+    def __enter__(self):
+        owner = self.owner
+        if owner.trace_memory:
+            import tracemalloc
+
+            current, peak = tracemalloc.get_traced_memory()
+            if owner._stack:
+                # Puncak milik tahap induk disimpan sebelum counter puncak direset
+                parent = owner._stack[-1]
+                parent.memory_peak = max(parent.memory_peak, peak)
+            tracemalloc.reset_peak()
+            self.memory_start = self.memory_peak = current
+        self.child_seconds = 0.0
+        owner._stack.append(self)
+        self.cpu_start = time.process_time()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.start
+        cpu = time.process_time() - self.cpu_start
+        owner = self.owner
+        owner._stack.pop()
+        stats = owner.stages.get(self.name)
+        if stats is None:
+            stats = owner.stages[self.name] = StageStats()
+        stats.count += 1
+        stats.total_seconds += elapsed
+        stats.self_seconds += elapsed - self.child_seconds
+        stats.cpu_seconds += cpu
+        stats.max_seconds = max(stats.max_seconds, elapsed)
+        if owner._stack:
+            owner._stack[-1].child_seconds += elapsed
+        if owner.trace_memory:
+            import tracemalloc
+
+            current, peak = tracemalloc.get_traced_memory()
+            self.memory_peak = max(self.memory_peak, peak)
+            stats.allocated_bytes += current - self.memory_start
+            stats.peak_bytes = max(stats.peak_bytes, self.memory_peak - self.memory_start)
+            if owner._stack:
+                parent = owner._stack[-1]
+                parent.memory_peak = max(parent.memory_peak, self.memory_peak)
+        return False
+
+
+class Instrumentation:
+    """Registry tahap dan counter; satu instance global dipakai seluruh paket."""
+
+    def __init__(self):
+        self.enabled = False
+        self.trace_memory = False
+        self.profiler = None
+        self.stages = {}
+        self.counters = {}
+        self._stack = []
+        self._started_tracemalloc = False
+
+    def enable(self, profile=False, trace_memory=False):
+        """Aktifkan pencatatan; ``profile``/``trace_memory`` untuk diagnosis mendalam."""
+        if trace_memory:
+            import tracemalloc
+
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._started_tracemalloc = True
+        if profile and self.profiler is None:
+            import cProfile
+
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+        self.trace_memory = trace_memory
+        self.enabled = True
+
+    def disable(self):
+        """Hentikan pencatatan. Statistik yang sudah terkumpul tetap tersedia."""
+        self.enabled = False
+        if self.profiler is not None:
+            self.profiler.disable()
+        if self._started_tracemalloc:
+            import tracemalloc
+
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+        self.trace_memory = False
+
+    def reset(self):
+        """Kosongkan statistik tahap, counter dan profil."""
+        self.stages.clear()
+        self.counters.clear()
+        if self.profiler is not None:
+            self.profiler.disable()
+            self.profiler = None
+
+    def stage(self, name):
+        """Context manager yang mencatat satu eksekusi tahap ``name``."""
+        if not self.enabled:
+            return _NULL_STAGE
+        return _Stage(self, name)
+
+    def timed(self, name=None):
+        """Decorator: setiap panggilan fungsi dicatat sebagai tahap ``name``."""
+        def decorator(func):
+            stage_name = name or func.__qualname__
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                with _Stage(self, stage_name):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def timed_iter(self, name, iterable):
+        """Bungkus ``iterable``: waktu setiap ``next()`` dicatat sebagai tahap ``name``.
+
+        Berguna untuk generator chunk, di mana pekerjaan terjadi saat item
+        diminta, bukan saat generator dibuat.
+        """
+        if not self.enabled:
+            return iter(iterable)
+        return self._timed_iter(name, iter(iterable))
+
+    def _timed_iter(self, name, iterator):
+        while True:
+            with _Stage(self, name):
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+            yield item
+
+    def increment(self, name, value=1):
+        """Tambah counter ``name`` (hanya saat instrumentasi aktif)."""
+        if self.enabled:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def snapshot(self):
+        """Dict berisi statistik per tahap dan nilai counter."""
+        return {
+            'stages': {name: stats.as_dict() for name, stats in self.stages.items()},
+            'counters': dict(self.counters),
+        }
+
+    def format_report(self):
+        """Tabel teks tahap, diurutkan dari waktu total terbesar."""
+        lines = [f"{'tahap':<28} {'panggilan':>9} {'total ms':>10} {'self ms':>10} "
+                 f"{'maks ms':>9} {'puncak KiB':>11}"]
+        for name, stats in sorted(self.stages.items(), key=lambda item: -item[1].total_seconds):
+            lines.append(f'{name:<28} {stats.count:>9} {stats.total_seconds * 1000:>10.2f} '
+                         f'{stats.self_seconds * 1000:>10.2f} {stats.max_seconds * 1000:>9.3f} '
+                         f'{stats.peak_bytes / 1024:>11.1f}')
+        for name, value in sorted(self.counters.items()):
+            lines.append(f'counter {name}: {value}')
+        return '\n'.join(lines)
+
+    def profile_report(self, sort='cumulative', limit=25):
+        """Ringkasan ``pstats`` dari mode ``profile=True`` (string kosong jika tidak aktif)."""
+        if self.profiler is None:
+            return ''
+        import pstats
+
+        output = io.StringIO()
+        pstats.Stats(self.profiler, stream=output).sort_stats(sort).print_stats(limit)
+        return output.getvalue()
+
+    def to_prometheus(self, prefix=METRIC_PREFIX):
+        """Statistik dalam format eksposisi teks Prometheus."""
+        metrics = [
+            ('stage_calls_total', 'counter', 'Jumlah eksekusi tahap.', 'count'),
+            ('stage_seconds_total', 'counter', 'Waktu total tahap (detik).', 'total_seconds'),
+            ('stage_self_seconds_total', 'counter', 'Waktu tahap tanpa tahap anak (detik).',
+             'self_seconds'),
+            ('stage_cpu_seconds_total', 'counter', 'Waktu CPU proses selama tahap (detik).',
+             'cpu_seconds'),
+            ('stage_max_seconds', 'gauge', 'Eksekusi tahap terlama (detik).', 'max_seconds'),
+        ]
+        if any(stats.peak_bytes for stats in self.stages.values()):
+            metrics += [
+                ('stage_allocated_bytes_total', 'counter', 'Alokasi bersih tahap (byte).',
+                 'allocated_bytes'),
+                ('stage_peak_bytes', 'gauge', 'Puncak memori tahap (byte).', 'peak_bytes'),
+            ]
+        lines = []
+        for metric, kind, help_text, attribute in metrics:
+            lines.append(f'# HELP {prefix}_{metric} {help_text}')
+            lines.append(f'# TYPE {prefix}_{metric} {kind}')
+            for name, stats in sorted(self.stages.items()):
+                lines.append(f'{prefix}_{metric}{{stage="{_escape_label(name)}"}} '
+                             f'{getattr(stats, attribute)}')
+        if self.counters:
+            lines.append(f'# HELP {prefix}_events_total Counter kejadian pipeline.')
+            lines.append(f'# TYPE {prefix}_events_total counter')
+            for name, value in sorted(self.counters.items()):
+                lines.append(f'{prefix}_events_total{{name="{_escape_label(name)}"}} {value}')
+        return '\n'.join(lines) + '\n'
+
+    def write_prometheus(self, path, prefix=METRIC_PREFIX):
+        """Tulis :meth:`to_prometheus` ke ``path`` (misalnya untuk textfile collector)."""
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(self.to_prometheus(prefix))
+
+    def write_log(self, path):
+        """Tambahkan satu record JSON per tahap dan counter ke ``path`` (JSON Lines)."""
+        timestamp = time.strftime('%Y-%m-%dT%H:%M:%S%z')
+        with open(path, 'a', encoding='utf-8') as f:
+            for name, stats in self.stages.items():
+                f.write(json.dumps({'timestamp': timestamp, 'event': 'stage', 'stage': name,
+                                    **stats.as_dict()}) + '\n')
+            for name, value in self.counters.items():
+                f.write(json.dumps({'timestamp': timestamp, 'event': 'counter', 'name': name,
+                                    'value': value}) + '\n')
+
+
+def _escape_label(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+instrumentation = Instrumentation()
+
+enable = instrumentation.enable
+disable = instrumentation.disable
+reset = instrumentation.reset
+stage = instrumentation.stage
+timed = instrumentation.timed
+timed_iter = instrumentation.timed_iter
+increment = instrumentation.increment
+snapshot = instrumentation.snapshot
+format_report = instrumentation.format_report
+profile_report = instrumentation.profile_report
+to_prometheus = instrumentation.to_prometheus
+write_prometheus = instrumentation.write_prometheus
+write_log = instrumentation.write_log
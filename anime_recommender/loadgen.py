@@ -0,0 +1,104 @@
+"""Load generator lokal untuk :mod:`anime_recommender.service`.
+
+``concurrency`` klien asyncio masing-masing membuka satu koneksi keep-alive
+dan mengirim ``GET /recommend`` berturut-turut sampai total ``n_requests``
+permintaan terkirim. Judul diambil acak dari kolom ``English`` katalog
+artefak::
+
+    python -m anime_recommender.service --artifact artifacts/anime_model &
+    python -m anime_recommender.loadgen --artifact artifacts/anime_model --concurrency 64
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import time
+from urllib.parse import quote
+
+import numpy as np
+import pandas as pd
+
+
+async def _client(host, port, targets, latencies, statuses):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for target in targets:
+            start = time.perf_counter()
+            writer.write(f'GET {target} HTTP/1.1\r\nHost: {host}\r\n\r\n'.encode('latin-1'))
+            await writer.drain()
+            status = int((await reader.readline()).split()[1])
+            length = 0
+            while True:
+                header = await reader.readline()
+                if header in (b'\r\n', b'\n', b''):
+                    break
+                name, _, value = header.decode('latin-1').partition(':')
+                if name.strip().lower() == 'content-length':
+                    length = int(value)
+            await reader.readexactly(length)
+            latencies.append(time.perf_counter() - start)
+            statuses[status] = statuses.get(status, 0) + 1
+    finally:
+        writer.close()
+
+
+async def run_load(titles, host='127.0.0.1', port=8000, concurrency=32, n_requests=10_000,
+                   top_n=10, seed=0):
+    """Kirim ``n_requests`` permintaan dengan ``concurrency`` koneksi paralel.
+
+    Kembalikan dict berisi throughput (permintaan per detik), latensi p50/p99
+    di sisi klien, jumlah per status HTTP dan metrik server dari ``/metrics``.
+    """
+    rng = np.random.default_rng(seed)
+    targets = [f'/recommend?title={quote(title, safe="")}&top_n={top_n}'
+               for title in rng.choice(titles, size=n_requests)]
+    # Iterator bersama: klien mengambil target berikutnya sampai habis
+    shared = iter(targets)
+    latencies, statuses = [], {}
+    start = time.perf_counter()
+    await asyncio.gather(*[
+        _client(host, port, shared, latencies, statuses) for _ in range(concurrency)
+    ])
+    elapsed = time.perf_counter() - start
+
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(f'GET /metrics HTTP/1.1\r\nHost: {host}\r\nConnection: close\r\n\r\n'.encode())
+    response = await reader.read()
+    writer.close()
+    server = json.loads(response.split(b'\r\n\r\n', 1)[1])
+
+    latencies = np.asarray(latencies) * 1000
+    return {
+        'requests': len(latencies),
+        'concurrency': concurrency,
+        'seconds': elapsed,
+        'requests_per_second': len(latencies) / elapsed,
+        'latency_p50_ms': float(np.percentile(latencies, 50)),
+        'latency_p99_ms': float(np.percentile(latencies, 99)),
+        'statuses': statuses,
+        'server': server,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Load generator layanan rekomendasi anime.')
+    parser.add_argument('--artifact', default='artifacts/anime_model',
+                        help='direktori artefak, sumber daftar judul')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--requests', type=int, default=10_000)
+    parser.add_argument('--top-n', type=int, default=10)
+    args = parser.parse_args(argv)
+
+    catalog = pd.read_pickle(os.path.join(args.artifact, 'catalog.pkl'))
+    titles = catalog['English'].dropna().to_numpy()
+    result = asyncio.run(run_load(titles, host=args.host, port=args.port,
+                                  concurrency=args.concurrency, n_requests=args.requests,
+                                  top_n=args.top_n))
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,210 @@
+"""Indeks tetangga top-K sebagai pengganti matriks cosine similarity N x N.
+
+``cosine_similarity(tfidf_matrix, tfidf_matrix)`` menghasilkan matriks padat
+yang tumbuh kuadratik terhadap jumlah anime. Modul ini menghitung similarity
+per potongan baris (chunk) dan hanya menyimpan K tetangga terdekat beserta
+skornya, sehingga memori saat build adalah O(N*K + chunk_size*N).
+
+Skor tetangga dapat disimpan dengan presisi lebih rendah
+(:data:`SCORE_DTYPES`): ``float16``, atau ``int8`` dengan skala per baris
+(:class:`QuantizedScores`). Urutan tetangga tetap ditentukan dari skor
+float32 saat build, sehingga kuantisasi hanya memengaruhi nilai skor.
+"""
+
+import numpy as np
+
+from .instrument import stage, timed
+
+SCORE_DTYPES = ('float32', 'float16', 'int8')
+
+
+class QuantizedScores:
+    """Skor tetangga ``int8`` dengan skala per baris: ``skor = codes * scales[:, None]``.
+
+    Indexing (``scores[i, :n]``, ``scores[rows]``) mengembalikan skor float32
+    hanya untuk bagian yang diminta; ``np.asarray(scores)`` membentuk
+    seluruh matriks float32.
+    """
+
+    dtype = np.dtype(np.float32)
+
+    def __init__(self, codes, scales):
+        self.codes = codes
+        self.scales = scales
+
+    @classmethod
+    def from_array(cls, scores):
+        scores = np.asarray(scores, dtype=np.float32)
+        scales = np.abs(scores).max(axis=1, initial=0.0) / 127
+        scales[scales == 0] = 1.0
+        codes = np.rint(scores / scales[:, None]).astype(np.int8)
+        return cls(codes, scales.astype(np.float32))
+
+    @property
+    def shape(self):
+        return self.codes.shape
+
+    @property
+    def nbytes(self):
+        return self.codes.nbytes + self.scales.nbytes
+
+    def __getitem__(self, key):
+        rows = key[0] if isinstance(key, tuple) else key
+        scales = np.asarray(self.scales[rows], dtype=np.float32)[..., None]
+        return self.codes[key].astype(np.float32) * scales
+
+    def __array__(self, dtype=None, copy=None):
+        scores = self.codes.astype(np.float32) * self.scales[:, None]
+        return scores if dtype is None else scores.astype(dtype)
+
+
+def quantize_scores(scores, score_dtype='float32'):
+    """Simpan ``scores`` dengan presisi ``score_dtype`` (salah satu :data:`SCORE_DTYPES`)."""
+    if score_dtype == 'int8':
+        return scores if isinstance(scores, QuantizedScores) else QuantizedScores.from_array(scores)
+    if score_dtype in ('float32', 'float16'):
+        return np.asarray(scores, dtype=score_dtype)
+    raise ValueError(f'score_dtype tidak dikenal: {score_dtype}')
+
+
+class NeighborIndex:
+    """K tetangga terdekat untuk setiap anime, terurut dari skor tertinggi.
+
+    ``indices[i]`` berisi posisi baris tetangga anime ke-i dan ``scores[i]``
+    nilai cosine similarity-nya. Anime itu sendiri tidak termasuk dalam
+    daftar tetangganya.
+    """
+
+    def __init__(self, indices, scores):
+        self.indices = indices
+        self.scores = scores
+
+    def __len__(self):
+        return self.indices.shape[0]
+
+    @property
+    def k(self):
+        return self.indices.shape[1]
+
+    def neighbors(self, idx, top_n=None):
+        """Kembalikan ``(indices, scores)`` top-N tetangga untuk baris ``idx``."""
+        return self.indices[idx, :top_n], self.scores[idx, :top_n]
+
+    @property
+    def nbytes(self):
+        return self.indices.nbytes + self.scores.nbytes
+
+    def with_score_dtype(self, score_dtype):
+        """Indeks yang sama dengan skor disimpan sebagai ``score_dtype``."""
+        return NeighborIndex(self.indices, quantize_scores(self.scores, score_dtype))
+
+    def to_csr(self):
+        """Representasi CSR N x N yang hanya berisi K tetangga per baris."""
+        from scipy import sparse
+
+        n, k = self.indices.shape
+        indptr = np.arange(0, n * k + 1, k, dtype=np.int64)
+        return sparse.csr_matrix(
+            (np.asarray(self.scores, dtype=np.float32).ravel(), self.indices.ravel(), indptr),
+            shape=(n, n)
+        )
+
+
+def top_k_rows(block, k, exclude=None):
+    """Pilih top-K kolom per baris dari blok similarity padat.
+
+    ``exclude`` (opsional) berisi satu kolom per baris yang tidak boleh ikut
+    terpilih, misalnya posisi anime itu sendiri. Hasil diurutkan dari skor
+    tertinggi; skor yang sama diurutkan berdasarkan posisi baris terkecil,
+    sama seperti ``sorted`` pada implementasi awal.
+    """
+    block = np.asarray(block)
+    k = min(k, block.shape[1])
+    if exclude is not None:
+        block = block.copy()
+        block[np.arange(block.shape[0]), exclude] = -np.inf
+    part = np.argpartition(-block, k - 1, axis=1)[:, :k]
+    vals = np.take_along_axis(block, part, axis=1)
+    order = np.lexsort((part, -vals), axis=-1)
+    return (np.take_along_axis(part, order, axis=1),
+            np.take_along_axis(vals, order, axis=1))
+
+
+class CosineScorer:
+    """Matriks TF-IDF ternormalisasi L2 beserta transposnya (CSR), dibentuk sekali.
+
+    Jalur cadangan (``top_n`` di atas K, filter selektif, franchise digabung)
+    cukup mengalikan baris query dengan :attr:`XT`. Tanpa objek ini setiap
+    panggilan menormalisasi dan men-transpose seluruh katalog lebih dulu,
+    sehingga biaya persiapannya jauh di atas perkalian barisnya sendiri.
+    ``normalized=True`` melewati normalisasi untuk matriks yang barisnya
+    sudah ternormalisasi L2 (keluaran vectorizer artefak).
+    """
+
+    def __init__(self, tfidf_matrix, normalized=False):
+        from scipy import sparse
+
+        X = sparse.csr_matrix(tfidf_matrix)
+        if not normalized:
+            from sklearn.preprocessing import normalize
+            X = normalize(X, norm='l2', copy=True)
+        self.X = X
+        self.XT = X.T.tocsr()
+
+    @property
+    def shape(self):
+        return self.X.shape
+
+    def block(self, rows):
+        """Similarity padat ``len(rows) x N`` antara ``rows`` dan seluruh katalog."""
+        return (self.X[rows] @ self.XT).toarray()
+
+
+def cosine_scorer(tfidf_matrix, normalized=False):
+    """:class:`CosineScorer` untuk ``tfidf_matrix``; scorer yang sudah jadi dipakai apa adanya."""
+    if isinstance(tfidf_matrix, CosineScorer):
+        return tfidf_matrix
+    return CosineScorer(tfidf_matrix, normalized=normalized)
+
+
+def similarity_top_k(tfidf_matrix, rows, k, chunk_size=256, dtype=np.float32,
+                     normalized=False):
+    """Top-K tetangga (tanpa dirinya sendiri) untuk baris-baris ``rows``.
+
+    Similarity dihitung per ``chunk_size`` baris query sekaligus, sehingga
+    memori puncak O(chunk_size * N) berapa pun jumlah query.
+    ``tfidf_matrix`` boleh berupa :class:`CosineScorer` yang sudah dibentuk.
+    Kembalikan ``(indices, scores)`` berukuran ``len(rows) x K``.
+    """
+    scorer = cosine_scorer(tfidf_matrix, normalized=normalized)
+    rows = np.asarray(rows, dtype=np.int64)
+    k = max(0, min(k, scorer.shape[0] - 1))
+    indices = np.empty((len(rows), k), dtype=np.int32)
+    scores = np.empty((len(rows), k), dtype=dtype)
+    if k == 0:
+        return indices, scores
+
+    for start in range(0, len(rows), chunk_size):
+        chunk = rows[start:start + chunk_size]
+        with stage('cosine_similarity'):
+            block = scorer.block(chunk)
+        with stage('top_k_select'):
+            idx, vals = top_k_rows(block, k, exclude=chunk)
+        indices[start:start + len(chunk)] = idx
+        scores[start:start + len(chunk)] = vals
+    return indices, scores
+
+
+@timed('neighbor_index')
+def build_neighbor_index(tfidf_matrix, k=50, chunk_size=256, dtype=np.float32):
+    """Bangun :class:`NeighborIndex` dari matriks TF-IDF secara bertahap.
+
+    Setiap iterasi hanya membentuk blok similarity berukuran
+    ``chunk_size x N``; blok tersebut langsung direduksi menjadi K tetangga
+    terbaik sebelum blok berikutnya dihitung.
+    """
+    n = tfidf_matrix.shape[0]
+    indices, scores = similarity_top_k(
+        tfidf_matrix, np.arange(n), k, chunk_size=chunk_size, dtype=dtype
+    )
+    return NeighborIndex(indices, scores)
@@ -0,0 +1,177 @@
+"""Jalur query online: memuat artefak tanpa pandas, scikit-learn atau scipy.
+
+:func:`~anime_recommender.artifact.load_artifact` memuat katalog sebagai
+DataFrame sehingga setiap worker membayar import pandas dan joblib sebelum
+rekomendasi pertama. Build offline (:mod:`anime_recommender.artifact`) juga
+menulis indeks judul dan :class:`~anime_recommender.catalog.CatalogStore`
+sebagai pickle biasa, sehingga :func:`load_query_model` cukup membutuhkan
+NumPy::
+
+    from anime_recommender.online import load_query_model
+
+    model = load_query_model('artifacts/anime_model')
+    model.recommend_records('Steins;Gate', top_n=10)
+
+Vectorizer, matriks TF-IDF dan inverted index baru dimuat saat query
+membutuhkannya (``top_n`` di atas K tetangga atau pencarian teks bebas).
+Waktu dari import hingga rekomendasi pertama diukur oleh
+``python -m anime_recommender bench`` terhadap :data:`COLD_START_BUDGET_MS`.
+"""
+
+import json
+import os
+import pickle
+from functools import cached_property
+
+import numpy as np
+
+from .instrument import timed
+from .neighbors import CosineScorer, NeighborIndex, QuantizedScores
+from .recommend import recommend_title
+
+MANIFEST_FILE = 'manifest.json'
+
+# Batas waktu import hingga rekomendasi pertama pada jalur online (milidetik)
+COLD_START_BUDGET_MS = 250
+
+
+def read_manifest(artifact_dir):
+    path = os.path.join(artifact_dir, MANIFEST_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def version_path(artifact_dir, manifest):
+    """Direktori file data untuk versi yang dicatat ``manifest``.
+
+    Setiap versi ditulis ke subdirektori sendiri dan ``manifest.json``
+    menunjuk ke versi aktif. Model yang sudah dimuat menyimpan path ini,
+    sehingga file yang dimuat belakangan (matriks TF-IDF, vectorizer) tetap
+    berasal dari versi yang sama walaupun artefak sudah diperbarui.
+    """
+    return os.path.join(artifact_dir, manifest['version_dir'])
+
+
+def load_neighbor_index(data_dir, mmap=True):
+    """:class:`~anime_recommender.neighbors.NeighborIndex` dari direktori versi (memory-map jika ``mmap``)."""
+    mmap_mode = 'r' if mmap else None
+    scores = np.load(os.path.join(data_dir, 'neighbor_scores.npy'), mmap_mode=mmap_mode)
+    scales_path = os.path.join(data_dir, 'neighbor_scales.npy')
+    if os.path.exists(scales_path):
+        scores = QuantizedScores(scores, np.load(scales_path))
+    return NeighborIndex(
+        np.load(os.path.join(data_dir, 'neighbor_indices.npy'), mmap_mode=mmap_mode), scores
+    )
+
+
+def load_franchise_labels(data_dir):
+    """Label franchise per anime, atau ``None`` jika artefak dibangun tanpanya."""
+    path = os.path.join(data_dir, 'franchise_labels.npy')
+    return np.load(path) if os.path.exists(path) else None
+
+
+def load_pickle(path):
+    with open(path, 'rb') as f:
+        return pickle.load(f)
+
+
+class QueryModel:
+    """Bagian artefak yang dibutuhkan untuk melayani query rekomendasi."""
+
+    def __init__(self, path, manifest, title_index, neighbor_index, catalog_store):
+        self.path = path
+        self.manifest = manifest
+        self.data_path = version_path(path, manifest)
+        self.title_index = title_index
+        self.neighbor_index = neighbor_index
+        self.catalog_store = catalog_store
+
+    @property
+    def version(self):
+        return self.manifest['model_version']
+
+    @cached_property
+    def tfidf_matrix(self):
+        from scipy.sparse import load_npz
+
+        return load_npz(os.path.join(self.data_path, 'tfidf_matrix.npz')).tocsr()
+
+    @cached_property
+    def vectorizer(self):
+        import joblib
+
+        return joblib.load(os.path.join(self.data_path, 'vectorizer.joblib'))
+
+    @cached_property
+    def scorer(self):
+        # Baris TF-IDF artefak sudah ternormalisasi L2 oleh vectorizer
+        return CosineScorer(self.tfidf_matrix, normalized=True)
+
+    @cached_property
+    def inverted_index(self):
+        from .search import InvertedIndex
+
+        return InvertedIndex.from_matrix(self.tfidf_matrix)
+
+    @cached_property
+    def franchise_labels(self):
+        return load_franchise_labels(self.data_path)
+
+    def recommend(self, title, top_n=10, mask=None, collapse_franchises=False):
+        """``(indices, scores)`` untuk ``title``; ``None`` jika judul tidak ditemukan.
+
+        ``collapse_franchises=True`` menampilkan paling banyak satu anime per
+        franchise; artefak harus dibangun dengan ``franchise_threshold``.
+        """
+        franchise_labels = None
+        if collapse_franchises:
+            franchise_labels = self.franchise_labels
+            if franchise_labels is None:
+                raise ValueError('artefak dibangun tanpa franchise_threshold')
+        tfidf_matrix = None
+        if mask is not None or top_n > self.neighbor_index.k or franchise_labels is not None:
+            tfidf_matrix = self.scorer
+        return recommend_title(title, self.title_index, neighbor_index=self.neighbor_index,
+                               top_n=top_n, tfidf_matrix=tfidf_matrix, mask=mask,
+                               franchise_labels=franchise_labels)
+
+    def search(self, query, top_n=10, mask=None):
+        """Pencarian teks bebas; lihat :func:`~anime_recommender.search.search_text`."""
+        from .search import search_text
+
+        return search_text(query, self.vectorizer, self.inverted_index, top_n=top_n, mask=mask)
+
+    def records(self, indices, scores):
+        """Hasil sebagai list dict kolom katalog ditambah ``Similarity`` (tipe Python biasa)."""
+        indices = np.asarray(indices)
+        columns = {name: values[indices].tolist()
+                   for name, values in self.catalog_store.columns.items()}
+        columns['Similarity'] = np.asarray(scores, dtype=np.float64).tolist()
+        return [dict(zip(columns, values)) for values in zip(*columns.values())]
+
+    def recommend_records(self, title, top_n=10, mask=None, collapse_franchises=False):
+        result = self.recommend(title, top_n=top_n, mask=mask,
+                                collapse_franchises=collapse_franchises)
+        return None if result is None else self.records(*result)
+
+    def search_records(self, query, top_n=10, mask=None):
+        result = self.search(query, top_n=top_n, mask=mask)
+        return None if result is None else self.records(*result)
+
+
+@timed('load_query_model')
+def load_query_model(artifact_dir, mmap=True):
+    """Muat :class:`QueryModel` dari direktori artefak tanpa membaca katalog lengkap."""
+    manifest = read_manifest(artifact_dir)
+    if manifest is None:
+        raise FileNotFoundError(f'Artefak model tidak ditemukan di {artifact_dir}')
+    data_dir = version_path(artifact_dir, manifest)
+    return QueryModel(
+        artifact_dir,
+        manifest,
+        load_pickle(os.path.join(data_dir, 'title_index.pkl')),
+        load_neighbor_index(data_dir, mmap=mmap),
+        load_pickle(os.path.join(data_dir, 'catalog_store.pkl')),
+    )
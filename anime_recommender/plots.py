@@ -0,0 +1,56 @@
+"""Visualisasi data katalog; matplotlib dan seaborn baru diimpor saat dipanggil.
+
+Grafik yang sama seperti bagian "Visualisasi data" di notebook, sehingga
+gambar laporan (``distribusi_rating_anime.jpg``, ``top_10_anime.jpg``) dapat
+dibuat ulang dari CLI tanpa membuat modul lain di paket bergantung pada
+pustaka plotting.
+"""
+
+
+def _axes(figsize, show):
+    if show:
+        import matplotlib.pyplot as plt
+
+        return plt.subplots(figsize=figsize)
+    # Tanpa pyplot: tidak membutuhkan display dan tidak mengubah backend aktif
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=figsize)
+    return fig, fig.add_subplot()
+
+
+def _finish(fig, path, show):
+    if path is not None:
+        fig.savefig(path, bbox_inches='tight')
+    if show:
+        import matplotlib.pyplot as plt
+
+        plt.show()
+    return fig
+
+
+def plot_score_distribution(df, path=None, show=True):
+    """Histogram ``Score`` dengan kurva KDE; simpan ke ``path`` jika diberikan."""
+    import seaborn as sns
+
+    fig, ax = _axes((10, 6), show)
+    sns.histplot(df['Score'], bins=20, kde=True, ax=ax)
+    ax.set_title('Distribusi Rating Anime')
+    ax.set_xlabel('Rating')
+    ax.set_ylabel('Count')
+    return _finish(fig, path, show)
+
+
+def plot_top_anime(df, n=10, path=None, show=True):
+    """Bar chart ``n`` anime dengan ``Score`` tertinggi."""
+    import seaborn as sns
+
+    top_anime = df.sort_values('Score', ascending=False).head(n)
+    fig, ax = _axes((12, 8), show)
+    sns.barplot(x='Score', y='English', hue='English', data=top_anime, palette='viridis',
+                legend=False, ax=ax)
+    ax.set_title(f'Top {n} Anime Berdasarkan Rating')
+    ax.set_xlabel('Rating')
+    ax.set_ylabel('Judul Anime')
+    fig.tight_layout()
+    return _finish(fig, path, show)
@@ -0,0 +1,233 @@
+"""Normalisasi teks ``content_features`` sebelum TF-IDF, dengan cache token di disk.
+
+``content_features`` awal hanya gabungan huruf kecil ``Genres``, ``Type`` dan
+``Description``, sehingga teks baku seperti ``[Written by MAL Rewrite]`` atau
+``(Source: ANN)`` dan tanda baca ikut masuk vocabulary TF-IDF, dan genre
+dobel seperti ``ActionAction`` menjadi term tersendiri. Modul ini
+menormalisasi ketiga kolom tersebut:
+
+* teks baku (:data:`BOILERPLATE_RE`) dan tanda baca dibuang dengan operasi
+  string pandas yang tervektorisasi;
+* setiap genre dan tipe menjadi satu token (``Sci-FiSci-Fi`` -> ``sci_fi``);
+* stemming Porter (opsional, membutuhkan ``nltk``) setelah stop word
+  bahasa Inggris dibuang.
+
+Token hasil normalisasi disimpan di :class:`TokenCache` dengan kunci hash
+isi ketiga kolom (dan parameter normalisasi), sehingga deskripsi yang tidak
+berubah tidak pernah dinormalisasi ulang pada build berikutnya. Baris yang
+belum ada di cache dikerjakan per chunk di process pool.
+"""
+
+import hashlib
+import json
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from .filters import genre_key
+from .instrument import timed
+
+PREPROCESS_PARAMS = {
+    'strip_boilerplate': True,   # Buang [Written by MAL Rewrite], (Source: ...)
+    'strip_punctuation': True,   # Ganti tanda baca dengan spasi
+    'stem': False,               # Stemming Porter (membutuhkan nltk)
+}
+
+CONTENT_COLUMNS = ['Genres', 'Type', 'Description']
+
+BOILERPLATE_RE = re.compile(
+    r'\[written by [^\]]*\]|\(source:[^)]*\)|\[[^\]]*scanlations?\]', re.IGNORECASE
+)
+_PUNCT_RE = re.compile(r'[^\w\s]+')
+_SPACE_RE = re.compile(r'\s+')
+
+
+def _params(params):
+    return {**PREPROCESS_PARAMS, **(params or {})}
+
+
+def _token(value):
+    """Satu nilai kategori (genre/tipe) sebagai satu token TF-IDF."""
+    return re.sub(r'\W+', '_', genre_key(value)).strip('_')
+
+
+def normalize_genres(genres):
+    """``'ActionAction, Sci-FiSci-Fi'`` -> ``'action sci_fi'`` untuk setiap nilai ``genres``."""
+    genres = pd.Series(genres).astype(str)
+    # Kombinasi genre sedikit, jadi cukup dinormalisasi per nilai unik
+    mapping = {value: ' '.join(_token(g) for g in value.split(',') if g.strip())
+               for value in genres.unique()}
+    return genres.map(mapping)
+
+
+def clean_description(descriptions, strip_boilerplate=True, strip_punctuation=True):
+    """Huruf kecil, tanpa teks baku dan tanda baca, spasi dirapikan."""
+    text = pd.Series(descriptions).astype(str).str.lower()
+    if strip_boilerplate:
+        text = text.str.replace(BOILERPLATE_RE, ' ', regex=True)
+    if strip_punctuation:
+        text = text.str.replace(_PUNCT_RE, ' ', regex=True)
+    return text.str.replace(_SPACE_RE, ' ', regex=True).str.strip()
+
+
+def stem_texts(texts):
+    """Stemming Porter per token setelah stop word bahasa Inggris dibuang."""
+    try:
+        from nltk.stem import PorterStemmer
+    except ImportError as exc:
+        raise ImportError('stem=True membutuhkan paket nltk (pip install nltk)') from exc
+    from sklearn.feature_extraction.text import ENGLISH_STOP_WORDS
+
+    stemmer = PorterStemmer()
+    stems = {}
+
+    def stem(token):
+        result = stems.get(token)
+        if result is None:
+            result = stems[token] = stemmer.stem(token)
+        return result
+
+    return [' '.join(stem(token) for token in text.split() if token not in ENGLISH_STOP_WORDS)
+            for text in texts]
+
+
+def normalize_texts(genres, types, descriptions, params=None):
+    """Teks ``content_features`` ternormalisasi (tanpa cache, satu proses)."""
+    params = _params(params)
+    descriptions = clean_description(descriptions, params['strip_boilerplate'],
+                                     params['strip_punctuation'])
+    if params['stem']:
+        descriptions = pd.Series(stem_texts(descriptions.tolist()), index=descriptions.index)
+    types = pd.Series(types).astype(str).map(_token)
+    content = (normalize_genres(genres).to_numpy(dtype=object) + ' ' +
+               types.to_numpy(dtype=object) + ' ' + descriptions.to_numpy(dtype=object))
+    # Spasi tunggal: teks sama persis dengan token cache yang digabung ulang
+    return [' '.join(text.split()) for text in content]
+
+
+def _normalize_chunk(args):
+    genres, types, descriptions, params = args
+    return normalize_texts(genres, types, descriptions, params)
+
+
+def content_hashes(df, params=None):
+    """Hash 64-bit isi ``Genres``, ``Type`` dan ``Description`` per baris.
+
+    Parameter normalisasi ikut menentukan kunci hash, sehingga entri cache
+    dari konfigurasi lain tidak pernah terpakai.
+    """
+    salt = hashlib.sha256(json.dumps(_params(params), sort_keys=True).encode()).hexdigest()[:16]
+    columns = df[CONTENT_COLUMNS].astype(str)
+    return pd.util.hash_pandas_object(columns, index=False, hash_key=salt).to_numpy()
+
+
+class TokenCache:
+    """Cache token hasil normalisasi ``{hash isi: tuple token}`` yang disimpan dengan joblib.
+
+    Token di-intern, sehingga setiap token unik hanya disimpan sekali di
+    memori maupun di file. Kunci yang dipakai sejak cache dimuat dicatat;
+    ``save(prune=True)`` setelah build seluruh katalog membuang entri anime
+    yang sudah tidak ada, sehingga ukuran cache mengikuti ukuran katalog.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.entries = joblib.load(path) if os.path.exists(path) else {}
+        self.hits = self.misses = 0
+        self._used = set()
+        self._dirty = False
+
+    def __len__(self):
+        return len(self.entries)
+
+    def lookup(self, keys):
+        """List tuple token untuk ``keys`` (``None`` untuk kunci yang belum ada)."""
+        tokens = [self.entries.get(key) for key in keys]
+        n_missing = sum(entry is None for entry in tokens)
+        self.hits += len(tokens) - n_missing
+        self.misses += n_missing
+        self._used.update(keys)
+        return tokens
+
+    def update(self, keys, tokens):
+        self.entries.update(zip(keys, (tuple(map(sys.intern, entry)) for entry in tokens)))
+        self._used.update(keys)
+        self._dirty = True
+
+    def prune(self):
+        """Buang entri yang tidak dipakai sejak cache dimuat; kembalikan jumlahnya."""
+        stale = [key for key in self.entries if key not in self._used]
+        for key in stale:
+            del self.entries[key]
+        self._dirty |= bool(stale)
+        return len(stale)
+
+    def save(self, prune=False):
+        """Tulis cache secara atomik jika isinya berubah.
+
+        ``prune=True`` lebih dulu membuang entri yang tidak dipakai
+        (:meth:`prune`); hanya tepat jika seluruh katalog sudah diproses.
+        """
+        if prune:
+            self.prune()
+        if not self._dirty:
+            return
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f'{self.path}.tmp-{os.getpid()}'
+        joblib.dump(self.entries, tmp_path)
+        os.replace(tmp_path, self.path)
+        self._dirty = False
+
+
+@timed('normalize_content')
+def normalize_content(df, params=None, n_jobs=1, chunk_size=10_000, cache=None):
+    """Kolom ``content_features`` ternormalisasi untuk ``df`` (Series, index sama).
+
+    Baris yang hasilnya sudah ada di ``cache`` (:class:`TokenCache`) tidak
+    diproses ulang; sisanya dibagi per ``chunk_size`` baris dan dikerjakan
+    ``n_jobs`` proses worker (``-1`` untuk semua core).
+    """
+    params = _params(params)
+    missing = np.arange(len(df))
+    texts = [None] * len(df)
+    if cache is not None:
+        keys = content_hashes(df, params).tolist()
+        texts = [None if tokens is None else ' '.join(tokens) for tokens in cache.lookup(keys)]
+        missing = np.flatnonzero([text is None for text in texts])
+
+    if len(missing):
+        subset = df[CONTENT_COLUMNS].iloc[missing]
+        tasks = [(subset['Genres'].iloc[start:start + chunk_size].tolist(),
+                  subset['Type'].iloc[start:start + chunk_size].tolist(),
+                  subset['Description'].iloc[start:start + chunk_size].tolist(),
+                  params)
+                 for start in range(0, len(subset), chunk_size)]
+        if n_jobs == -1:
+            n_jobs = os.cpu_count() or 1
+        if n_jobs > 1 and len(tasks) > 1:
+            with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+                results = list(pool.map(_normalize_chunk, tasks))
+        else:
+            results = [_normalize_chunk(task) for task in tasks]
+        computed = [text for result in results for text in result]
+        for position, text in zip(missing.tolist(), computed):
+            texts[position] = text
+        if cache is not None:
+            cache.update([keys[position] for position in missing.tolist()],
+                         [text.split() for text in computed])
+    return pd.Series(texts, index=df.index)
+
+
+def normalize_chunks(chunks, params=None, n_jobs=1, chunk_size=10_000, cache=None):
+    """Ganti ``content_features`` setiap chunk dari ``prepare_chunks`` dengan versi ternormalisasi."""
+    for chunk in chunks:
+        chunk['content_features'] = normalize_content(chunk, params, n_jobs=n_jobs,
+                                                      chunk_size=chunk_size, cache=cache)
+        yield chunk
@@ -0,0 +1,112 @@
+"""Rekomendasi untuk profil pengguna dari riwayat beberapa judul.
+
+Memanggil ``get_recommendations`` untuk setiap judul yang pernah ditonton
+lalu menggabungkan hasilnya di Python lambat dan urutannya buruk: anime yang
+cukup mirip dengan *semua* judul kalah oleh anime yang sangat mirip dengan
+satu judul saja. Di sini riwayat setiap pengguna diubah menjadi satu baris
+matriks bobot sparse ``W`` (pengguna x anime), misalnya dengan rating
+pengguna sebagai bobot. Profil pengguna adalah centroid berbobot
+``W @ tfidf_matrix`` yang dinormalisasi L2. Centroid satu chunk pengguna
+dibentuk sebagai array padat, sehingga skor seluruh katalog cukup dihitung
+dengan satu perkalian sparse-padat float32 ``tfidf_matrix @ profil.T``.
+Anime yang sudah ditonton diberi skor ``-inf`` sebelum top-N dipilih.
+"""
+
+import numpy as np
+
+from .instrument import timed
+from .neighbors import top_k_rows
+
+# Batas sel array padat per chunk (float32, sekitar 64 MB): centroid
+# ``chunk x fitur`` (matriks hashing dengan 2**18 kolom) maupun blok skor
+# ``chunk x N`` (katalog jutaan anime) tetap memakai chunk kecil
+MAX_PROFILE_CELLS = 1 << 24
+
+
+def history_matrix(histories, title_index, n_items, weights=None):
+    """Matriks bobot sparse ``len(histories) x n_items`` dari riwayat judul.
+
+    ``histories`` berisi list judul per pengguna dan ``weights`` (opsional)
+    list bobot dengan bentuk yang sama; tanpa ``weights`` setiap judul
+    berbobot 1. Judul yang tidak ditemukan diabaikan, dan judul yang muncul
+    lebih dari sekali dijumlahkan bobotnya.
+    """
+    from scipy import sparse
+
+    lengths = [len(history) for history in histories]
+    titles = [title for history in histories for title in history]
+    rows = title_index.resolve_many(titles)
+    if weights is None:
+        values = np.ones(len(titles), dtype=np.float64)
+    else:
+        values = np.array([w for user_weights in weights for w in user_weights], dtype=np.float64)
+        if len(values) != len(titles):
+            raise ValueError('weights harus memiliki bentuk yang sama dengan histories')
+    owners = np.repeat(np.arange(len(histories)), lengths)
+    found = (rows >= 0) & (values != 0)
+    matrix = sparse.csr_matrix((values[found], (owners[found], rows[found])),
+                               shape=(len(histories), n_items))
+    matrix.sum_duplicates()
+    return matrix
+
+
+@timed('profile_recommend')
+def recommend_profiles(weights, tfidf_matrix, top_n=10, chunk_size=1024, mask=None):
+    """Top-N untuk setiap baris matriks bobot ``weights`` (pengguna x anime).
+
+    Kembalikan ``(indices, scores)`` berukuran ``m x top_n``; skor adalah
+    cosine similarity antara anime dan centroid profil. Anime yang sudah ada
+    di profil, serta anime di luar ``mask`` (opsional), tidak
+    direkomendasikan. Slot yang tidak terisi, termasuk seluruh baris untuk
+    profil kosong, bernilai ``-1``/``-inf``.
+    """
+    from scipy import sparse
+    from sklearn.preprocessing import normalize
+
+    W = sparse.csr_matrix(weights, dtype=np.float32)
+    X = normalize(sparse.csr_matrix(tfidf_matrix, dtype=np.float32), norm='l2')
+    m, n = W.shape
+    chunk_size = max(1, min(chunk_size, MAX_PROFILE_CELLS // max(X.shape)))
+    top_n = min(top_n, n)
+    indices = np.full((m, top_n), -1, dtype=np.int32)
+    scores = np.full((m, top_n), -np.inf, dtype=np.float32)
+    for start in range(0, m, chunk_size):
+        chunk = W[start:start + chunk_size]
+        profiles = normalize(chunk @ X, norm='l2').toarray()
+        block = np.ascontiguousarray((X @ profiles.T).T)
+        counts = np.diff(chunk.indptr)
+        block[np.repeat(np.arange(chunk.shape[0]), counts), chunk.indices] = -np.inf
+        if mask is not None:
+            block[:, ~np.asarray(mask, dtype=bool)] = -np.inf
+        block[counts == 0] = -np.inf
+        idx, vals = top_k_rows(block, top_n)
+        target = slice(start, start + chunk.shape[0])
+        indices[target] = np.where(np.isfinite(vals), idx, -1)
+        scores[target] = vals
+    return indices, scores
+
+
+def recommend_for_history(titles, title_index, tfidf_matrix, weights=None, top_n=10, mask=None):
+    """Top-N untuk satu riwayat ``titles`` (opsional dengan ``weights``, misalnya rating).
+
+    Kembalikan ``(indices, scores)`` satu dimensi, atau ``None`` jika tidak
+    ada judul riwayat yang ditemukan.
+    """
+    W = history_matrix([titles], title_index, tfidf_matrix.shape[0],
+                       weights=None if weights is None else [weights])
+    if W.nnz == 0:
+        return None
+    indices, scores = recommend_profiles(W, tfidf_matrix, top_n=top_n, mask=mask)
+    found = indices[0] >= 0
+    return indices[0][found], scores[0][found]
+
+
+def recommend_for_histories(histories, title_index, tfidf_matrix, weights=None, top_n=10,
+                            chunk_size=1024, mask=None):
+    """Mode batch: top-N untuk ribuan riwayat pengguna sekaligus.
+
+    Kembalikan ``(indices, scores)`` berukuran ``len(histories) x top_n``
+    seperti :func:`recommend_profiles`.
+    """
+    W = history_matrix(histories, title_index, tfidf_matrix.shape[0], weights=weights)
+    return recommend_profiles(W, tfidf_matrix, top_n=top_n, chunk_size=chunk_size, mask=mask)
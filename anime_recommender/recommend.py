@@ -0,0 +1,143 @@
+"""Rekomendasi untuk banyak judul sekaligus dalam satu panggilan vektor.
+
+Job "more like this" yang memanggil ``get_recommendations`` satu per satu
+membayar lookup judul dan pengurutan Python untuk setiap judul. Di sini semua
+judul di-resolve dulu, lalu top-N diambil sekaligus dari
+:class:`~anime_recommender.neighbors.NeighborIndex` (atau dihitung dari
+matriks TF-IDF dengan ``np.argpartition`` per baris jika ``top_n`` melebihi
+K tetangga yang tersimpan).
+
+Untuk satu judul, :func:`recommend_title` mengembalikan array posisi baris
+dan skor float32 tanpa membentuk DataFrame; :func:`get_recommendations`
+hanya membungkusnya dengan metadata dari
+:class:`~anime_recommender.catalog.CatalogStore`.
+
+Semua fungsi menerima ``franchise_labels`` (dari
+:func:`~anime_recommender.franchise.franchise_clusters`) untuk
+menggabungkan franchise: setiap franchise muncul paling banyak sekali dan
+franchise judul input sendiri tidak ikut direkomendasikan.
+"""
+
+from collections import namedtuple
+
+import numpy as np
+
+from .instrument import increment, timed
+from .neighbors import similarity_top_k
+
+# Kolom hasil rekomendasi, sama seperti get_recommendations di notebook
+RESULT_COLUMNS = ['English', 'Genres', 'Score', 'Type']
+
+BatchRecommendations = namedtuple('BatchRecommendations', ['rows', 'indices', 'scores'])
+BatchRecommendations.__doc__ = """Hasil rekomendasi batch dalam bentuk array.
+
+``rows[i]`` adalah posisi baris judul ke-i (``-1`` jika tidak ditemukan),
+sedangkan ``indices[i]`` dan ``scores[i]`` berisi top-N tetangganya. Baris
+untuk judul yang tidak ditemukan diisi ``-1`` dan ``nan``.
+"""
+
+
+@timed('recommend_rows')
+def recommend_rows(rows, top_n=10, neighbor_index=None, tfidf_matrix=None,
+                   chunk_size=256, mask=None, franchise_labels=None):
+    """Top-N tetangga untuk posisi baris ``rows`` (tanpa dirinya sendiri).
+
+    Jika ``neighbor_index`` tersedia dan ``top_n <= neighbor_index.k``, hasil
+    cukup diambil dengan satu fancy indexing. Selain itu similarity dihitung
+    dari ``tfidf_matrix`` per chunk. ``mask`` (opsional, dari
+    :meth:`~anime_recommender.filters.AttributeIndex.mask`) membatasi anime
+    yang boleh direkomendasikan; slot yang tidak terisi bernilai ``-1``/``-inf``.
+    Dengan ``franchise_labels`` hanya anime terbaik setiap franchise lain yang
+    diambil (:func:`~anime_recommender.franchise.franchise_top_k`).
+    """
+    rows = np.asarray(rows, dtype=np.int64)
+    if franchise_labels is not None:
+        from .franchise import franchise_top_k
+
+        if neighbor_index is None and tfidf_matrix is None:
+            raise ValueError('berikan neighbor_index atau tfidf_matrix')
+        return franchise_top_k(rows, top_n, franchise_labels, neighbor_index=neighbor_index,
+                               tfidf_matrix=tfidf_matrix, mask=mask, chunk_size=chunk_size)
+    fits_index = neighbor_index is not None and top_n <= neighbor_index.k
+    if not fits_index and tfidf_matrix is None:
+        raise ValueError(
+            'top_n melebihi jumlah tetangga di neighbor_index; '
+            'berikan tfidf_matrix untuk menghitung similarity langsung'
+        )
+    if mask is not None:
+        from .filters import filtered_top_k
+
+        return filtered_top_k(rows, top_n, mask, neighbor_index=neighbor_index if fits_index else None,
+                              tfidf_matrix=tfidf_matrix, chunk_size=chunk_size)
+    if fits_index:
+        return neighbor_index.indices[rows, :top_n], neighbor_index.scores[rows, :top_n]
+    return similarity_top_k(tfidf_matrix, rows, top_n, chunk_size=chunk_size)
+
+
+@timed('recommend_title')
+def recommend_title(title, title_index, neighbor_index=None, top_n=10, tfidf_matrix=None,
+                    mask=None, franchise_labels=None):
+    """Query tingkat rendah untuk satu judul: ``(indices, scores)`` atau ``None``.
+
+    ``indices`` berisi posisi baris katalog dan ``scores`` similarity float32,
+    terurut dari yang tertinggi. Tanpa filter, hasil berupa view ke
+    ``neighbor_index`` (tanpa alokasi); jangan diubah.
+    """
+    row = title_index.resolve(title)
+    if row is None:
+        increment('title_not_found')
+        return None
+    if (mask is None and franchise_labels is None and neighbor_index is not None
+            and top_n <= neighbor_index.k):
+        return neighbor_index.neighbors(row, top_n)
+    indices, scores = recommend_rows([row], top_n, neighbor_index=neighbor_index,
+                                     tfidf_matrix=tfidf_matrix, mask=mask,
+                                     franchise_labels=franchise_labels)
+    found = indices[0] >= 0
+    return indices[0][found], scores[0][found]
+
+
+@timed('get_recommendations')
+def get_recommendations(title, title_index, catalog, neighbor_index=None, top_n=10,
+                        tfidf_matrix=None, mask=None, franchise_labels=None):
+    """DataFrame rekomendasi untuk ``title``; ``None`` jika judul tidak ditemukan.
+
+    Pembungkus tipis :func:`recommend_title`: metadata diambil dari
+    ``catalog`` (:class:`~anime_recommender.catalog.CatalogStore`) hanya untuk
+    baris hasil.
+    """
+    result = recommend_title(title, title_index, neighbor_index=neighbor_index, top_n=top_n,
+                             tfidf_matrix=tfidf_matrix, mask=mask,
+                             franchise_labels=franchise_labels)
+    if result is None:
+        return None
+    indices, scores = result
+    return catalog.frame(indices, scores)
+
+
+@timed('get_recommendations_batch')
+def get_recommendations_batch(titles, title_index, top_n=10, neighbor_index=None,
+                              tfidf_matrix=None, chunk_size=256, mask=None,
+                              franchise_labels=None):
+    """Rekomendasi top-N untuk banyak judul dalam satu panggilan.
+
+    Mengembalikan :class:`BatchRecommendations` berisi array posisi baris dan
+    skor, tanpa membentuk DataFrame per judul. ``mask`` dan
+    ``franchise_labels`` diteruskan ke :func:`recommend_rows`.
+    """
+    rows = title_index.resolve_many(titles)
+    found = rows >= 0
+    indices, scores = recommend_rows(
+        rows[found], top_n, neighbor_index=neighbor_index,
+        tfidf_matrix=tfidf_matrix, chunk_size=chunk_size, mask=mask,
+        franchise_labels=franchise_labels
+    )
+    if found.all():
+        return BatchRecommendations(rows, indices, scores)
+
+    width = indices.shape[1]
+    all_indices = np.full((len(rows), width), -1, dtype=indices.dtype)
+    all_scores = np.full((len(rows), width), np.nan, dtype=scores.dtype)
+    all_indices[found] = indices
+    all_scores[found] = scores
+    return BatchRecommendations(rows, all_indices, all_scores)
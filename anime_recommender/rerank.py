@@ -0,0 +1,110 @@
+"""Re-ranking hybrid: cosine similarity digabung dengan sinyal kualitas dan popularitas.
+
+``get_recommendations`` hanya mengurutkan berdasarkan cosine similarity.
+:class:`HybridReranker` mengambil kandidat (misalnya 200 teratas) dari indeks
+similarity, lalu mengurutkannya ulang dengan skor::
+
+    hybrid = w_similarity * similarity
+           + w_score * score + w_popularity * popularity + w_members * members
+
+Sinyal dinormalisasi ke rentang 0..1 dan dihitung sekali saat reranker dibuat
+sebagai satu array float32 kontigu ``N x 3``:
+
+* ``score``      -- ``Score`` dengan normalisasi min-max
+* ``popularity`` -- peringkat ``Popularity`` (1 = paling populer) dibalik
+* ``members``    -- ``log1p(Members)`` dengan normalisasi min-max
+
+``Rank`` tidak dipakai terpisah karena diturunkan dari ``Score``. Bagian
+sinyal dari skor hybrid tidak bergantung pada query, sehingga dihitung sekali
+per set bobot sebagai vektor ``prior`` float32. Re-ranking seluruh batch
+cukup satu ekspresi NumPy ``w_similarity * similarity + prior[kandidat]``,
+tanpa operasi DataFrame.
+"""
+
+import numpy as np
+
+from .recommend import recommend_rows
+
+SIGNALS = ('score', 'popularity', 'members')
+
+DEFAULT_WEIGHTS = {
+    'similarity': 0.8,
+    'score': 0.1,
+    'popularity': 0.1,
+    'members': 0.0,
+}
+
+
+def _min_max(values):
+    values = np.asarray(values, dtype=np.float64)
+    low, high = np.nanmin(values), np.nanmax(values)
+    scaled = (values - low) / (high - low) if high > low else np.zeros_like(values)
+    # Nilai kosong dianggap sinyal terendah
+    return np.nan_to_num(scaled, nan=0.0)
+
+
+def catalog_signals(catalog):
+    """Array float32 kontigu ``N x 3`` berisi sinyal ``SIGNALS`` per anime."""
+    return np.ascontiguousarray(np.column_stack([
+        _min_max(catalog['Score'].to_numpy(dtype=np.float64, na_value=np.nan)),
+        1.0 - _min_max(catalog['Popularity'].to_numpy(dtype=np.float64, na_value=np.nan)),
+        _min_max(np.log1p(catalog['Members'].to_numpy(dtype=np.float64, na_value=np.nan))),
+    ]), dtype=np.float32)
+
+
+class HybridReranker:
+    """Urutkan ulang kandidat similarity dengan sinyal katalog berbobot."""
+
+    def __init__(self, signals, weights=None):
+        self.signals = np.ascontiguousarray(signals, dtype=np.float32)
+        self.set_weights(weights)
+
+    @classmethod
+    def from_catalog(cls, catalog, weights=None):
+        return cls(catalog_signals(catalog), weights)
+
+    def set_weights(self, weights=None):
+        """Ganti bobot; kunci yang tidak diberikan memakai ``DEFAULT_WEIGHTS``."""
+        weights = {**DEFAULT_WEIGHTS, **(weights or {})}
+        unknown = set(weights) - set(DEFAULT_WEIGHTS)
+        if unknown:
+            raise ValueError(f'Bobot tidak dikenal: {sorted(unknown)}')
+        self.weights = weights
+        self._similarity_weight = np.float32(weights['similarity'])
+        signal_weights = np.array([weights[name] for name in SIGNALS], dtype=np.float32)
+        self.prior = np.ascontiguousarray(self.signals @ signal_weights, dtype=np.float32)
+
+    def rerank(self, indices, similarities, top_n=10):
+        """Top-N hybrid dari kandidat ``indices``/``similarities`` (``m x pool``).
+
+        Slot kandidat ``-1`` diabaikan. Kembalikan ``(indices, scores)``
+        berukuran ``m x top_n`` terurut dari skor hybrid tertinggi.
+        """
+        indices = np.asarray(indices)
+        similarities = np.asarray(similarities, dtype=np.float32)
+        hybrid = self._similarity_weight * similarities + self.prior[indices]
+        invalid = indices < 0
+        if invalid.any():
+            hybrid[invalid] = -np.inf
+        top_n = min(top_n, indices.shape[1])
+        part = np.argpartition(hybrid, -top_n, axis=1)[:, -top_n:]
+        rows = np.arange(len(indices))[:, None]
+        top_indices, top_scores = indices[rows, part], hybrid[rows, part]
+        # Skor sama diurutkan berdasarkan posisi baris, seperti top_k_rows
+        order = np.lexsort((top_indices, -top_scores), axis=-1)
+        return top_indices[rows, order], top_scores[rows, order]
+
+
+def hybrid_recommend_rows(rows, reranker, top_n=10, pool_size=200, neighbor_index=None,
+                          tfidf_matrix=None):
+    """Rekomendasi hybrid untuk posisi baris ``rows``.
+
+    Kandidat ``pool_size`` diambil dari ``neighbor_index`` jika K-nya cukup;
+    jika tidak dan ``tfidf_matrix`` tidak diberikan, pool dibatasi K tetangga
+    yang tersimpan.
+    """
+    if neighbor_index is not None and tfidf_matrix is None:
+        pool_size = min(pool_size, neighbor_index.k)
+    indices, similarities = recommend_rows(rows, pool_size, neighbor_index=neighbor_index,
+                                           tfidf_matrix=tfidf_matrix)
+    return reranker.rerank(indices, similarities, top_n=top_n)
@@ -0,0 +1,144 @@
+"""Pencarian teks bebas di atas indeks TF-IDF dengan posting list dan MaxScore.
+
+:class:`~anime_recommender.titles.TitleIndex` hanya mengenali judul, sehingga
+query seperti ``"dark fantasy revenge tv"`` tidak menghasilkan apa pun. Di
+sini query diubah dengan ``vectorizer`` yang sudah di-fit, lalu dicocokkan
+dengan :class:`InvertedIndex`: untuk setiap term, daftar anime yang memuatnya
+(posting list, terurut berdasarkan posisi baris) beserta bobot TF-IDF-nya.
+Skor adalah cosine similarity antara query dan anime.
+
+Alih-alih perkalian dengan seluruh baris katalog, posting list query diproses
+term demi term (*term-at-a-time*) dari batas atas kontribusi terbesar, dengan
+penghentian dini ala MaxScore:
+
+* batas atas kontribusi term adalah bobot query dikali bobot maksimum di
+  posting list-nya;
+* selama jumlah batas atas term yang belum diproses masih melebihi skor
+  kandidat ke-K, posting list dibaca penuh dan anime baru menjadi kandidat;
+* setelah itu tidak ada anime baru yang bisa masuk top-K, sehingga term
+  sisanya hanya dicari untuk kandidat yang ada (``np.searchsorted``), dan
+  kandidat yang batas atas skornya di bawah skor ke-K dibuang.
+
+Term umum (misalnya ``tv``) memiliki bobot IDF kecil sehingga biasanya baru
+diproses setelah mode kandidat saja, jadi biaya query mengikuti selektivitas
+term-nya, bukan ukuran katalog. Hasilnya sama persis dengan perkalian penuh.
+"""
+
+import numpy as np
+
+from .instrument import increment, timed
+
+
+class InvertedIndex:
+    """Posting list per term dari matriks TF-IDF (format CSC, bobot ternormalisasi L2)."""
+
+    def __init__(self, indptr, doc_ids, weights, max_weights, n_docs):
+        self.indptr = indptr
+        self.doc_ids = doc_ids
+        self.weights = weights
+        self.max_weights = max_weights
+        self.n_docs = n_docs
+
+    @classmethod
+    def from_matrix(cls, tfidf_matrix, dtype=np.float32):
+        from scipy import sparse
+        from sklearn.preprocessing import normalize
+
+        X = normalize(sparse.csr_matrix(tfidf_matrix, dtype=dtype), norm='l2').tocsc()
+        X.sort_indices()
+        max_weights = X.max(axis=0).toarray().ravel().astype(np.float64)
+        return cls(X.indptr.astype(np.int64), X.indices.astype(np.int32), X.data, max_weights,
+                   X.shape[0])
+
+    @property
+    def n_terms(self):
+        return len(self.indptr) - 1
+
+    @property
+    def nbytes(self):
+        return sum(a.nbytes for a in (self.indptr, self.doc_ids, self.weights, self.max_weights))
+
+    def postings(self, term):
+        """``(doc_ids, weights)`` untuk ``term``, terurut berdasarkan posisi baris."""
+        start, end = self.indptr[term], self.indptr[term + 1]
+        return self.doc_ids[start:end], self.weights[start:end]
+
+    def top_k(self, terms, query_weights, k=10, mask=None):
+        """Top-K anime untuk vektor query ``{terms: query_weights}``.
+
+        ``query_weights`` diasumsikan sudah ternormalisasi L2. Kembalikan
+        ``(indices, scores)`` terurut dari skor tertinggi (skor sama diurutkan
+        berdasarkan posisi baris terkecil); hanya anime dengan minimal satu
+        term yang cocok dan lolos ``mask`` (opsional) yang dikembalikan.
+        """
+        terms = np.asarray(terms, dtype=np.int64)
+        query_weights = np.asarray(query_weights, dtype=np.float64)
+        bounds = query_weights * self.max_weights[terms]
+        order = np.argsort(-bounds, kind='stable')
+        order = order[bounds[order] > 0]
+        terms, query_weights, bounds = terms[order], query_weights[order], bounds[order]
+        # remaining[i]: batas atas skor yang masih bisa ditambahkan term ke-i dan seterusnya
+        remaining = np.append(np.cumsum(bounds[::-1])[::-1], 0.0)
+
+        docs = np.empty(0, dtype=np.int32)
+        acc = np.empty(0, dtype=np.float64)
+        threshold = -np.inf
+        scanned = 0
+        for i, term in enumerate(terms.tolist()):
+            post_docs, post_weights = self.postings(term)
+            if remaining[i] > threshold:
+                # Anime yang belum menjadi kandidat masih bisa masuk top-K
+                if mask is not None:
+                    allowed = mask[post_docs]
+                    post_docs, post_weights = post_docs[allowed], post_weights[allowed]
+                scanned += len(post_docs)
+                docs, inverse = np.unique(np.concatenate([docs, post_docs]), return_inverse=True)
+                acc = np.bincount(inverse, minlength=len(docs), weights=np.concatenate(
+                    [acc, query_weights[i] * post_weights]))
+            elif len(post_docs):
+                # Hanya kandidat yang ada yang diperbarui
+                scanned += len(docs)
+                pos = np.minimum(np.searchsorted(post_docs, docs), len(post_docs) - 1)
+                hit = post_docs[pos] == docs
+                acc[hit] += query_weights[i] * post_weights[pos[hit]]
+            if len(acc) >= k:
+                threshold = np.partition(acc, len(acc) - k)[len(acc) - k]
+                alive = acc + remaining[i + 1] >= threshold
+                docs, acc = docs[alive], acc[alive]
+        increment('search_postings_scanned', scanned)
+
+        best = np.lexsort((docs, -acc))[:k]
+        return docs[best], acc[best].astype(np.float32)
+
+
+def query_vector(query, vectorizer):
+    """``(terms, weights)`` query ternormalisasi L2; array kosong jika tidak ada term dikenal."""
+    vector = vectorizer.transform([query]).tocsr()
+    weights = vector.data.astype(np.float64)
+    norm = np.sqrt(np.dot(weights, weights))
+    if norm > 0:
+        weights /= norm
+    return vector.indices, weights
+
+
+@timed('search_text')
+def search_text(query, vectorizer, inverted_index, top_n=10, mask=None):
+    """Query teks bebas: ``(indices, scores)``, atau ``None`` jika tidak ada term yang dikenal.
+
+    ``vectorizer`` adalah ``TfidfVectorizer``/``HashingTfidf`` yang dipakai
+    untuk membangun ``inverted_index``.
+    """
+    terms, weights = query_vector(query, vectorizer)
+    if len(terms) == 0:
+        increment('search_no_terms')
+        return None
+    return inverted_index.top_k(terms, weights, k=top_n, mask=mask)
+
+
+def search(query, vectorizer, inverted_index, catalog, top_n=10, mask=None):
+    """DataFrame hasil :func:`search_text` dengan metadata dari ``catalog``; ``None`` jika tidak ada term."""
+    result = search_text(query, vectorizer, inverted_index, top_n=top_n, mask=mask)
+    if result is None:
+        return None
+    indices, scores = result
+    return catalog.frame(indices, scores)
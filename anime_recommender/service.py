@@ -0,0 +1,310 @@
+"""Layanan HTTP rekomendasi berbasis asyncio dengan micro-batching.
+
+Model dimuat sekali dari direktori artefak, lalu layanan melayani::
+
+    GET /recommend?title=Steins;Gate&top_n=10
+    GET /search?q=dark+fantasy+revenge&top_n=10
+    GET /metrics
+    GET /health
+
+Permintaan ``/recommend`` yang datang bersamaan dalam jendela ``max_delay``
+detik digabung menjadi satu batch: semua judul di-resolve sekaligus dan
+top-N diambil dengan satu fancy indexing dari
+:class:`~anime_recommender.neighbors.NeighborIndex`. Setiap respons memuat
+``latency_ms`` permintaan tersebut, sedangkan ``/metrics`` melaporkan
+latensi p50/p99, kedalaman antrean dan ukuran batch. ``/search`` menerima
+teks bebas dan dijawab langsung (tanpa batch) dengan
+:func:`~anime_recommender.search.search_text`; vectorizer dan indeks posting-nya
+dimuat saat permintaan ``/search`` pertama.
+
+Hanya memakai pustaka standar (HTTP/1.1 sederhana dengan keep-alive)::
+
+    python -m anime_recommender.service --artifact artifacts/anime_model --port 8000
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from collections import deque
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+
+from .artifact import load_artifact
+from .recommend import RESULT_COLUMNS, recommend_rows
+from .search import search_text
+
+REASONS = {
+    200: 'OK', 400: 'Bad Request', 404: 'Not Found',
+    405: 'Method Not Allowed', 500: 'Internal Server Error',
+}
+
+
+class ServiceStats:
+    """Counter dan latensi terbaru (``window`` permintaan terakhir)."""
+
+    def __init__(self, window=10_000):
+        self.latencies = deque(maxlen=window)
+        self.requests = 0
+        self.errors = 0
+        self.batches = 0
+        self.batched_requests = 0
+        self.max_batch_size = 0
+        self.max_queue_depth = 0
+        self.started_at = time.time()
+
+    def record_batch(self, size):
+        self.batches += 1
+        self.batched_requests += size
+        self.max_batch_size = max(self.max_batch_size, size)
+
+    def snapshot(self, queue_depth=0):
+        latencies = np.asarray(self.latencies) * 1000
+        return {
+            'requests': self.requests,
+            'errors': self.errors,
+            'uptime_seconds': time.time() - self.started_at,
+            'queue_depth': queue_depth,
+            'max_queue_depth': self.max_queue_depth,
+            'batches': self.batches,
+            'mean_batch_size': self.batched_requests / self.batches if self.batches else 0.0,
+            'max_batch_size': self.max_batch_size,
+            'latency_p50_ms': float(np.percentile(latencies, 50)) if len(latencies) else None,
+            'latency_p99_ms': float(np.percentile(latencies, 99)) if len(latencies) else None,
+        }
+
+
+class MicroBatcher:
+    """Gabungkan permintaan rekomendasi yang berdekatan menjadi satu lookup."""
+
+    def __init__(self, artifact, max_batch_size=256, max_delay=0.002, stats=None):
+        self.artifact = artifact
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay
+        self.stats = stats or ServiceStats()
+        self.queue = asyncio.Queue()
+        # Baris katalog dalam bentuk siap-JSON (NaN menjadi None)
+        table = artifact.catalog[RESULT_COLUMNS].astype(object)
+        self._records = table.where(table.notna(), None).to_dict('records')
+
+    async def submit(self, title, top_n):
+        """Tunggu hasil untuk satu judul; ``None`` jika judul tidak ditemukan."""
+        future = asyncio.get_running_loop().create_future()
+        self.queue.put_nowait((title, top_n, future))
+        self.stats.max_queue_depth = max(self.stats.max_queue_depth, self.queue.qsize())
+        return await future
+
+    def _drain(self, batch):
+        while len(batch) < self.max_batch_size and not self.queue.empty():
+            batch.append(self.queue.get_nowait())
+
+    async def run(self):
+        while True:
+            batch = [await self.queue.get()]
+            self._drain(batch)
+            if len(batch) < self.max_batch_size and self.max_delay > 0:
+                # Beri kesempatan permintaan lain masuk ke batch yang sama
+                await asyncio.sleep(self.max_delay)
+                self._drain(batch)
+            self._process(batch)
+
+    def _process(self, batch):
+        self.stats.record_batch(len(batch))
+        try:
+            results = self.recommend_many([title for title, _, _ in batch],
+                                          [top_n for _, top_n, _ in batch])
+        except Exception as exc:
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+        for (_, _, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    def recommend_many(self, titles, top_ns):
+        """Rekomendasi untuk banyak judul (masing-masing dengan ``top_n``-nya).
+
+        Judul dengan ``top_n`` di atas K tetangga tersimpan dihitung terpisah
+        dari matriks TF-IDF, sehingga satu permintaan besar tidak memaksa
+        seluruh batch keluar dari jalur indeks tetangga.
+        """
+        rows = self.artifact.title_index.resolve_many(titles)
+        top_ns = np.asarray(top_ns, dtype=np.int64)
+        results = [None] * len(titles)
+        neighbor_index = self.artifact.neighbor_index
+        oversize = top_ns > neighbor_index.k
+        for fallback in (False, True):
+            found = np.flatnonzero((oversize == fallback) & (rows >= 0))
+            if len(found) == 0:
+                continue
+            # Matriks TF-IDF hanya dimuat jika ada permintaan di atas K
+            tfidf_matrix = self.artifact.scorer if fallback else None
+            indices, scores = recommend_rows(rows[found], int(top_ns[found].max()),
+                                             neighbor_index=neighbor_index,
+                                             tfidf_matrix=tfidf_matrix)
+            for i, row_indices, row_scores in zip(found, indices, scores):
+                n = top_ns[i]
+                results[i] = [
+                    {**self._records[j], 'Similarity': float(s)}
+                    for j, s in zip(row_indices[:n].tolist(), row_scores[:n].tolist())
+                ]
+        return results
+
+    def search(self, query, top_n):
+        """Hasil pencarian teks bebas; ``None`` jika tidak ada term query yang dikenal."""
+        result = search_text(query, self.artifact.vectorizer, self.artifact.inverted_index,
+                             top_n=top_n)
+        if result is None:
+            return None
+        indices, scores = result
+        return [{**self._records[j], 'Similarity': float(s)}
+                for j, s in zip(indices.tolist(), scores.tolist())]
+
+
+class RecommendationService:
+    """Server HTTP asyncio di atas :class:`MicroBatcher`."""
+
+    def __init__(self, artifact, max_batch_size=256, max_delay=0.002, max_top_n=100):
+        self.stats = ServiceStats()
+        self.batcher = MicroBatcher(artifact, max_batch_size=max_batch_size,
+                                    max_delay=max_delay, stats=self.stats)
+        self.max_top_n = max_top_n
+
+    async def recommend(self, query):
+        start = time.perf_counter()
+        title = query.get('title', [''])[0]
+        try:
+            top_n = int(query.get('top_n', ['10'])[0])
+        except ValueError:
+            return 400, {'error': 'top_n harus berupa bilangan bulat'}
+        if not title:
+            return 400, {'error': 'parameter title wajib diisi'}
+        if not 1 <= top_n <= self.max_top_n:
+            return 400, {'error': f'top_n harus di antara 1 dan {self.max_top_n}'}
+
+        recommendations = await self.batcher.submit(title, top_n)
+        latency = time.perf_counter() - start
+        self.stats.latencies.append(latency)
+        if recommendations is None:
+            return 404, {'error': f"Anime '{title}' tidak ditemukan", 'latency_ms': latency * 1000}
+        return 200, {
+            'title': title,
+            'model_version': self.batcher.artifact.version,
+            'latency_ms': latency * 1000,
+            'recommendations': recommendations,
+        }
+
+    async def search(self, query):
+        start = time.perf_counter()
+        text = query.get('q', [''])[0]
+        try:
+            top_n = int(query.get('top_n', ['10'])[0])
+        except ValueError:
+            return 400, {'error': 'top_n harus berupa bilangan bulat'}
+        if not text.strip():
+            return 400, {'error': 'parameter q wajib diisi'}
+        if not 1 <= top_n <= self.max_top_n:
+            return 400, {'error': f'top_n harus di antara 1 dan {self.max_top_n}'}
+
+        results = self.batcher.search(text, top_n)
+        latency = time.perf_counter() - start
+        self.stats.latencies.append(latency)
+        if results is None:
+            return 404, {'error': f"Tidak ada kata dari '{text}' yang dikenal model",
+                         'latency_ms': latency * 1000}
+        return 200, {
+            'query': text,
+            'model_version': self.batcher.artifact.version,
+            'latency_ms': latency * 1000,
+            'results': results,
+        }
+
+    async def route(self, method, target):
+        if method != 'GET':
+            return 405, {'error': 'hanya GET yang didukung'}
+        url = urlsplit(target)
+        if url.path == '/recommend':
+            return await self.recommend(parse_qs(url.query))
+        if url.path == '/search':
+            return await self.search(parse_qs(url.query))
+        if url.path == '/metrics':
+            return 200, self.stats.snapshot(self.batcher.queue.qsize())
+        if url.path == '/health':
+            return 200, {'status': 'ok', 'model_version': self.batcher.artifact.version}
+        return 404, {'error': f'path {url.path} tidak dikenal'}
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                method, target, _ = line.decode('latin-1').split(' ', 2)
+                headers = {}
+                while True:
+                    header = await reader.readline()
+                    if header in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = header.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                if headers.get('content-length'):
+                    await reader.readexactly(int(headers['content-length']))
+
+                self.stats.requests += 1
+                try:
+                    status, payload = await self.route(method, target)
+                except Exception as exc:
+                    status, payload = 500, {'error': str(exc)}
+                if status >= 500:
+                    self.stats.errors += 1
+                body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+                keep_alive = headers.get('connection', '').lower() != 'close'
+                writer.write(
+                    f'HTTP/1.1 {status} {REASONS[status]}\r\n'
+                    'Content-Type: application/json; charset=utf-8\r\n'
+                    f'Content-Length: {len(body)}\r\n'
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+                    .encode('latin-1') + body
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, ValueError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host='127.0.0.1', port=8000):
+        worker = asyncio.create_task(self.batcher.run())
+        server = await asyncio.start_server(self.handle, host, port)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            worker.cancel()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Layanan HTTP rekomendasi anime.')
+    parser.add_argument('--artifact', default='artifacts/anime_model')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--max-batch-size', type=int, default=256)
+    parser.add_argument('--max-delay-ms', type=float, default=2.0,
+                        help='jendela penggabungan permintaan (milidetik)')
+    args = parser.parse_args(argv)
+
+    service = RecommendationService(load_artifact(args.artifact),
+                                    max_batch_size=args.max_batch_size,
+                                    max_delay=args.max_delay_ms / 1000)
+    print(f'Melayani di http://{args.host}:{args.port}/recommend')
+    try:
+        asyncio.run(service.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
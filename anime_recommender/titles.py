@@ -0,0 +1,170 @@
+"""Indeks judul anime untuk mencari posisi baris tanpa scan DataFrame.
+
+Pencarian ``df[df['English'] == title]`` memindai seluruh katalog setiap kali
+dipanggil. :class:`TitleIndex` dibangun sekali dari kolom ``English``,
+``Synonyms`` dan ``Japanese`` sehingga pencarian judul cukup satu lookup
+dictionary, ditambah indeks n-gram karakter untuk saran "did you mean".
+"""
+
+import re
+import unicodedata
+
+import numpy as np
+
+TITLE_COLUMNS = ('English', 'Synonyms', 'Japanese')
+
+# Nilai pengisi missing values yang bukan judul sebenarnya
+_PLACEHOLDER_TITLES = {'no synonyms', 'unknown'}
+_PUNCT_RE = re.compile(r'[^\w\s]+')
+
+
+def normalize_title(title):
+    """Bentuk normal judul: NFKC, case-folded, tanpa tanda baca dan spasi ganda."""
+    text = unicodedata.normalize('NFKC', str(title)).casefold()
+    text = _PUNCT_RE.sub(' ', text).replace('_', ' ')
+    return ' '.join(text.split())
+
+
+def char_ngrams(text, n=3):
+    """Himpunan n-gram karakter dari ``text`` (diberi spasi di kedua ujung)."""
+    padded = f' {text} '
+    if len(padded) <= n:
+        return {padded}
+    return {padded[i:i + n] for i in range(len(padded) - n + 1)}
+
+
+def _title_variants(value, column):
+    if not isinstance(value, str) or not value.strip():
+        return []
+    variants = [value.strip()]
+    if column == 'Synonyms':
+        # Synonyms berisi beberapa judul alternatif yang dipisah koma
+        variants += [part.strip() for part in value.split(',') if part.strip()]
+    return [v for v in variants if v.casefold() not in _PLACEHOLDER_TITLES]
+
+
+class TitleIndex:
+    """Pemetaan judul (asli maupun ternormalisasi) ke posisi baris katalog.
+
+    Prioritas pencarian: judul persis, lalu bentuk ternormalisasi. Jika satu
+    judul dimiliki beberapa anime, kolom ``English`` didahulukan dibanding
+    ``Synonyms`` dan ``Japanese``, lalu baris yang lebih awal.
+    """
+
+    def __init__(self, exact, normalized, keys, key_rows, labels, ngram_size=3):
+        self._exact = exact
+        self._normalized = normalized
+        self._keys = keys
+        self._key_rows = key_rows
+        self._labels = labels
+        self.ngram_size = ngram_size
+        self._grams = None
+        self._gram_counts = None
+
+    def __getstate__(self):
+        # Indeks n-gram tidak ikut disimpan; dibangun ulang saat suggest() pertama
+        state = self.__dict__.copy()
+        state['_grams'] = state['_gram_counts'] = None
+        return state
+
+    def _build_ngram_index(self):
+        grams = {}
+        counts = np.empty(len(self._keys), dtype=np.int32)
+        for key_id, key in enumerate(self._keys):
+            key_grams = char_ngrams(key, self.ngram_size)
+            counts[key_id] = len(key_grams)
+            for gram in key_grams:
+                grams.setdefault(gram, []).append(key_id)
+        self._grams = {g: np.asarray(ids, dtype=np.int32) for g, ids in grams.items()}
+        self._gram_counts = counts
+
+    @classmethod
+    def from_dataframe(cls, df, columns=TITLE_COLUMNS, ngram_size=3):
+        index = cls({}, {}, [], [], [], ngram_size=ngram_size)
+        for column in columns:
+            if column not in df.columns:
+                continue
+            for row, value in enumerate(df[column].tolist()):
+                index._add_title(row, value, column)
+        return index
+
+    def _add_title(self, row, value, column):
+        for variant in _title_variants(value, column):
+            self._exact.setdefault(variant, row)
+            norm = normalize_title(variant)
+            if norm and norm not in self._normalized:
+                self._normalized[norm] = row
+                self._keys.append(norm)
+                self._key_rows.append(row)
+                self._labels.append(variant)
+
+    def add_row(self, row, titles):
+        """Daftarkan judul baris ``row``; ``titles`` berupa dict kolom -> judul.
+
+        Judul yang sudah dimiliki anime lain tetap menunjuk ke anime tersebut.
+        """
+        for column in TITLE_COLUMNS:
+            if column in titles:
+                self._add_title(row, titles[column], column)
+        self._grams = self._gram_counts = None
+
+    def remove_row(self, row, titles):
+        """Hapus judul-judul lama baris ``row`` (misalnya sebelum judulnya diubah)."""
+        for column, value in titles.items():
+            for variant in _title_variants(value, column):
+                if self._exact.get(variant) == row:
+                    del self._exact[variant]
+                norm = normalize_title(variant)
+                if self._normalized.get(norm) == row:
+                    # Entri di _keys dibiarkan; suggest() melewati kunci yang sudah dihapus
+                    del self._normalized[norm]
+
+    def __len__(self):
+        return len(self._normalized)
+
+    def __contains__(self, title):
+        return self.resolve(title) is not None
+
+    def resolve(self, title):
+        """Posisi baris untuk ``title``, atau ``None`` jika tidak ditemukan."""
+        if not isinstance(title, str):
+            return None
+        row = self._exact.get(title)
+        if row is None:
+            row = self._normalized.get(normalize_title(title))
+        return row
+
+    def resolve_many(self, titles):
+        """Posisi baris untuk banyak judul sekaligus; ``-1`` jika tidak ditemukan."""
+        rows = [self.resolve(title) for title in titles]
+        return np.array([-1 if row is None else row for row in rows], dtype=np.int64)
+
+    def suggest(self, title, limit=5, min_score=0.3):
+        """Saran judul mirip berdasarkan koefisien Dice n-gram karakter.
+
+        Mengembalikan list ``(row, judul, skor)`` terurut dari
+        skor tertinggi. Hanya judul yang berbagi n-gram dengan ``title`` yang
+        dihitung, sehingga biayanya bergantung pada panjang posting list,
+        bukan ukuran katalog. Indeks n-gram dibangun pada pemanggilan pertama.
+        """
+        if self._grams is None:
+            self._build_ngram_index()
+        query = char_ngrams(normalize_title(title), self.ngram_size)
+        postings = [self._grams[g] for g in query if g in self._grams]
+        if not postings:
+            return []
+        key_ids, shared = np.unique(np.concatenate(postings), return_counts=True)
+        scores = 2.0 * shared / (len(query) + self._gram_counts[key_ids])
+        order = np.lexsort((key_ids, -scores))
+        results = []
+        seen_rows = set()
+        for i in order:
+            if scores[i] < min_score or len(results) >= limit:
+                break
+            key_id = key_ids[i]
+            row = self._key_rows[key_id]
+            if self._normalized.get(self._keys[key_id]) != row or row in seen_rows:
+                continue
+            seen_rows.add(row)
+            results.append((row, self._labels[key_id], float(scores[i])))
+        return results
@@ -17,27 +17,53 @@ Mengimpor library yang diperlukan untuk analisis data, visualisasi, dan pembuata
 
 import pandas as pd
 import numpy as np
-import seaborn as sns
-import matplotlib.pyplot as plt
 from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
 from scipy.sparse import save_npz
 import joblib
 import warnings
 import re
 import string
+import time
+from anime_recommender import CatalogStore, TitleIndex, build_neighbor_index, get_recommendations_batch, recommend_title
+from anime_recommender import instrument
+from anime_recommender.artifact import build_artifact, load_or_build
+from anime_recommender.cache import RecommendationCache
+from anime_recommender.evaluation import evaluate_catalog, precision_report
+from anime_recommender.features import fill_missing_values, fit_tfidf
+from anime_recommender.franchise import FRANCHISE_THRESHOLD, franchise_clusters, similarity_join
+from anime_recommender.ingest import detect_encoding, read_catalog
+from anime_recommender.preprocess import TokenCache, normalize_content
+from anime_recommender.plots import plot_score_distribution, plot_top_anime
+from anime_recommender.profile import recommend_for_history
+from anime_recommender.rerank import HybridReranker, hybrid_recommend_rows
+from anime_recommender.search import InvertedIndex, search
 warnings.filterwarnings('ignore')
 
 """Pada bagian ini, kita mengimpor berbagai library yang dibutuhkan untuk melakukan analisis data, visualisasi, dan membangun sistem rekomendasi. Berikut fungsi masing-masing library:
 
 * `pandas` dan `numpy`: Digunakan untuk manipulasi dan analisis data dalam bentuk tabel dan array.
-* `seaborn` dan `matplotlib.pyplot`: Digunakan untuk membuat visualisasi data seperti grafik dan plot.
 * `TfidfVectorizer` dari `sklearn.feature_extraction.text`: Digunakan untuk mengubah data teks (seperti deskripsi anime) menjadi representasi numerik berbasis TF-IDF.
-* `cosine_similarity` dari `sklearn.metrics.pairwise`: Digunakan untuk menghitung kemiripan antar anime berdasarkan deskripsi atau genre.
+* `build_neighbor_index` dari paket lokal `anime_recommender`: Digunakan untuk menghitung kemiripan antar anime (cosine similarity) dan menyimpan K tetangga terdekat setiap anime.
+* `TitleIndex` dari paket lokal `anime_recommender`: Digunakan untuk mencari anime berdasarkan judul (English, Synonyms, Japanese) tanpa memindai seluruh DataFrame.
+* `get_recommendations_batch` dari paket lokal `anime_recommender`: Digunakan untuk menghasilkan rekomendasi bagi banyak judul sekaligus.
+* `recommend_title` dan `CatalogStore` dari paket lokal `anime_recommender`: Digunakan untuk query rekomendasi satu judul dalam bentuk array dan menggabungkan metadata anime hanya untuk baris hasil.
+* `build_artifact` dan `load_or_build` dari `anime_recommender.artifact`: Digunakan untuk menyimpan model ke disk dan memuatnya kembali dengan cepat.
+* `instrument` dari paket lokal `anime_recommender`: Digunakan untuk mengukur waktu dan memori setiap tahap pipeline.
+* `RecommendationCache` dari `anime_recommender.cache`: Digunakan untuk menyimpan hasil rekomendasi judul populer di cache.
+* `evaluate_catalog` dan `precision_report` dari `anime_recommender.evaluation`: Digunakan untuk mengevaluasi rekomendasi seluruh katalog sekaligus dan mengukur dampak presisi numerik terhadap hasil rekomendasi.
+* `fill_missing_values` dan `fit_tfidf` dari `anime_recommender.features`: Digunakan untuk mengisi missing values dengan nilai default dan membangun matriks TF-IDF dengan parameter yang sama seperti model utama.
+* `FRANCHISE_THRESHOLD`, `franchise_clusters` dan `similarity_join` dari `anime_recommender.franchise`: Digunakan untuk mencari pasangan anime yang sangat mirip dan mengelompokkannya menjadi franchise.
+* `detect_encoding` dan `read_catalog` dari `anime_recommender.ingest`: Digunakan untuk mendeteksi encoding file dan memuat dataset dengan tipe kolom yang eksplisit.
+* `TokenCache` dan `normalize_content` dari `anime_recommender.preprocess`: Digunakan untuk menormalisasi teks `content_features` dengan cache hasil di disk.
+* `plot_score_distribution` dan `plot_top_anime` dari `anime_recommender.plots`: Digunakan untuk membuat visualisasi data; `seaborn` dan `matplotlib` baru diimpor saat fungsi dipanggil.
+* `recommend_for_history` dari `anime_recommender.profile`: Digunakan untuk rekomendasi berdasarkan riwayat beberapa judul yang ditonton pengguna.
+* `InvertedIndex` dan `search` dari `anime_recommender.search`: Digunakan untuk mencari anime dengan teks bebas melalui inverted index TF-IDF.
+* `HybridReranker` dan `hybrid_recommend_rows` dari `anime_recommender.rerank`: Digunakan untuk mengurutkan ulang rekomendasi dengan sinyal kualitas dan popularitas.
 * `save_npz` dari `scipy.sparse`: Digunakan untuk menyimpan matriks hasil transformasi TF-IDF dalam format yang efisien.
 * `joblib`: Untuk menyimpan dan memuat model atau objek Python lainnya.
 * `warnings`: Untuk menyembunyikan peringatan agar output notebook lebih bersih.
 * `re` dan `string`: Digunakan untuk pembersihan teks seperti menghapus tanda baca dan karakter khusus.
+* `time`: Digunakan untuk mengukur waktu eksekusi rekomendasi batch.
 
 Dengan semua library ini, kita dapat melanjutkan proses preprocessing data, ekstraksi fitur, hingga membangun sistem rekomendasi berbasis konten.
 
@@ -60,14 +86,10 @@ import zipfile
 with zipfile.ZipFile('top-anime-dataset-2024.zip', 'r') as z:
     z.extractall('.')
 
-# Load data dengan fallback encoding
-for enc in ['utf-8', 'ISO-8859-1', 'latin1']:
-    try:
-        anime_df = pd.read_csv('Top_Anime_data.csv', encoding=enc)
-        print(f"Data berhasil dimuat dengan encoding: {enc}")
-        break
-    except:
-        continue
+# Load data: encoding dideteksi sekali, tipe kolom eksplisit
+encoding = detect_encoding('Top_Anime_data.csv')
+anime_df = read_catalog('Top_Anime_data.csv', usecols=None, encoding=encoding)
+print(f"Data berhasil dimuat dengan encoding: {encoding}")
 
 """Pada bagian ini, dilakukan proses pemuatan dataset `Top_Anime_data.csv` yang berisi informasi tentang anime-anime populer tahun 2024. Dataset ini bersumber dari Kaggle dan memuat atribut penting seperti judul, skor, genre, deskripsi, studio, jumlah episode, dan lainnya.
 
@@ -79,8 +101,9 @@ Langkah-langkah yang dilakukan dalam proses ini:
 * **Mengunduh dan Mengekstrak Dataset**
   Dataset diunduh dari Kaggle menggunakan perintah `!kaggle datasets download`. File ZIP hasil unduhan kemudian diekstrak untuk memperoleh file `.csv` yang akan digunakan.
 
-* **Memuat Dataset dengan Fallback Encoding**
-  File `Top_Anime_data.csv` dimuat menggunakan beberapa opsi encoding (`utf-8`, `ISO-8859-1`, dan `latin1`) untuk menghindari error pembacaan file akibat karakter non-standar. Encoding `utf-8` berhasil digunakan dalam kasus ini.
+* **Memuat Dataset dengan Deteksi Encoding**
+  Encoding file `Top_Anime_data.csv` dideteksi sekali dari sampel byte di awal file (`utf-8`, atau `ISO-8859-1` jika sampel bukan UTF-8 yang valid), lalu file dibaca satu kali dengan tipe kolom yang eksplisit (`Popularity`, `Rank` dan `Members` bertipe `Int64` yang menerima sel kosong). Jika file tetap gagal dibaca, `read_catalog()` menghentikan proses dengan pesan error yang menyebutkan penyebabnya: byte yang tidak sesuai encoding atau nilai yang tidak sesuai tipe kolom. Encoding `utf-8` terdeteksi dalam kasus ini.
+  Untuk file katalog yang sangat besar, `iter_catalog()` dari modul yang sama dapat membaca file per *chunk* sehingga penggunaan memori tetap terbatas.
 
 Setelah berhasil dimuat, dataset disimpan dalam variabel `anime_df` dan siap digunakan untuk eksplorasi dan preprocessing lebih lanjut.
 
@@ -94,6 +117,7 @@ anime_df.info()
 
 * Dataset terdiri dari **1000 entri** dan **22 kolom fitur** yang mencakup berbagai informasi tentang anime, seperti skor, peringkat, deskripsi, genre, studio, durasi, dan lainnya.
 * Sebagian besar kolom bertipe data `object` (teks), namun terdapat juga kolom numerik seperti `Score`, `Popularity`, `Rank`, dan `Members`.
+* Kolom `Type`, `Demographic`, `Source`, dan `Rating` dimuat sebagai `category` karena hanya memiliki sedikit nilai unik, sehingga lebih hemat memori.
 * Beberapa kolom memiliki nilai yang **tidak lengkap (missing values)**, terutama pada:
 
   * `Synonyms`, `Japanese`, `English`
@@ -180,12 +204,7 @@ Membuat visualisasi untuk memahami distribusi data.
 """
 
 # Distribusi Rating
-plt.figure(figsize=(10,6))
-sns.histplot(anime_df['Score'], bins=20, kde=True)
-plt.title('Distribusi Rating Anime')
-plt.xlabel('Rating')
-plt.ylabel('Count')
-plt.show()
+plot_score_distribution(anime_df)
 
 """## Interpretasi Hasil:
 
@@ -206,14 +225,7 @@ Visualisasi ini membantu kita memahami bagaimana rating anime terdistribusi dala
 """
 
 # Top 10 Anime Berdasarkan Rating
-top_anime = anime_df.sort_values('Score', ascending=False).head(10)
-plt.figure(figsize=(12,8))
-sns.barplot(x='Score', y='English', data=top_anime, palette='viridis')
-plt.title('Top 10 Anime Berdasarkan Rating')
-plt.xlabel('Rating')
-plt.ylabel('Judul Anime')
-plt.tight_layout()
-plt.show()
+plot_top_anime(anime_df, n=10)
 
 """## Hasil dan Observasi:
 
@@ -276,13 +288,8 @@ print("- Source: Diisi dengan 'Unknown'")
 print("- Synonyms: Diisi dengan 'No synonyms'")
 print("- Broadcast: Diisi dengan 'Unknown'")
 
-anime_df['Description'] = anime_df['Description'].fillna('No description available')
-anime_df['Genres'] = anime_df['Genres'].fillna('Unknown')
-anime_df['Type'] = anime_df['Type'].fillna('Unknown')
-anime_df['Demographic'] = anime_df['Demographic'].fillna('Unknown')
-anime_df['Source'] = anime_df['Source'].fillna('Unknown')
-anime_df['Synonyms'] = anime_df['Synonyms'].fillna('No synonyms')
-anime_df['Broadcast'] = anime_df['Broadcast'].fillna('Unknown')
+# Kolom kategorikal otomatis ditambah kategori pengisinya sebelum diisi
+anime_df = fill_missing_values(anime_df)
 
 """### Penanganan Missing Values
 
@@ -372,9 +379,13 @@ print("1. Representasi konten: Vektor TF-IDF dari fitur gabungan")
 print("2. Similarity computation: Cosine Similarity")
 print("3. Rekomendasi: Top-N anime dengan similarity tertinggi")
 
-# Cosine Similarity
-cosine_sim = cosine_similarity(tfidf_matrix, tfidf_matrix)
-print(f"Shape Similarity Matrix: {cosine_sim.shape}")
+# Cosine Similarity, dihitung per chunk dan disimpan sebagai indeks top-K
+neighbor_index = build_neighbor_index(
+    tfidf_matrix,
+    k=50,            # Jumlah tetangga terdekat yang disimpan per anime
+    chunk_size=256   # Jumlah baris similarity yang dihitung sekaligus
+)
+print(f"Shape Neighbor Index: {neighbor_index.indices.shape}")
 
 """Pada tahap ini, kita membangun model sistem rekomendasi berbasis konten (*Content-Based Filtering*), dengan pendekatan sebagai berikut:
 
@@ -382,7 +393,7 @@ print(f"Shape Similarity Matrix: {cosine_sim.shape}")
 2. **Perhitungan kesamaan**: Menggunakan **Cosine Similarity** untuk mengukur sejauh mana kemiripan antar anime.
 3. **Hasil rekomendasi**: Anime yang memiliki nilai kemiripan tertinggi dengan anime yang diberikan akan direkomendasikan.
 
-Hasilnya adalah matriks similarity berukuran `(1000, 1000)` yang menunjukkan skor kemiripan antara setiap pasang anime.
+Hasilnya adalah indeks tetangga berukuran `(1000, 50)` yang menyimpan 50 anime paling mirip beserta skor kemiripannya untuk setiap anime.
 
 ### tahap Modeling
 
@@ -392,27 +403,25 @@ Pada tahap ini, kita membangun model sistem rekomendasi berbasis konten (*Conten
 2. **Perhitungan kesamaan**: Menggunakan **Cosine Similarity** untuk mengukur sejauh mana kemiripan antar anime.
 3. **Hasil rekomendasi**: Anime yang memiliki nilai kemiripan tertinggi dengan anime yang diberikan akan direkomendasikan.
 
-Hasilnya adalah matriks similarity berukuran `(1000, 1000)` yang menunjukkan skor kemiripan antara setiap pasang anime.
+Similarity tidak lagi disimpan sebagai matriks padat `(1000, 1000)` karena ukurannya tumbuh kuadratik terhadap jumlah anime. Similarity dihitung per potongan 256 baris, lalu hanya 50 tetangga terdekat (selain anime itu sendiri) yang disimpan, sehingga memori yang dibutuhkan sebanding dengan `N x K`.
 """
 
+# Indeks judul untuk pencarian anime tanpa memindai seluruh DataFrame
+title_index = TitleIndex.from_dataframe(anime_df)
+
+# Katalog ringkas berorientasi kolom untuk metadata hasil rekomendasi
+catalog_store = CatalogStore.from_dataframe(anime_df)
+
 # Fungsi rekomendasi
-def get_recommendations(title, cosine_sim=cosine_sim, df=anime_df, top_n=10):
+@instrument.timed('get_recommendations')
+def get_recommendations(title, neighbor_index=neighbor_index, catalog=catalog_store, top_n=10, title_index=title_index):
     try:
-        idx = df[df['English'] == title].index
-        if len(idx) == 0:
+        result = recommend_title(title, title_index, neighbor_index, top_n=top_n)
+        if result is None:
             return None
 
-        idx = idx[0]
-        sim_scores = list(enumerate(cosine_sim[idx]))
-        sim_scores = sorted(sim_scores, key=lambda x: x[1], reverse=True)[1:top_n+1]
-
-        anime_indices = [i[0] for i in sim_scores]
-        similarity_values = [i[1] for i in sim_scores]
-
-        recommendations = df[['English', 'Genres', 'Score', 'Type']].iloc[anime_indices].copy()
-        recommendations['Similarity'] = similarity_values
-
-        return recommendations
+        anime_indices, similarity_values = result
+        return catalog.frame(anime_indices, similarity_values)
     except Exception as e:
         print(f"Error: {e}")
         return None
@@ -421,11 +430,10 @@ def get_recommendations(title, cosine_sim=cosine_sim, df=anime_df, top_n=10):
 
 Fungsi `get_recommendations()` digunakan untuk menghasilkan rekomendasi anime berdasarkan **judul yang diberikan**. Prosesnya melibatkan:
 
-* Mencari indeks dari anime yang sesuai dengan judul (`English`).
-* Mengambil nilai **cosine similarity** antara anime tersebut dan seluruh anime lainnya.
-* Mengurutkan skor similarity dari yang tertinggi (selain dirinya sendiri).
-* Mengambil **Top-N** anime yang paling mirip.
-* Mengembalikan informasi anime yang direkomendasikan beserta nilai similarity-nya.
+* Mencari posisi anime yang sesuai dengan judul melalui `title_index`. Judul dapat berupa judul `English`, salah satu `Synonyms`, judul `Japanese`, maupun variasi penulisannya (huruf besar/kecil dan tanda baca diabaikan).
+* Membaca daftar tetangga anime tersebut dari `neighbor_index`, yang sudah terurut dari **cosine similarity** tertinggi (tanpa dirinya sendiri).
+* Mengambil **Top-N** anime yang paling mirip (maksimal sebanyak `k` tetangga yang disimpan). Langkah ini dilakukan oleh `recommend_title()`, yang hanya mengembalikan array posisi baris dan skor similarity (float32) tanpa membentuk DataFrame.
+* Mengembalikan informasi anime yang direkomendasikan beserta nilai similarity-nya. Metadata (`English`, `Genres`, `Score`, `Type`) diambil dari `catalog_store`, katalog berorientasi kolom, hanya untuk baris hasil rekomendasi.
 
 Fungsi ini akan mengembalikan `None` jika judul tidak ditemukan di dataset atau jika terjadi error saat pemrosesan.
 
@@ -449,6 +457,8 @@ if recommendations is not None:
     display(recommendations)
 else:
     print("Anime tidak ditemukan")
+    for _, judul, skor in title_index.suggest(test_anime):
+        print(f"- Mungkin maksud Anda: {judul} (skor: {skor:.2f})")
 
 """### Hasil Rekomendasi
 
@@ -462,6 +472,158 @@ Langkah-langkah yang dilakukan:
 * Hasil ditampilkan dalam bentuk daftar dan tabel agar mudah dibaca.
 
 Rekomendasi yang muncul menunjukkan sistem mampu mengenali keterkaitan antara berbagai musim dan versi dari serial "Attack on Titan", yang menandakan bahwa representasi konten dan perhitungan similarity bekerja dengan baik.
+"""
+
+# Rekomendasi batch untuk seluruh judul dalam katalog
+all_titles = anime_df['English'].dropna().tolist()
+
+start = time.perf_counter()
+batch = get_recommendations_batch(all_titles, title_index, top_n=10, neighbor_index=neighbor_index)
+elapsed = time.perf_counter() - start
+
+print(f"Shape hasil batch: {batch.indices.shape}")
+print(f"Waktu: {elapsed * 1000:.1f} ms ({len(all_titles) / elapsed:,.0f} judul/detik)")
+
+"""### Rekomendasi Batch
+
+Untuk kebutuhan job terjadwal yang menghitung rekomendasi "more like this" bagi setiap anime, fungsi `get_recommendations_batch()` menerima banyak judul sekaligus:
+
+* Semua judul di-resolve menjadi posisi baris melalui `title_index`.
+* Top-N tetangga seluruh judul diambil dalam satu operasi array dari `neighbor_index`. Jika `top_n` melebihi jumlah tetangga yang disimpan, similarity dihitung langsung dari `tfidf_matrix` dan top-N dipilih dengan `np.argpartition` per baris (tanpa anime itu sendiri).
+* Hasilnya berupa array posisi baris (`indices`) dan skor similarity (`scores`), bukan DataFrame per judul, sehingga ribuan judul dapat diproses dalam hitungan milidetik.
+"""
+
+# Re-ranking hybrid: similarity digabung dengan Score dan Popularity
+reranker = HybridReranker.from_catalog(anime_df, weights={'similarity': 0.8, 'score': 0.1, 'popularity': 0.1})
+row = title_index.resolve('Steins;Gate')
+hybrid_indices, hybrid_scores = hybrid_recommend_rows([row], reranker, top_n=10, neighbor_index=neighbor_index)
+
+hybrid_df = anime_df[['English', 'Score', 'Popularity']].iloc[hybrid_indices[0]].copy()
+hybrid_df['Hybrid'] = hybrid_scores[0]
+print(hybrid_df.to_string())
+
+"""### Re-ranking Hybrid
+
+Fungsi `get_recommendations()` hanya mengurutkan berdasarkan cosine similarity, padahal dataset juga memiliki kolom numerik seperti `Score`, `Popularity`, dan `Members`. Tahap *re-ranking* hybrid mengambil kandidat dari `neighbor_index` (hingga 200 kandidat, dibatasi jumlah tetangga `k` yang disimpan), lalu mengurutkannya ulang dengan skor:
+
+`hybrid = 0.8 * similarity + 0.1 * score + 0.1 * popularity`
+
+* Sinyal `score` (dari `Score`), `popularity` (dari peringkat `Popularity`), dan `members` (dari `Members`) dinormalisasi ke rentang 0–1 dan dihitung **sekali** sebagai array `float32`.
+* Bobot dapat diatur melalui parameter `weights`. Bobot `similarity=1` dan bobot lain 0 menghasilkan urutan yang sama dengan `get_recommendations()`.
+* Re-ranking dilakukan dengan satu ekspresi NumPy, sehingga tambahan latensinya hanya puluhan mikrodetik per judul.
+"""
+
+# Rekomendasi untuk profil pengguna dari riwayat tontonan (dengan rating sebagai bobot)
+watched = ['Steins;Gate', 'Attack on Titan Season 3 Part 2', 'Fullmetal Alchemist: Brotherhood']
+ratings = [10, 8, 9]
+profile_indices, profile_scores = recommend_for_history(watched, title_index, tfidf_matrix, weights=ratings, top_n=10)
+print(catalog_store.frame(profile_indices, profile_scores).to_string())
+
+"""### Rekomendasi Berbasis Profil Pengguna
+
+Pengguna biasanya memiliki riwayat tontonan, bukan hanya satu judul. Menggabungkan hasil `get_recommendations()` untuk setiap judul secara terpisah lambat dan cenderung mengutamakan anime yang hanya mirip dengan satu judul. Fungsi `recommend_for_history()` membentuk **profil pengguna** sebagai centroid berbobot dari vektor TF-IDF judul-judul yang pernah ditonton:
+
+* Bobot dapat berupa rating pengguna; tanpa bobot, setiap judul bernilai sama.
+* Centroid dinormalisasi, lalu seluruh katalog diberi skor dengan satu perkalian matriks sparse-padat.
+* Judul yang sudah ditonton tidak ikut direkomendasikan.
+* `recommend_for_histories()` memproses ribuan riwayat pengguna sekaligus per chunk (sekitar 5.000 profil dalam kurang dari setengah detik pada katalog ini).
+"""
+
+# Pencarian teks bebas dengan inverted index TF-IDF
+inverted_index = InvertedIndex.from_matrix(tfidf_matrix)
+for query in ['dark fantasy revenge', 'school romance comedy']:
+    print(f"\nQuery: {query}")
+    print(search(query, tfidf, inverted_index, catalog_store, top_n=5).to_string())
+
+"""### Pencarian Teks Bebas
+
+`get_recommendations()` hanya menerima judul anime yang ada di dataset. Fungsi `search()` dari `anime_recommender.search` menerima teks bebas seperti `"dark fantasy revenge"`, mengubahnya menjadi vektor dengan `tfidf` yang sudah di-fit, lalu mencari anime dengan cosine similarity tertinggi:
+
+* `InvertedIndex` menyimpan *posting list* setiap term, yaitu daftar anime yang memuat term tersebut beserta bobot TF-IDF-nya.
+* Term query diproses dari batas atas kontribusi terbesar. Begitu sisa kontribusi term lain tidak bisa lagi menggeser 10 besar (penghentian dini ala *MaxScore*), term umum seperti `tv` hanya diperiksa untuk kandidat yang sudah ada.
+* Hasilnya sama persis dengan perkalian terhadap seluruh katalog, tetapi latensi bergantung pada selektivitas kata query, bukan ukuran katalog: pada katalog yang diperbesar menjadi 100.000 baris, satu query tetap sekitar 1.4 ms, sedangkan perkalian penuh sekitar 29 ms.
+* Query tanpa satu pun kata yang dikenal model menghasilkan `None`.
+"""
+
+# Similarity join ber-threshold dan cluster franchise
+rows, cols, join_scores = similarity_join(tfidf_matrix, threshold=FRANCHISE_THRESHOLD)
+franchise_labels = franchise_clusters(tfidf_matrix, anime_df)
+cluster_sizes = np.bincount(franchise_labels)
+print(f"Pasangan dengan similarity >= {FRANCHISE_THRESHOLD}: {len(rows)}")
+print(f"Cluster franchise berisi lebih dari satu anime: {(cluster_sizes > 1).sum()}, terbesar {cluster_sizes.max()} anime")
+for label in np.argsort(-cluster_sizes)[:3]:
+    print(f"- {cluster_sizes[label]} anime: " + '; '.join(anime_df['English'].fillna(anime_df['Japanese']).iloc[np.flatnonzero(franchise_labels == label)][:4]))
+
+title = 'Gintama'
+for collapse in (False, True):
+    indices, scores = recommend_title(title, title_index, neighbor_index, top_n=10, tfidf_matrix=tfidf_matrix,
+                                      franchise_labels=franchise_labels if collapse else None)
+    print(f"\nTop-10 '{title}' ({'satu per franchise' if collapse else 'tanpa penggabungan'}):")
+    print(catalog_store.frame(indices, scores)[['English', 'Type', 'Similarity']].to_string())
+
+"""### Pengelompokan Franchise
+
+Top-10 sebuah judul sering dipenuhi season, film dan OVA dari franchise yang sama, sehingga rekomendasinya kurang beragam. `similarity_join()` dari `anime_recommender.franchise` mencari semua pasangan anime dengan cosine similarity minimal `FRANCHISE_THRESHOLD` (0.5) tanpa membentuk matriks similarity padat:
+
+* Fitur setiap anime diurutkan dari yang paling umum. Awalan fitur umum yang kontribusinya pasti di bawah threshold tidak diindeks (*prefix filtering*), sehingga kandidat pasangan hanya berasal dari perkalian sparse dengan fitur yang lebih jarang.
+* Kandidat dipangkas lagi dengan batas atas dari bobot maksimum dan norma awalan setiap anime sebelum similarity tepatnya dihitung. Pada katalog ini sekitar 99.000 kandidat tersisa kurang dari 800 yang perlu diverifikasi, dan hasilnya sama persis dengan perhitungan brute force.
+* Baris katalog diproses per blok dengan batas jumlah kandidat, sehingga memori tidak bergantung pada ukuran katalog; `n_jobs` membagi blok ke beberapa proses.
+
+Similarity deskripsi saja tidak cukup untuk menentukan franchise. Season dan film *Gintama* hanya ber-similarity 0.1–0.5 satu sama lain, sedangkan deskripsi generik dari franchise berbeda bisa di atas 0.6 (misalnya *That Time I Got Reincarnated as a Slime* dengan *KonoSuba*). Menurunkan threshold justru membuat cluster berantai: pada 0.2 cluster terbesar berisi 171 judul. Karena itu `franchise_clusters()` hanya menggabungkan pasangan (dengan `union_find()`) yang juga didukung judulnya:
+
+* pasangan hasil join yang judul English atau Japanese-nya diawali kata yang sama, atau
+* pasangan yang judul salah satunya adalah awalan kata judul lainnya (*Gintama* dan *Gintama: The Movie*, 銀魂 dan 銀魂 THE FINAL) dengan similarity minimal `PREFIX_THRESHOLD` (0.02).
+
+Hasilnya 162 cluster franchise. Cluster terbesar adalah 22 film dan season *Detective Conan*, dan 19 judul *Gintama* masuk satu cluster. Top-10 *Gintama* tanpa penggabungan berisi 9 judul Gintama; setelah digabung tidak ada lagi judul Gintama, dan daftarnya diisi anime dari 10 franchise lain seperti *Samurai Champloo* dan *SKET Dance*.
+
+Dengan argumen `franchise_labels`, `recommend_title()` (juga `recommend_rows()` dan `get_recommendations_batch()`) hanya mengambil anime dengan similarity tertinggi dari setiap franchise lain; franchise judul input sendiri dilewati karena season dan filmnya sudah diketahui pengguna (`franchise_top_k(..., exclude_own=False)` tetap menyertakannya). Pada pipeline artefak, label disimpan dengan `build_artifact(..., franchise_threshold=0.5)` dan dipakai melalui `collapse_franchises=True` di `RecommendationCache.recommend()` atau `python -m anime_recommender query --collapse-franchises`.
+"""
+
+# Simpan model ke direktori artefak, lalu muat ulang dengan memory-map
+start = time.perf_counter()
+artifact = load_or_build('Top_Anime_data.csv', 'artifacts/anime_model', k=50)
+elapsed = time.perf_counter() - start
+
+print(f"Versi model: {artifact.version}")
+print(f"Waktu build/muat artefak: {elapsed * 1000:.1f} ms")
+
+"""### Menyimpan Artefak Model
+
+Agar proses lain (misalnya layanan rekomendasi) tidak perlu membaca ulang CSV, melakukan fit TF-IDF, dan menghitung similarity setiap kali dijalankan, hasil pemodelan disimpan ke direktori artefak `artifacts/anime_model`. Setiap versi model ditulis ke subdirektori sendiri (`<model_version>-<waktu>/`) yang berisi:
+
+* `vectorizer.joblib` berisi `TfidfVectorizer` yang sudah di-fit, dan `tfidf_matrix.npz` berisi matriks TF-IDF.
+* `neighbor_indices.npy` dan `neighbor_scores.npy` berisi indeks tetangga top-K, yang dimuat dengan *memory-map* sehingga startup hanya membutuhkan beberapa milidetik.
+* `catalog.pkl`, `catalog_store.pkl` dan `title_index.pkl` berisi tabel judul ringkas, kolom hasil rekomendasi dan indeks judul.
+* `manifest.json` di direktori artefak mencatat hash isi CSV, parameter TF-IDF dan K, serta subdirektori versi yang aktif. Jika CSV atau parameter berubah, `load_or_build()` mendeteksi artefak yang basi dan melakukan build ulang secara otomatis. Manifest baru ditulis setelah subdirektori versi baru selesai, sehingga proses yang masih memakai versi lama tetap membaca file versinya sendiri.
+
+Build offline dan query online juga tersedia tanpa notebook melalui `python -m anime_recommender build`, `query`, `evaluate` dan `bench`. Perintah `query` memakai `load_query_model()` dari `anime_recommender.online`, yang hanya membutuhkan NumPy (tanpa pandas, scikit-learn, atau plotting), sehingga waktu dari import hingga rekomendasi pertama sekitar 0.1 detik. `bench` mengukur waktu tersebut di proses baru dan gagal jika melebihi anggaran 250 ms.
+"""
+
+# Cache rekomendasi di depan artefak model
+rec_cache = RecommendationCache(artifact, maxsize=1024)
+n_warm = rec_cache.warm_up(n_titles=200, by='Members')
+print(f"Warm-up: {n_warm} anime terpopuler dimasukkan ke cache")
+
+start = time.perf_counter()
+for _ in range(1000):
+    rec_cache.recommend('Steins;Gate', top_n=10)
+elapsed = time.perf_counter() - start
+
+print(f"1000 permintaan 'Steins;Gate': {elapsed * 1000:.1f} ms")
+print(rec_cache.info())
+
+# Rekomendasi dengan filter atribut: hanya anime bertipe TV dengan Score >= 8
+filtered = rec_cache.recommend('Steins;Gate', top_n=5, filters={'Type': 'TV', 'Score': (8.0, None)})
+print(filtered[['English', 'Type', 'Score', 'Similarity']])
+
+"""### Cache Rekomendasi
+
+Permintaan rekomendasi di aplikasi biasanya terkonsentrasi pada sejumlah kecil judul populer. `RecommendationCache` menyimpan hasil rekomendasi di cache LRU berukuran terbatas (dengan TTL opsional) sehingga DataFrame hasil tidak perlu dibentuk ulang untuk permintaan yang sama:
+
+* Kunci cache terdiri dari posisi anime, `top_n`, filter, dan **versi model**. Jika artefak di disk diperbarui (misalnya setelah build ulang), cache otomatis dikosongkan.
+* `warm_up()` mengisi cache terlebih dahulu dengan anime terpopuler berdasarkan kolom `Members` atau `Popularity`.
+* `info()` menampilkan jumlah *hit*, *miss*, dan *eviction* untuk memantau efektivitas cache.
+* `recommend()` menerima argumen `filters`, misalnya `{'Type': 'TV', 'Score': (8.0, None)}`. Filter dibentuk dari bitset per nilai atribut (`anime_recommender.filters`) dan diterapkan **sebelum** seleksi top-K, sehingga hasil tetap berisi `top_n` anime yang lolos filter.
 
 ## 7. Evaluasi
 
@@ -469,13 +631,14 @@ Mengevaluasi performa sistem rekomendasi menggunakan metrik Precision@K.
 """
 
 # Fungsi evaluasi Precision@K
+@instrument.timed('precision_at_k')
 def precision_at_k(actual_title, recommended_df, k=10, genre_threshold=0.6):
     try:
-        target_row = anime_df[anime_df['English'] == actual_title]
-        if len(target_row) == 0:
+        target_idx = title_index.resolve(actual_title)
+        if target_idx is None:
             return 0
 
-        target_genres_str = target_row['Genres'].iloc[0]
+        target_genres_str = anime_df['Genres'].iloc[target_idx]
         if pd.isna(target_genres_str) or target_genres_str == 'Unknown':
             return 0
 
@@ -483,11 +646,11 @@ def precision_at_k(actual_title, recommended_df, k=10, genre_threshold=0.6):
         matches = 0
 
         for title in recommended_df['English'].head(k):
-            rec_row = anime_df[anime_df['English'] == title]
-            if len(rec_row) == 0:
+            rec_idx = title_index.resolve(title)
+            if rec_idx is None:
                 continue
 
-            rec_genres_str = rec_row['Genres'].iloc[0]
+            rec_genres_str = anime_df['Genres'].iloc[rec_idx]
             if pd.isna(rec_genres_str) or rec_genres_str == 'Unknown':
                 continue
 
@@ -547,6 +710,93 @@ Pada tahap ini dilakukan evaluasi terhadap performa sistem rekomendasi menggunak
 **Rata-rata Precision\@10:** **0.67**
 
 > Nilai Precision yang cukup tinggi, terutama pada anime dengan genre yang kuat dan khas, menunjukkan bahwa sistem mampu memberikan rekomendasi yang relevan berdasarkan konten.
+"""
+
+# Evaluasi seluruh katalog dengan operasi matriks
+start = time.perf_counter()
+per_title, summary = evaluate_catalog(neighbor_index, anime_df['Genres'], tfidf_matrix, k=10)
+elapsed = time.perf_counter() - start
+
+print(f"Evaluasi {summary['n_evaluated']} anime dalam {elapsed * 1000:.1f} ms")
+for metric, value in summary.items():
+    if metric != 'n_evaluated':
+        print(f"- {metric}: {value:.4f}")
+
+"""### Evaluasi Seluruh Katalog
+
+Tiga judul di atas hanya memberikan gambaran kecil. Fungsi `evaluate_catalog()` mengevaluasi top-10 rekomendasi untuk **seluruh anime** yang memiliki genre, dengan membangun matriks genre *multi-hot* sekali dan menghitung metrik menggunakan operasi matriks:
+
+* **Precision@10** dengan definisi yang sama seperti `precision_at_k` (kemiripan genre minimal 60%).
+* **Recall@10**: proporsi anime relevan di seluruh katalog yang berhasil direkomendasikan.
+* **nDCG@10**: memperhitungkan posisi rekomendasi yang relevan.
+* **Coverage**: proporsi katalog yang pernah muncul sebagai rekomendasi.
+* **ILS** (*intra-list similarity*): rata-rata cosine similarity antar rekomendasi dalam satu daftar; semakin rendah berarti rekomendasi semakin beragam.
+
+Untuk katalog besar, parameter `n_jobs` membagi evaluasi ke beberapa proses.
+"""
+
+# Profil tahap pipeline dengan instrumentasi (termasuk pelacakan memori)
+instrument.reset()
+instrument.enable(trace_memory=True)
+build_artifact('Top_Anime_data.csv', 'artifacts/profiled_model', k=50)
+for anime in test_animes:
+    precision_at_k(anime, get_recommendations(anime, top_n=10), k=10)
+instrument.disable()
+
+print(instrument.format_report())
+instrument.write_prometheus('artifacts/pipeline_metrics.prom')
+instrument.write_log('artifacts/pipeline_metrics.jsonl')
+
+"""### Profil Pipeline
+
+Modul `anime_recommender.instrument` mencatat waktu setiap tahap pipeline: membaca CSV (`read_csv`), membentuk `content_features`, fit TF-IDF (`tfidf_fit`), perkalian similarity per chunk (`cosine_similarity`), seleksi top-K (`top_k_select`), hingga `get_recommendations` dan `precision_at_k` saat query.
+
+* Selama `instrument.enable()` belum dipanggil, pembungkus tahap hanya memeriksa satu flag sehingga overhead-nya dapat diabaikan.
+* Kolom *self ms* adalah waktu tahap tanpa tahap anaknya, sehingga terlihat di mana waktu benar-benar dihabiskan.
+* `trace_memory=True` mencatat puncak memori per tahap dengan `tracemalloc`, sedangkan `profile=True` menjalankan `cProfile` (lihat `instrument.profile_report()`). Keduanya hanya untuk diagnosis.
+* Hasil diekspor ke format teks Prometheus (`pipeline_metrics.prom`) dan log terstruktur JSON Lines (`pipeline_metrics.jsonl`).
+"""
+
+# Dampak presisi numerik (float32 / float16 / int8) terhadap daftar top-10
+precision_df = precision_report(anime_df['content_features'], top_n=10, k=50)
+print(precision_df.round(6).to_string())
+
+"""### Presisi Numerik
+
+Matriks TF-IDF dan hasil `cosine_similarity` secara default bertipe float64, padahal pengurutan rekomendasi tidak membutuhkan presisi sebesar itu. `build_artifact()` dan `load_or_build()` menerima `tfidf_dtype='float32'` serta `score_dtype='float16'` atau `'int8'` (skor dikuantisasi dengan skala per baris) untuk menghemat memori.
+
+`precision_report()` membangun ulang model dengan setiap kombinasi presisi dan membandingkannya dengan acuan float64:
+
+* `changed_order` dan `changed_set`: proporsi anime yang urutan atau isi daftar top-10-nya berubah.
+* `overlap`: rata-rata irisan top-10 dengan acuan.
+* `max_score_error`: selisih skor similarity terbesar terhadap nilai float64.
+* `tfidf_mb` dan `neighbor_mb`: memori matriks TF-IDF dan indeks tetangga.
+
+Pada dataset ini tidak ada daftar top-10 yang berubah. Urutan tetangga ditentukan dari skor float32 saat build, sehingga kuantisasi skor ke float16 atau int8 hanya menggeser nilai `Similarity` (maksimal sekitar 0.004 untuk int8), sedangkan memori indeks tetangga turun dari 0.57 MB menjadi 0.24 MB.
+"""
+
+# Normalisasi teks content_features dengan cache token di disk
+token_cache = TokenCache('artifacts/token_cache.joblib')
+normalized_features = normalize_content(anime_df, cache=token_cache)
+token_cache.save(prune=True)
+print(normalized_features.iloc[0][:120])
+
+for label, texts in [('asli', anime_df['content_features']), ('normalisasi', normalized_features)]:
+    _, matrix = fit_tfidf(texts)
+    _, summary = evaluate_catalog(build_neighbor_index(matrix, k=50), anime_df['Genres'], matrix, k=10)
+    print(f"{label:<12} precision@10 = {summary['precision@10']:.4f}")
+
+"""### Normalisasi Teks
+
+`content_features` di atas hanya gabungan huruf kecil, sehingga teks baku seperti `[Written by MAL Rewrite]` atau `(Source: ANN)`, tanda baca, dan genre dobel seperti `ActionAction` ikut masuk vocabulary TF-IDF. `normalize_content()` dari `anime_recommender.preprocess` membersihkan teks tersebut:
+
+* Teks baku dan tanda baca dibuang dengan operasi string pandas yang tervektorisasi.
+* Setiap genre dan tipe menjadi satu token (`Sci-FiSci-Fi` menjadi `sci_fi`).
+* Stemming Porter bersifat opsional (`{'stem': True}`, membutuhkan `nltk`).
+
+Token hasil normalisasi disimpan di `TokenCache` dengan kunci hash isi kolom `Genres`, `Type` dan `Description`, sehingga pada build berikutnya hanya anime baru atau yang berubah yang dinormalisasi ulang. `save(prune=True)` membuang entri anime yang tidak lagi ada di katalog, sehingga ukuran cache tidak terus bertambah. Untuk katalog besar, `n_jobs` membagi baris yang belum ada di cache ke beberapa proses. Pada pipeline artefak, normalisasi diaktifkan dengan `build_artifact(..., preprocess={})`.
+
+Normalisasi tidak otomatis menaikkan Precision@10 berbasis genre: pada dataset ini nilainya sedikit turun (0.501 menjadi 0.476) karena genre multi-kata seperti *Slice of Life* kini menjadi satu token, bukan beberapa kata yang juga muncul di deskripsi. Karena itu normalisasi bersifat opsional dan model utama tetap memakai `content_features` asli.
 
 ## 8. Kesimpulan
 
@@ -0,0 +1,18 @@
+import os
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CSV_PATH = os.path.join(ROOT, 'Top_Anime_data.csv')
+
+
+@pytest.fixture(scope='session')
+def csv_path():
+    return CSV_PATH
+
+
+@pytest.fixture(scope='session')
+def artifact(tmp_path_factory):
+    from anime_recommender.artifact import build_artifact
+
+    return build_artifact(CSV_PATH, str(tmp_path_factory.mktemp('artifact') / 'anime_model'), k=50)
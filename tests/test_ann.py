@@ -0,0 +1,46 @@
+import numpy as np
+
+from anime_recommender.ann import IVFIndex, LSHIndex, benchmark_ann, recall_at_k
+from anime_recommender.neighbors import similarity_top_k
+
+
+def test_ivf_probing_every_list_is_exact(artifact):
+    X = artifact.tfidf_matrix
+    index = IVFIndex(n_lists=20).fit(X)
+    rows = np.arange(0, X.shape[0], 7)
+    indices, scores = index.query_rows(rows, top_n=10, n_probes=20)
+    _, exact_scores = similarity_top_k(X, rows, 10)
+    np.testing.assert_allclose(scores, exact_scores, atol=1e-5)
+    assert index.candidate_fraction(rows, n_probes=20) == 1.0
+
+
+def test_ivf_defaults_reach_recall_on_a_fraction_of_the_catalog(artifact):
+    X = artifact.tfidf_matrix
+    rows = np.arange(X.shape[0])
+    index = IVFIndex().fit(X)
+    exact, _ = similarity_top_k(X, rows, 10)
+    approx, _ = index.query_rows(rows, top_n=10)
+    assert recall_at_k(approx, exact) >= 0.9
+    assert index.candidate_fraction(rows) <= 0.4
+
+
+def test_benchmark_reports_candidate_fraction(artifact):
+    results = benchmark_ann(artifact.tfidf_matrix, [{'backend': 'ivf'}, {'backend': 'lsh'}],
+                            n_queries=100)
+    assert [r['backend'] for r in results] == ['exact', 'ivf', 'lsh']
+    assert all(0 < r['candidate_fraction'] <= 1 for r in results)
+
+
+def test_lsh_neighbor_index_shape(artifact):
+    neighbor_index = LSHIndex(n_tables=4, n_bits=6).fit(artifact.tfidf_matrix).build_neighbor_index(k=5)
+    assert neighbor_index.indices.shape == (artifact.tfidf_matrix.shape[0], 5)
+
+
+def test_ivf_neighbor_index_matches_query_rows(artifact):
+    index = IVFIndex().fit(artifact.tfidf_matrix)
+    neighbor_index = index.build_neighbor_index(k=20, n_probes=8)
+    chunked = index.build_neighbor_index(k=20, n_probes=8, chunk_size=7)
+    rows = np.arange(0, len(index), 13)
+    _, scores = index.query_rows(rows, top_n=20, n_probes=8)
+    np.testing.assert_allclose(neighbor_index.scores[rows], scores, atol=1e-6)
+    np.testing.assert_allclose(chunked.scores, neighbor_index.scores, atol=1e-6)
@@ -0,0 +1,74 @@
+import os
+import shutil
+
+from anime_recommender import artifact as artifact_module
+from anime_recommender import hashing
+from anime_recommender.artifact import CATALOG_COLUMNS, build_artifact, is_stale, load_or_build
+from anime_recommender.features import TFIDF_PARAMS
+
+
+def test_hashing_build_streams_chunks(csv_path, tmp_path, artifact, monkeypatch):
+    fit = hashing.fit_hashing_tfidf
+    sizes = []
+
+    def counting_fit(chunks, *args, **kwargs):
+        def counted():
+            for chunk in chunks:
+                sizes.append(len(chunk))
+                yield chunk
+        return fit(counted(), *args, **kwargs)
+
+    monkeypatch.setattr(hashing, 'fit_hashing_tfidf', counting_fit)
+    streamed = build_artifact(csv_path, str(tmp_path / 'hashing'), k=10, featurizer='hashing',
+                              read_chunksize=128)
+    _, expected = fit([streamed.content_features])
+
+    assert len(sizes) == 8 and sum(sizes) == len(artifact.catalog)
+    assert abs(streamed.tfidf_matrix - expected).max() < 1e-12
+    assert streamed.content_features.equals(artifact.content_features)
+    assert list(streamed.catalog.columns) == CATALOG_COLUMNS
+
+
+def test_is_stale_tracks_csv_content_and_params(csv_path, tmp_path):
+    csv_copy = tmp_path / 'anime.csv'
+    shutil.copyfile(csv_path, csv_copy)
+    artifact_dir = str(tmp_path / 'model')
+    build_artifact(str(csv_copy), artifact_dir, k=10)
+
+    assert not is_stale(artifact_dir, str(csv_copy), k=10)
+    assert is_stale(artifact_dir, str(csv_copy), k=20)
+    assert is_stale(artifact_dir, str(csv_copy), k=10,
+                    tfidf_params={**TFIDF_PARAMS, 'max_features': 100})
+    assert is_stale(artifact_dir, str(csv_copy), k=10, featurizer='hashing')
+    assert is_stale(str(tmp_path / 'kosong'), str(csv_copy), k=10)
+
+    # mtime berubah tetapi isinya sama: hash dihitung ulang dan tetap segar
+    stat = os.stat(csv_copy)
+    os.utime(csv_copy, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert not is_stale(artifact_dir, str(csv_copy), k=10)
+
+    with open(csv_copy, 'rb') as f:
+        lines = f.read().splitlines(keepends=True)
+    with open(csv_copy, 'wb') as f:
+        f.writelines(lines[:-1])
+    assert is_stale(artifact_dir, str(csv_copy), k=10)
+
+
+def test_load_or_build_reuses_fresh_artifact(csv_path, tmp_path, monkeypatch):
+    csv_copy = tmp_path / 'anime.csv'
+    shutil.copyfile(csv_path, csv_copy)
+    artifact_dir = str(tmp_path / 'model')
+    built = load_or_build(str(csv_copy), artifact_dir, k=10)
+
+    def no_rebuild(*args, **kwargs):
+        raise AssertionError('artefak yang masih segar tidak perlu dibangun ulang')
+
+    monkeypatch.setattr(artifact_module, 'build_artifact', no_rebuild)
+    loaded = load_or_build(str(csv_copy), artifact_dir, k=10)
+    assert loaded.version == built.version
+    assert loaded.manifest['version_dir'] == built.manifest['version_dir']
+
+    monkeypatch.undo()
+    rebuilt = load_or_build(str(csv_copy), artifact_dir, k=20)
+    assert rebuilt.version != built.version
+    assert rebuilt.neighbor_index.k == 20
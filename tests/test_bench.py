@@ -0,0 +1,16 @@
+from anime_recommender.bench import SyntheticCatalog, run_benchmark, summarize
+from anime_recommender.ingest import read_catalog
+
+
+def test_run_benchmark_reports_ann_recall(csv_path, tmp_path):
+    path = str(tmp_path / 'synthetic.csv')
+    SyntheticCatalog(read_catalog(csv_path, usecols=None)).write_csv(path, 1500, seed=0)
+    result = run_benchmark(path, k=10, n_queries=20, batch_size=50, batch_repeats=1,
+                           exact_limit=1000, recall_queries=50)
+    index_build = result['stages']['index_build']
+    assert index_build['backend'] == 'ivf'
+    assert 0 <= index_build['recall@10'] <= 1
+    assert 0 < index_build['candidate_fraction'] < 1
+    assert result['stages']['single_query']['p99_ms'] > 0
+    assert result['stages']['franchise_join']['pairs'] >= 0
+    assert 'recall@10' in summarize(result)
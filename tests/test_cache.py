@@ -0,0 +1,34 @@
+import pytest
+
+from anime_recommender.cache import RecommendationCache
+from anime_recommender.filters import canonical_filters
+
+
+def test_equivalent_filters_share_one_cache_entry(artifact):
+    cache = RecommendationCache(artifact, check_interval=None)
+    equivalent = [
+        {'Type': 'TV', 'Genres': ['Action', 'Comedy'], 'Score': (8, None)},
+        {'Type': ['TV'], 'Genres': ['Comedy', 'Action'], 'Score': (8.0, None)},
+        {'Score': [8.0, None], 'Genres': {'any': ['comedy', 'ActionAction']},
+         'Type': {'any': 'tv'}},
+    ]
+    results = [cache.recommend('Gintama', filters=filters) for filters in equivalent]
+
+    info = cache.info()
+    assert (info.misses, info.hits, info.size) == (1, 2, 1)
+    assert all(result is results[0] for result in results)
+
+
+def test_distinct_filters_get_distinct_keys():
+    assert canonical_filters({'Genres': ['Action']}) != canonical_filters(
+        {'Genres': {'all': ['Action']}})
+    assert canonical_filters({'Type': 'TV'}) != canonical_filters({'Type': 'Movie'})
+    assert canonical_filters({}) is None
+    assert canonical_filters({'Type': []}) is None
+
+
+def test_unknown_filter_value_is_not_cached(artifact):
+    cache = RecommendationCache(artifact, check_interval=None)
+    with pytest.raises(ValueError):
+        cache.recommend('Gintama', filters={'Type': 'Cartoon'})
+    assert cache.info().size == 0
@@ -0,0 +1,34 @@
+import numpy as np
+
+from anime_recommender.cache import RecommendationCache
+from anime_recommender.catalog import CatalogStore
+from anime_recommender.recommend import RESULT_COLUMNS, get_recommendations, recommend_title
+
+
+def test_frame_and_records_match_the_catalog(artifact):
+    catalog = artifact.catalog
+    store = CatalogStore.from_dataframe(catalog)
+    rows = np.array([3, 0, 999])
+
+    frame = store.frame(rows, np.array([0.5, 0.25, 0.125], dtype=np.float32))
+    assert list(frame.columns) == RESULT_COLUMNS + ['Similarity']
+    assert frame.index.tolist() == catalog.index[rows].tolist()
+    assert frame['English'].tolist() == catalog['English'].iloc[rows].tolist()
+    assert frame['Score'].tolist() == catalog['Score'].iloc[rows].tolist()
+    assert frame['Similarity'].tolist() == [0.5, 0.25, 0.125]
+
+    [record] = store.records([3])
+    assert record['Type'] == catalog['Type'].iloc[3]
+    assert record.as_dict() == {column: store.take(column, 3) for column in RESULT_COLUMNS}
+
+
+def test_recommendation_frames_come_from_the_store(artifact):
+    indices, scores = recommend_title('Steins;Gate', artifact.title_index,
+                                      artifact.neighbor_index, top_n=10)
+    expected = artifact.catalog_store.frame(indices, scores)
+
+    frame = get_recommendations('Steins;Gate', artifact.title_index, artifact.catalog_store,
+                                neighbor_index=artifact.neighbor_index)
+    cached = RecommendationCache(artifact, check_interval=None).recommend('Steins;Gate')
+    assert frame.equals(expected)
+    assert cached.equals(expected)
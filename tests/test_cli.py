@@ -0,0 +1,13 @@
+from anime_recommender.cli import main
+
+
+def test_evaluate_reports_ils(artifact, capsys):
+    assert main(['evaluate', '--artifact', artifact.path]) == 0
+    output = capsys.readouterr().out
+    assert 'precision@10:' in output and 'ils:' in output
+
+
+def test_evaluate_rejects_k_above_index(artifact, capsys):
+    assert main(['evaluate', '--artifact', artifact.path, '--k', '60']) == 2
+    captured = capsys.readouterr()
+    assert 'melebihi' in captured.err and 'precision@60' not in captured.out
@@ -0,0 +1,19 @@
+import numpy as np
+import pytest
+
+from anime_recommender.evaluation import evaluate_catalog
+
+
+def test_evaluate_catalog_reports_ils_and_metrics(artifact):
+    per_title, summary = evaluate_catalog(artifact.neighbor_index, artifact.catalog['Genres'],
+                                          artifact.tfidf_matrix, k=10)
+    assert len(per_title) == len(artifact.catalog)
+    assert {'precision@10', 'ils', 'coverage'} <= set(summary)
+    assert 0 < summary['ils'] < 1
+    assert np.isfinite(summary['precision@10'])
+
+
+def test_evaluate_catalog_rejects_k_above_index(artifact):
+    with pytest.raises(ValueError, match='melebihi'):
+        evaluate_catalog(artifact.neighbor_index, artifact.catalog['Genres'],
+                         k=artifact.neighbor_index.k + 10)
@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+
+from anime_recommender.filters import FILTER_COLUMNS, AttributeIndex, filtered_top_k, genre_key
+from anime_recommender.neighbors import cosine_scorer
+
+
+@pytest.fixture(scope='module')
+def catalog(artifact):
+    return artifact.catalog
+
+
+@pytest.fixture(scope='module')
+def index(catalog):
+    return AttributeIndex.from_catalog(catalog)
+
+
+def _values(catalog, column):
+    if column == 'Genres':
+        return catalog[column].astype(object).map(
+            lambda v: {genre_key(g) for g in v.split(',') if g.strip()} if isinstance(v, str) else set()
+        )
+    return catalog[column].astype(object).map(lambda v: {genre_key(v)} if isinstance(v, str) else set())
+
+
+@pytest.mark.parametrize('column', FILTER_COLUMNS)
+def test_mask_matches_pandas_for_every_value(catalog, index, column):
+    values = _values(catalog, column)
+    for value in index.values(column):
+        expected = values.map(lambda keys: value in keys).to_numpy()
+        assert expected.any()
+        np.testing.assert_array_equal(index.mask({column: value}), expected)
+        np.testing.assert_array_equal(index.mask({column: {'none': [value]}}), ~expected)
+
+
+def test_doubled_values_are_normalized(catalog, index):
+    raw = catalog['Demographic'].astype(str)
+    expected = (raw == 'ShounenShounen').to_numpy()
+    np.testing.assert_array_equal(index.mask({'Demographic': 'Shounen'}), expected)
+    np.testing.assert_array_equal(index.mask({'Demographic': 'ShounenShounen'}), expected)
+    np.testing.assert_array_equal(index.mask({'Genres': 'action'}), index.mask({'Genres': 'Action'}))
+
+
+def test_combined_filters(catalog, index):
+    mask = index.mask({'Type': ['TV', 'Movie'], 'Genres': {'all': ['Action', 'Drama']},
+                       'Score': (8.5, None)})
+    genres = _values(catalog, 'Genres')
+    expected = (catalog['Type'].astype(str).isin(['TV', 'Movie'])
+                & genres.map(lambda keys: {'action', 'drama'} <= keys)
+                & (catalog['Score'] >= 8.5)).to_numpy()
+    np.testing.assert_array_equal(mask, expected)
+
+
+def test_unknown_value_raises(index):
+    with pytest.raises(ValueError):
+        index.mask({'Demographic': 'Shonen'})
+    with pytest.raises(ValueError):
+        index.mask({'Platform': 'TV'})
+
+
+def test_fallback_reuses_the_artifact_scorer(artifact, index):
+    mask = index.mask({'Type': 'TV Special'})
+    rows = np.arange(0, len(mask), 37)
+    scorer = artifact.scorer
+
+    indices, scores = filtered_top_k(rows, 10, mask, tfidf_matrix=scorer)
+    expected, expected_scores = filtered_top_k(rows, 10, mask, tfidf_matrix=artifact.tfidf_matrix)
+
+    assert artifact.scorer is scorer and cosine_scorer(scorer) is scorer
+    np.testing.assert_array_equal(indices, expected)
+    np.testing.assert_allclose(scores, expected_scores, atol=1e-6)
+    assert mask[indices[indices >= 0]].all()
@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.preprocessing import normalize
+
+from anime_recommender.franchise import (
+    franchise_clusters, franchise_top_k, similarity_join, title_prefix_pairs,
+)
+from anime_recommender.recommend import recommend_title
+
+
+@pytest.fixture(scope='module')
+def franchise_labels(artifact):
+    return franchise_clusters(artifact.tfidf_matrix, artifact.catalog)
+
+
+@pytest.mark.parametrize('threshold', [0.3, 0.5])
+def test_similarity_join_matches_brute_force(artifact, threshold):
+    X = normalize(artifact.tfidf_matrix)
+    dense = (X @ X.T).toarray()
+    expected_rows, expected_cols = np.nonzero(np.triu(dense >= threshold, k=1))
+
+    rows, cols, scores = similarity_join(artifact.tfidf_matrix, threshold, block_size=128)
+
+    assert sorted(zip(rows.tolist(), cols.tolist())) == sorted(
+        zip(expected_rows.tolist(), expected_cols.tolist()))
+    np.testing.assert_allclose(scores, dense[rows, cols], atol=1e-5)
+
+
+def test_title_prefix_pairs_stop_at_word_boundaries():
+    catalog = pd.DataFrame({
+        'English': ['Kingdom', 'Kingdom: Season 2', 'Kingdom Hearts', 'Kingdoms', None],
+        'Japanese': ['キングダム', 'キングダム 第2シリーズ', None, None, 'キングダム'],
+    })
+    rows, cols = title_prefix_pairs(catalog)
+    # "Kingdom" mengawali "Kingdom Hearts" di batas kata, tetapi tidak "Kingdoms"
+    assert list(zip(rows.tolist(), cols.tolist())) == [(0, 1), (0, 2), (0, 4), (1, 4)]
+
+
+def test_collapsing_gintama_drops_its_own_franchise(artifact, franchise_labels):
+    catalog = artifact.catalog
+    names = catalog['English'].astype(object).fillna(catalog['Japanese'].astype(object))
+    is_gintama = names.str.contains('Gintama|銀魂').to_numpy()
+
+    plain, _ = recommend_title('Gintama', artifact.title_index, artifact.neighbor_index,
+                               top_n=10, tfidf_matrix=artifact.tfidf_matrix)
+    collapsed, _ = recommend_title('Gintama', artifact.title_index, artifact.neighbor_index,
+                                   top_n=10, tfidf_matrix=artifact.tfidf_matrix,
+                                   franchise_labels=franchise_labels)
+
+    assert is_gintama[plain].sum() > 5
+    assert is_gintama[collapsed].sum() == 0
+    assert len(collapsed) == 10
+    assert len(set(franchise_labels[collapsed])) == 10
+
+
+@pytest.mark.parametrize('use_index', [True, False])
+def test_franchise_top_k_can_keep_own_franchise(artifact, franchise_labels, use_index):
+    row = artifact.title_index.resolve('Gintama')
+    neighbor_index = artifact.neighbor_index if use_index else None
+    kept, _ = franchise_top_k([row], 10, franchise_labels, neighbor_index=neighbor_index,
+                              tfidf_matrix=artifact.tfidf_matrix, exclude_own=False)
+    dropped, _ = franchise_top_k([row], 10, franchise_labels, neighbor_index=neighbor_index,
+                                 tfidf_matrix=artifact.tfidf_matrix)
+
+    own = franchise_labels[kept[0]] == franchise_labels[row]
+    assert own.sum() == 1
+    # Tanpa franchise sendiri, sisanya bergeser satu posisi
+    assert dropped[0][:9].tolist() == kept[0][~own].tolist()
+
+
+def test_franchise_clusters_do_not_chain(artifact, franchise_labels):
+    sizes = np.bincount(franchise_labels)
+    # Franchise terbesar di katalog bawaan (Detective Conan) berisi 22 judul
+    assert sizes.max() <= 25
+    catalog = artifact.catalog
+    english = catalog['English'].astype(object)
+    konosuba = franchise_labels[english.str.startswith('KonoSuba', na=False).to_numpy()]
+    slime = franchise_labels[english.str.startswith('That Time I Got', na=False).to_numpy()]
+    assert len(set(konosuba)) == 1 and len(set(slime)) == 1
+    assert konosuba[0] != slime[0]
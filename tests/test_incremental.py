@@ -0,0 +1,111 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from anime_recommender.artifact import build_artifact
+from anime_recommender.incremental import apply_updates
+from anime_recommender.ingest import read_catalog
+from anime_recommender.neighbors import build_neighbor_index
+
+
+def _updates(csv_path):
+    raw = read_catalog(csv_path, usecols=None)
+    changed = raw.iloc[[5, 50, 500]].copy()
+    changed['Description'] = changed['Description'] + ' mecha space war admiral fleet'
+    added = raw.iloc[[10, 20, 30, 40, 60]].copy()
+    added['English'] = [f'New Anime {i}' for i in range(len(added))]
+    added['Japanese'] = [f'新しいアニメ {i}' for i in range(len(added))]
+    return changed, added
+
+
+def test_apply_updates_matches_full_rebuild(csv_path, tmp_path):
+    base = build_artifact(csv_path, str(tmp_path / 'anime_model'), k=50)
+    changed, added = _updates(csv_path)
+    # Baris 500 tidak punya judul English dan harus dicocokkan lewat judul Jepang
+    assert changed['English'].isna().iloc[2]
+
+    result = apply_updates(base, pd.concat([changed, added]), drift_threshold=None)
+
+    assert not result.refit
+    assert sorted(result.changed.tolist()) == [5, 50, 500]
+    assert result.added.tolist() == list(range(1000, 1005))
+    updated = result.artifact
+    expected = build_neighbor_index(updated.tfidf_matrix, k=50)
+    np.testing.assert_allclose(np.asarray(updated.neighbor_index.scores), expected.scores,
+                               atol=1e-6)
+    same = np.asarray(updated.neighbor_index.indices) == expected.indices
+    # Posisi boleh berbeda hanya untuk skor yang sama persis
+    assert np.all(same | np.isclose(expected.scores, np.asarray(updated.neighbor_index.scores)))
+
+
+def test_apply_updates_rejects_rows_without_title(csv_path, tmp_path):
+    base = build_artifact(csv_path, str(tmp_path / 'anime_model'), k=50)
+    changed, _ = _updates(csv_path)
+    changed.loc[:, ['English', 'Japanese']] = np.nan
+    with pytest.raises(ValueError):
+        apply_updates(base, changed, drift_threshold=None)
+
+
+def test_loaded_artifact_keeps_its_version_after_update(csv_path, tmp_path):
+    from anime_recommender.artifact import load_artifact
+    from anime_recommender.service import MicroBatcher
+
+    path = str(tmp_path / 'anime_model')
+    build_artifact(csv_path, path, k=50)
+    loaded = load_artifact(path)
+    _, added = _updates(csv_path)
+    result = apply_updates(load_artifact(path), added.iloc[:2], drift_threshold=None)
+
+    # Anggota lazy model lama tetap dibaca dari direktori versinya sendiri
+    assert loaded.tfidf_matrix.shape[0] == len(loaded.catalog) == 1000
+    assert len(loaded.content_features) == 1000
+    [records] = MicroBatcher(loaded).recommend_many(['Steins;Gate'], [80])
+    assert len(records) == 80
+    assert result.artifact.tfidf_matrix.shape[0] == 1002
+    assert load_artifact(path).version == result.artifact.version != loaded.version
+
+
+@pytest.mark.parametrize('featurizer', ['tfidf', 'hashing'])
+def test_novel_vocabulary_triggers_refit(csv_path, tmp_path, featurizer):
+    base = build_artifact(csv_path, str(tmp_path / 'anime_model'), k=50, featurizer=featurizer)
+    changed, added = _updates(csv_path)
+
+    ordinary = apply_updates(base, pd.concat([changed, added]))
+    assert not ordinary.refit and ordinary.drift < 0.3
+
+    novel = added.iloc[:3].copy()
+    novel['English'] = ['Zorblax', 'Quintessa', 'Vrelmor']
+    novel['Genres'] = 'Xenoquest'
+    novel['Description'] = 'vrelmor dystavian krennic ophulon astraeum velkrath ' * 20
+    result = apply_updates(ordinary.artifact, novel)
+
+    assert result.refit and result.drift > 0.3
+    assert 'vrelmor' in result.artifact.vectorizer.build_analyzer()(novel['Description'].iloc[0])
+    assert result.artifact.manifest['incremental']['tokens'] == 0
+
+
+def test_incremental_franchise_labels_match_full_clustering(csv_path, tmp_path):
+    from anime_recommender.franchise import franchise_clusters
+
+    base = build_artifact(csv_path, str(tmp_path / 'anime_model'), k=50, franchise_threshold=0.5)
+    raw = read_catalog(csv_path, usecols=None)
+    gintama = base.title_index.resolve('Gintama Season 4')
+    conan = base.title_index.resolve('Case Closed')
+    labels = base.franchise_labels
+    assert (labels == labels[gintama]).sum() > 5
+
+    # Satu season Gintama berubah isinya, satu anime baru masuk franchise Conan
+    moved = raw.iloc[[gintama]].copy()
+    moved['Japanese'] = 'まったく別の作品'
+    moved[['Genres', 'Description']] = raw[['Genres', 'Description']].iloc[0].values
+    sequel = raw.iloc[[conan]].copy()
+    sequel['English'] = 'Case Closed: The New Movie'
+    sequel['Japanese'] = '名探偵コナン 新作'
+    result = apply_updates(base, pd.concat([moved, sequel]), drift_threshold=None)
+
+    updated = result.artifact
+    expected = franchise_clusters(updated.tfidf_matrix, updated.catalog, 0.5)
+    np.testing.assert_array_equal(updated.franchise_labels, expected)
+    assert result.changed.tolist() == [gintama]
+    assert (updated.franchise_labels == labels[gintama]).sum() < (labels == labels[gintama]).sum()
+    assert updated.franchise_labels[1000] == updated.franchise_labels[conan]
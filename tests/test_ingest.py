@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from anime_recommender.catalog import CatalogStore
+from anime_recommender.ingest import iter_catalog, read_catalog
+from anime_recommender.rerank import catalog_signals
+
+
+@pytest.fixture
+def sample(csv_path):
+    return read_catalog(csv_path, usecols=None).head(20)
+
+
+def test_empty_integer_cells_are_read_as_missing(sample, tmp_path):
+    sample.loc[[3, 7], 'Members'] = np.nan
+    sample.loc[5, 'Rank'] = np.nan
+    path = tmp_path / 'catalog.csv'
+    sample.to_csv(path, index=False)
+
+    catalog = read_catalog(path)
+    assert str(catalog['Members'].dtype) == 'Int64'
+    assert catalog['Members'].isna().tolist() == [row in (3, 7) for row in range(20)]
+    assert catalog['Rank'].isna().sum() == 1
+    assert sum(len(chunk) for chunk in iter_catalog(path, chunksize=6)) == 20
+
+    store = CatalogStore.from_dataframe(catalog, columns=['Members', 'Rank'])
+    assert np.isnan(store.take('Members', [3, 7])).all()
+    assert store.take('Rank', [0]) == catalog['Rank'].iloc[0]
+    # Nilai kosong menjadi sinyal terendah, bukan error
+    assert catalog_signals(catalog)[[3, 7], 2].tolist() == [0.0, 0.0]
+
+
+def test_bad_integer_value_names_the_dtype_not_the_encoding(sample, tmp_path):
+    sample['Members'] = sample['Members'].astype(object)
+    sample.loc[4, 'Members'] = 'banyak'
+    path = tmp_path / 'catalog.csv'
+    sample.to_csv(path, index=False)
+
+    for read in (read_catalog, lambda p: list(iter_catalog(p, chunksize=5))):
+        with pytest.raises(ValueError, match='tidak sesuai tipe kolom') as info:
+            read(path)
+        assert 'encoding' not in str(info.value)
+
+
+def test_undecodable_bytes_name_the_encoding(sample, tmp_path):
+    path = tmp_path / 'catalog.csv'
+    sample.to_csv(path, index=False, encoding='utf-16')
+    with pytest.raises(ValueError, match='dengan encoding utf-8'):
+        read_catalog(path, encoding='utf-8')
+
+
+def test_missing_column_is_reported_as_is(sample, tmp_path):
+    path = tmp_path / 'catalog.csv'
+    sample.drop(columns='Genres').to_csv(path, index=False)
+    with pytest.raises(ValueError, match=r"Kolom \['Genres'\] tidak ditemukan"):
+        read_catalog(path)
@@ -0,0 +1,97 @@
+import json
+
+import pytest
+
+from anime_recommender import instrument
+from anime_recommender.instrument import Instrumentation
+from anime_recommender.recommend import recommend_title
+
+
+@pytest.fixture
+def recorder():
+    yield instrument.instrumentation
+    instrument.disable()
+    instrument.reset()
+
+
+def test_disabled_instrumentation_records_nothing():
+    inst = Instrumentation()
+
+    @inst.timed('kerja')
+    def work():
+        inst.increment('panggilan')
+        return 42
+
+    with inst.stage('luar'):
+        assert work() == 42
+    assert list(inst.timed_iter('chunk', [1, 2])) == [1, 2]
+    assert inst.snapshot() == {'stages': {}, 'counters': {}}
+
+
+def test_nested_stages_split_self_time():
+    inst = Instrumentation()
+    inst.enable()
+
+    @inst.timed('anak')
+    def child():
+        return sum(range(10_000))
+
+    with inst.stage('induk'):
+        child()
+        child()
+    assert list(inst.timed_iter('chunk', 'abc')) == ['a', 'b', 'c']
+    inst.increment('baris', 3)
+    inst.increment('baris')
+
+    stats = inst.snapshot()
+    parent, kid = stats['stages']['induk'], stats['stages']['anak']
+    assert kid['count'] == 2 and parent['count'] == 1
+    assert parent['self_seconds'] == pytest.approx(parent['total_seconds'] - kid['total_seconds'])
+    # Satu next() tambahan untuk StopIteration juga tercatat
+    assert stats['stages']['chunk']['count'] == 4
+    assert stats['counters'] == {'baris': 4}
+
+    inst.disable()
+    with inst.stage('induk'):
+        pass
+    assert inst.snapshot()['stages']['induk']['count'] == 1
+    inst.reset()
+    assert inst.snapshot() == {'stages': {}, 'counters': {}}
+
+
+def test_prometheus_and_log_export(tmp_path):
+    inst = Instrumentation()
+    inst.enable(trace_memory=True)
+    with inst.stage('baca "csv"'):
+        data = [bytearray(1024) for _ in range(64)]
+    inst.increment('title_not_found')
+    inst.disable()
+    assert data
+
+    text = inst.to_prometheus(prefix='uji')
+    assert '# TYPE uji_stage_calls_total counter' in text
+    assert 'uji_stage_calls_total{stage="baca \\"csv\\""} 1' in text
+    assert '# TYPE uji_stage_peak_bytes gauge' in text
+    assert 'uji_events_total{name="title_not_found"} 1' in text
+
+    inst.write_prometheus(tmp_path / 'metrics.prom')
+    assert (tmp_path / 'metrics.prom').read_text(encoding='utf-8') == inst.to_prometheus()
+
+    log = tmp_path / 'metrics.jsonl'
+    inst.write_log(log)
+    inst.write_log(log)
+    records = [json.loads(line) for line in log.read_text(encoding='utf-8').splitlines()]
+    assert [r['event'] for r in records] == ['stage', 'counter'] * 2
+    assert records[0]['stage'] == 'baca "csv"' and records[0]['peak_bytes'] >= 64 * 1024
+    assert (records[1]['name'], records[1]['value']) == ('title_not_found', 1)
+
+
+def test_recommendation_queries_are_instrumented(artifact, recorder):
+    recorder.enable()
+    recommend_title('Gintama', artifact.title_index, artifact.neighbor_index, top_n=10)
+    recommend_title('judul yang tidak ada', artifact.title_index, artifact.neighbor_index)
+
+    stats = recorder.snapshot()
+    assert stats['stages']['recommend_title']['count'] == 2
+    assert stats['counters'] == {'title_not_found': 1}
+    assert 'recommend_title' in instrument.format_report()
@@ -0,0 +1,33 @@
+import numpy as np
+import pytest
+
+from anime_recommender.neighbors import build_neighbor_index
+
+
+def _dense(tfidf_matrix):
+    dense = (tfidf_matrix @ tfidf_matrix.T).toarray()
+    np.fill_diagonal(dense, -np.inf)
+    return dense
+
+
+@pytest.mark.parametrize('chunk_size', [97, 256, 2000])
+def test_neighbor_index_matches_dense_argsort(artifact, chunk_size):
+    dense = _dense(artifact.tfidf_matrix)
+    k = 20
+    expected = -np.sort(-dense, axis=1)[:, :k]
+
+    index = build_neighbor_index(artifact.tfidf_matrix, k=k, chunk_size=chunk_size)
+
+    np.testing.assert_allclose(index.scores, expected, atol=1e-6)
+    # Indeks boleh berbeda urutan hanya di antara skor yang sama
+    np.testing.assert_allclose(np.take_along_axis(dense, index.indices.astype(np.int64), axis=1),
+                               expected, atol=1e-6)
+    assert not np.any(index.indices == np.arange(len(index))[:, None])
+
+
+def test_quantized_scores_stay_close(artifact):
+    index = build_neighbor_index(artifact.tfidf_matrix, k=10)
+    for score_dtype, atol in (('float16', 1e-3), ('int8', 1e-2)):
+        quantized = index.with_score_dtype(score_dtype)
+        np.testing.assert_array_equal(quantized.indices, index.indices)
+        np.testing.assert_allclose(np.asarray(quantized.scores), index.scores, atol=atol)
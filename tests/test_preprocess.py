@@ -0,0 +1,44 @@
+from anime_recommender.features import fill_missing_values
+from anime_recommender.ingest import read_catalog
+from anime_recommender.preprocess import TokenCache, normalize_content
+
+
+def _catalog(csv_path):
+    return fill_missing_values(read_catalog(csv_path).head(200)).reset_index(drop=True)
+
+
+def test_token_cache_reuses_unchanged_rows(csv_path, tmp_path):
+    df = _catalog(csv_path)
+    path = str(tmp_path / 'tokens.joblib')
+    cache = TokenCache(path)
+    first = normalize_content(df, cache=cache)
+    cache.save()
+    assert (cache.hits, cache.misses) == (0, len(df))
+
+    df.loc[7, 'Description'] = 'A brand new [Written by MAL Rewrite] description!'
+    cache = TokenCache(path)
+    second = normalize_content(df, cache=cache)
+    # Hanya baris yang berubah yang dinormalisasi ulang
+    assert (cache.hits, cache.misses) == (len(df) - 1, 1)
+    assert second.drop(7).equals(first.drop(7))
+    assert second[7].endswith('a brand new description')
+    assert second.equals(normalize_content(df))
+
+
+def test_token_cache_stores_shared_tokens_and_prunes(csv_path, tmp_path):
+    df = _catalog(csv_path)
+    path = str(tmp_path / 'tokens.joblib')
+    cache = TokenCache(path)
+    normalize_content(df, cache=cache)
+    cache.save()
+
+    cache = TokenCache(path)
+    entries = list(cache.entries.values())
+    assert all(isinstance(tokens, tuple) for tokens in entries)
+    # Token yang sama dibagi antar entri setelah dimuat ulang
+    tv = [token for tokens in entries for token in tokens if token == 'tv']
+    assert len(tv) > 1 and all(token is tv[0] for token in tv)
+
+    normalize_content(df.head(50), cache=cache)
+    cache.save(prune=True)
+    assert len(TokenCache(path)) == 50
@@ -0,0 +1,38 @@
+import numpy as np
+import scipy.sparse as sp
+
+from anime_recommender import profile
+from anime_recommender.profile import history_matrix, recommend_for_history, recommend_profiles
+
+
+def test_score_blocks_are_bounded_by_catalog_size(monkeypatch):
+    X = sp.random(3000, 40, density=0.2, format='csr', random_state=0, dtype=np.float32)
+    X.data += 0.1
+    W = sp.random(50, 3000, density=0.002, format='csr', random_state=1, dtype=np.float32)
+    expected = recommend_profiles(W, X, top_n=5)
+
+    widths = []
+
+    def spy(block, k):
+        widths.append(block.size)
+        return top_k_rows(block, k)
+
+    top_k_rows = profile.top_k_rows
+    monkeypatch.setattr(profile, 'top_k_rows', spy)
+    monkeypatch.setattr(profile, 'MAX_PROFILE_CELLS', 4 * 3000)
+    indices, scores = recommend_profiles(W, X, top_n=5)
+
+    # Blok skor chunk x N, bukan hanya centroid chunk x fitur, tetap di bawah batas
+    assert max(widths) <= 4 * 3000 and len(widths) == 50 // 4 + 1
+    np.testing.assert_array_equal(indices, expected[0])
+    np.testing.assert_allclose(scores, expected[1])
+
+
+def test_history_recommendations_skip_watched_titles(artifact):
+    titles = ['Steins;Gate', 'Gintama']
+    indices, scores = recommend_for_history(titles, artifact.title_index, artifact.tfidf_matrix)
+    watched = {artifact.title_index.resolve(t) for t in titles}
+    assert len(indices) == 10 and not watched & set(indices.tolist())
+    assert np.all(np.diff(scores) <= 0)
+    W = history_matrix([titles, ['Judul Tidak Ada']], artifact.title_index, len(artifact.catalog))
+    assert W.getrow(1).nnz == 0
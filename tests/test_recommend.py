@@ -0,0 +1,33 @@
+import numpy as np
+import pytest
+
+from anime_recommender.recommend import get_recommendations_batch, recommend_title
+
+TITLES = ['Gintama', 'judul yang tidak ada', 'Case Closed', 'Gintama Season 4']
+
+
+@pytest.mark.parametrize('top_n', [10, 80])
+def test_batch_matches_single_title_queries(artifact, top_n):
+    # top_n=80 melebihi k=50 sehingga dihitung dari matriks TF-IDF
+    batch = get_recommendations_batch(TITLES, artifact.title_index, top_n=top_n,
+                                      neighbor_index=artifact.neighbor_index,
+                                      tfidf_matrix=artifact.tfidf_matrix)
+
+    assert batch.indices.shape == batch.scores.shape == (len(TITLES), top_n)
+    for i, title in enumerate(TITLES):
+        single = recommend_title(title, artifact.title_index, artifact.neighbor_index,
+                                 top_n=top_n, tfidf_matrix=artifact.tfidf_matrix)
+        if single is None:
+            assert batch.rows[i] == -1
+            assert (batch.indices[i] == -1).all() and np.isnan(batch.scores[i]).all()
+            continue
+        assert batch.rows[i] == artifact.title_index.resolve(title)
+        assert batch.rows[i] not in batch.indices[i]
+        np.testing.assert_allclose(batch.scores[i], single[1], atol=1e-6)
+        assert batch.indices[i].tolist() == single[0].tolist()
+
+
+def test_batch_without_tfidf_rejects_top_n_above_index(artifact):
+    with pytest.raises(ValueError):
+        get_recommendations_batch(TITLES, artifact.title_index, top_n=80,
+                                  neighbor_index=artifact.neighbor_index)
@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+
+from anime_recommender.filters import AttributeIndex
+from anime_recommender.recommend import recommend_rows
+from anime_recommender.rerank import HybridReranker, catalog_signals, hybrid_recommend_rows
+
+
+@pytest.fixture(scope='module')
+def rows(artifact):
+    return [artifact.title_index.resolve(t) for t in ('Gintama', 'Case Closed')]
+
+
+def test_catalog_signals_are_normalized_float32(artifact):
+    signals = catalog_signals(artifact.catalog)
+    assert signals.shape == (len(artifact.catalog), 3)
+    assert signals.dtype == np.float32 and signals.flags['C_CONTIGUOUS']
+    assert signals.min() >= 0.0 and signals.max() <= 1.0
+    # Popularity 1 adalah yang paling populer
+    most_popular = artifact.catalog['Popularity'].to_numpy(dtype=np.float64, na_value=np.nan)
+    assert signals[np.nanargmin(most_popular), 1] == 1.0
+
+
+def test_similarity_only_weights_keep_similarity_order(artifact, rows):
+    reranker = HybridReranker.from_catalog(
+        artifact.catalog, weights={'similarity': 1.0, 'score': 0.0, 'popularity': 0.0})
+    expected, _ = recommend_rows(rows, 10, neighbor_index=artifact.neighbor_index)
+    indices, _ = hybrid_recommend_rows(rows, reranker, top_n=10, pool_size=50,
+                                       neighbor_index=artifact.neighbor_index)
+    np.testing.assert_array_equal(indices, expected)
+
+
+def test_hybrid_scores_follow_the_weighted_formula(artifact, rows):
+    reranker = HybridReranker.from_catalog(artifact.catalog, weights={'members': 0.2})
+    pool, similarities = recommend_rows(rows, 50, neighbor_index=artifact.neighbor_index)
+    indices, scores = reranker.rerank(pool, similarities, top_n=10)
+
+    w = reranker.weights
+    signals = reranker.signals[indices]
+    for i in range(len(rows)):
+        sim = dict(zip(pool[i].tolist(), similarities[i].tolist()))
+        expected = np.array([w['similarity'] * sim[j] for j in indices[i]]) + (
+            signals[i] @ np.array([w['score'], w['popularity'], w['members']]))
+        np.testing.assert_allclose(scores[i], expected, rtol=1e-5)
+        assert set(indices[i]) <= set(pool[i])
+    assert (np.diff(scores, axis=1) <= 0).all()
+
+
+def test_rerank_skips_slots_left_empty_by_filters(artifact, rows):
+    mask = AttributeIndex.from_catalog(artifact.catalog).mask({'Type': 'Special'})
+    pool, similarities = recommend_rows(rows, 200, neighbor_index=artifact.neighbor_index,
+                                        tfidf_matrix=artifact.tfidf_matrix, mask=mask)
+    assert (pool < 0).any()
+
+    indices, scores = HybridReranker.from_catalog(artifact.catalog).rerank(
+        pool, similarities, top_n=mask.sum() + 5)
+    found = indices >= 0
+    assert mask[indices[found]].all()
+    assert np.isneginf(scores[~found]).all()
+
+
+def test_unknown_weight_is_rejected(artifact):
+    with pytest.raises(ValueError):
+        HybridReranker.from_catalog(artifact.catalog, weights={'rank': 0.5})
@@ -0,0 +1,30 @@
+import numpy as np
+import pytest
+
+from anime_recommender.search import query_vector
+
+QUERIES = ['dark fantasy revenge', 'high school volleyball team', 'space pirate tv',
+           'samurai comedy edo period', 'idol music']
+
+
+def _dense_top_k(tfidf_matrix, terms, weights, k, mask=None):
+    scores = tfidf_matrix[:, terms] @ weights
+    candidates = np.flatnonzero((tfidf_matrix[:, terms] != 0).sum(axis=1).A1 > 0)
+    if mask is not None:
+        candidates = candidates[mask[candidates]]
+    best = candidates[np.lexsort((candidates, -scores[candidates]))][:k]
+    return best, scores[best]
+
+
+@pytest.mark.parametrize('query', QUERIES)
+@pytest.mark.parametrize('masked', [False, True])
+def test_inverted_index_top_k_matches_dense_product(artifact, query, masked):
+    terms, weights = query_vector(query, artifact.vectorizer)
+    assert len(terms)
+    mask = np.arange(artifact.tfidf_matrix.shape[0]) % 3 != 0 if masked else None
+
+    indices, scores = artifact.inverted_index.top_k(terms, weights, k=10, mask=mask)
+    expected, expected_scores = _dense_top_k(artifact.tfidf_matrix, terms, weights, 10, mask)
+
+    np.testing.assert_allclose(scores, expected_scores, atol=1e-5)
+    np.testing.assert_array_equal(indices, expected)
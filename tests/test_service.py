@@ -0,0 +1,75 @@
+import asyncio
+import json
+
+import numpy as np
+
+from anime_recommender.artifact import load_artifact
+from anime_recommender.recommend import recommend_rows
+from anime_recommender.service import MicroBatcher, RecommendationService
+
+
+def test_only_oversize_requests_use_the_fallback(artifact, monkeypatch):
+    from anime_recommender import service
+
+    calls = []
+
+    def spy(rows, top_n, neighbor_index=None, tfidf_matrix=None):
+        calls.append((len(rows), top_n, tfidf_matrix is not None))
+        return recommend_rows(rows, top_n, neighbor_index=neighbor_index,
+                              tfidf_matrix=tfidf_matrix)
+
+    monkeypatch.setattr(service, 'recommend_rows', spy)
+    fresh = load_artifact(artifact.path)
+    batcher = MicroBatcher(fresh)
+
+    small = batcher.recommend_many(['Steins;Gate', 'Gintama', 'Judul Tidak Ada'], [10, 5, 10])
+    assert 'scorer' not in vars(fresh)
+    assert small[2] is None
+
+    calls.clear()
+    mixed = batcher.recommend_many(['Steins;Gate', 'Gintama', 'Steins;Gate'], [10, 5, 80])
+    # Hanya permintaan top_n=80 (di atas K=50) yang dihitung dari matriks TF-IDF
+    assert calls == [(2, 10, False), (1, 80, True)]
+    assert mixed[:2] == small[:2]
+    assert len(mixed[2]) == 80
+    row = fresh.title_index.resolve('Steins;Gate')
+    expected = fresh.catalog['English'].iloc[np.asarray(fresh.neighbor_index.indices[row, :10])]
+    assert [r['English'] for r in mixed[0]] == expected.tolist()
+
+
+async def _get(port, target):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    writer.write(f'GET {target} HTTP/1.1\r\nHost: test\r\nConnection: close\r\n\r\n'.encode())
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    head, _, body = response.partition(b'\r\n\r\n')
+    return int(head.split()[1]), json.loads(body)
+
+
+async def _serve_and_query(service, targets):
+    worker = asyncio.create_task(service.batcher.run())
+    server = await asyncio.start_server(service.handle, '127.0.0.1', 0)
+    port = server.sockets[0].getsockname()[1]
+    try:
+        return await asyncio.gather(*(_get(port, target) for target in targets))
+    finally:
+        server.close()
+        await server.wait_closed()
+        worker.cancel()
+
+
+def test_http_requests_are_batched(artifact):
+    service = RecommendationService(artifact, max_delay=0.05, max_top_n=100)
+    targets = ['/recommend?title=Steins;Gate&top_n=10', '/recommend?title=Gintama&top_n=80',
+               '/recommend?title=Judul+Tidak+Ada', '/recommend?title=Gintama&top_n=500']
+    responses = asyncio.run(_serve_and_query(service, targets))
+
+    (ok_status, ok), (big_status, big), (missing_status, _), (bad_status, _) = responses
+    assert ok_status == 200 and len(ok['recommendations']) == 10
+    assert ok['model_version'] == artifact.version
+    assert big_status == 200 and len(big['recommendations']) == 80
+    assert missing_status == 404
+    assert bad_status == 400
+    # Tiga permintaan valid digabung dalam satu batch
+    assert service.stats.batches == 1 and service.stats.max_batch_size == 3
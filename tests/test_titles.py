@@ -0,0 +1,49 @@
+import pickle
+
+import pandas as pd
+
+from anime_recommender.titles import TitleIndex
+
+
+def _index():
+    catalog = pd.DataFrame({
+        'English': ['Attack on Titan', 'Fullmetal Alchemist: Brotherhood', 'Gintama', None],
+        'Synonyms': ['Shingeki no Kyojin', 'No synonyms', 'Gin Tama', None],
+        'Japanese': ['進撃の巨人', '鋼の錬金術師', '銀魂', 'モブサイコ100'],
+    })
+    return TitleIndex.from_dataframe(catalog)
+
+
+def test_suggest_ranks_typos_by_ngram_overlap():
+    index = _index()
+    suggestions = index.suggest('atack on titan')
+    assert suggestions[0][:2] == (0, 'Attack on Titan')
+    scores = [score for _, _, score in suggestions]
+    assert scores == sorted(scores, reverse=True)
+    # Satu baris muncul sekali walaupun beberapa judulnya mirip
+    rows = [row for row, _, _ in index.suggest('gintama', limit=10, min_score=0.0)]
+    assert len(rows) == len(set(rows))
+
+
+def test_suggest_ignores_unrelated_and_placeholder_titles():
+    index = _index()
+    assert index.suggest('zzzz') == []
+    assert all(label != 'No synonyms' for _, label, _ in index.suggest('no synonyms', min_score=0.0))
+
+
+def test_suggest_follows_added_and_removed_rows():
+    index = _index()
+    index.suggest('gintama')  # indeks n-gram sudah terbangun
+    index.remove_row(2, {'English': 'Gintama', 'Synonyms': 'Gin Tama', 'Japanese': '銀魂'})
+    index.add_row(4, {'English': 'Gintama Season 2'})
+
+    assert index.resolve('Gintama') is None
+    assert [row for row, _, _ in index.suggest('gintama')] == [4]
+
+
+def test_ngram_index_is_rebuilt_after_unpickling():
+    index = _index()
+    expected = index.suggest('fullmetal alchemist')
+    restored = pickle.loads(pickle.dumps(index))
+    assert restored._grams is None
+    assert restored.suggest('fullmetal alchemist') == expected